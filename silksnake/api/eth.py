@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 """The API equivalent to Ethereum JSON RPC."""
 
-from typing import Tuple, Union
+import contextlib
+import threading
+from typing import Iterator, Tuple, Union
 
 from ..core.constants import HASH_SIZE
-from ..core import chain, reader
+from ..core import chain, changeset_cache, code_cache, kvcache, kvstore, reader
 from ..helpers import hashing
-from ..remote import kv_remote
+from ..remote import kv_pool, kv_remote
 from ..rlp import sedes
 from ..stagedsync import stages
 
@@ -14,66 +16,111 @@ from ..stagedsync import stages
 
 class EthereumAPI:
     """ EthereumAPI"""
-    def __init__(self, target: str = kv_remote.DEFAULT_TARGET):
-        remote_kv_client = kv_remote.RemoteClient(target)
-        self.remote_kv = remote_kv_client.open()
+    def __init__(self, target: str = kv_remote.DEFAULT_TARGET, pool: kv_pool.ChannelPool = None,
+                 contract_code_cache: code_cache.CodeCache = None, change_set_cache: changeset_cache.ChangeSetCache = None):
+        if pool is not None:
+            self.remote_kv = pool.acquire(target)
+        else:
+            remote_kv_client = kv_remote.RemoteClient(target)
+            self.remote_kv = remote_kv_client.open()
+        self.change_set_cache = change_set_cache if change_set_cache is not None else changeset_cache.ChangeSetCache()
+        self.code_cache = contract_code_cache if contract_code_cache is not None else code_cache.CodeCache()
+        self.scope = threading.local()
 
     def close(self):
         """ close"""
         self.remote_kv.close()
 
+    @contextlib.contextmanager
+    def request_scope(self) -> Iterator[kvcache.MemoizingKV]:
+        """ Serve all the calls within the scope (e.g. one JSON RPC batch) from one memoizing view on the KV. Each call opens
+            its own scope unless within an enclosing one in the same thread.
+        """
+        scoped_kv = getattr(self.scope, 'kv', None)
+        if scoped_kv is not None:
+            yield scoped_kv
+            return
+        self.scope.kv = kvcache.MemoizingKV(self.remote_kv)
+        try:
+            yield self.scope.kv
+        finally:
+            self.scope.kv.close()
+            self.scope.kv = None
+
     def block_number(self):
         """ Get the number of the latest block in the chain. """
         try:
-            block_heigth, _ = stages.get_stage_progress(self.remote_kv, stages.SyncStage.FINISH)
+            with self.request_scope() as database:
+                block_heigth, _ = stages.get_stage_progress(database, stages.SyncStage.FINISH)
             return block_heigth
         except Exception:
             return 0
 
     def get_block_by_number(self, block_number: int) -> sedes.Block:
         """ Get the block having the given number in the chain. """
-        return chain.Blockchain(self.remote_kv).read_block_by_number(block_number)
+        with self.request_scope() as database:
+            return chain.Blockchain(database).read_block_by_number(block_number)
 
     def get_block_by_hash(self, block_hash: str) -> sedes.Block:
         """ Get the block having the given hash in the chain. """
         try:
             block_hash_bytes = hashing.hex_as_hash(block_hash)
-            return chain.Blockchain(self.remote_kv).read_block_by_hash(block_hash_bytes)
+            with self.request_scope() as database:
+                return chain.Blockchain(database).read_block_by_hash(block_hash_bytes)
         except Exception:
             return None
 
     def get_block_transaction_count_by_number(self, block_number: int) -> int:
         """ Get the number of transactions included in block having the given number in the chain. """
-        block = chain.Blockchain(self.remote_kv).read_block_by_number(block_number)
+        with self.request_scope() as database:
+            block = chain.Blockchain(database).read_block_by_number(block_number)
         return len(block.body.transactions) if block else -1
 
     def get_block_transaction_count_by_hash(self, block_hash: str) -> int:
         """ Get the number of transactions included in block having the given hash in the chain. """
-        block = chain.Blockchain(self.remote_kv).read_block_by_hash(block_hash)
+        with self.request_scope() as database:
+            block = chain.Blockchain(database).read_block_by_hash(block_hash)
         return len(block.body.transactions) if block else -1
 
     def get_storage_at(self, address: str, index: str, block_number_or_hash: Union[int, str]) -> str:
         """ Returns a 32-byte long, zero-left-padded value at index storage location of address or '0x' if no value."""
         try:
-            if isinstance(block_number_or_hash, int):
-                block_number = int(block_number_or_hash)
-            else:
-                block_hash = str(block_number_or_hash)
-                block_hash_bytes = hashing.hex_as_hash(block_hash)
-                block_number = chain.Blockchain(self.remote_kv).read_canonical_block_number(block_hash_bytes)
-            state_reader = reader.StateReader(self.remote_kv, block_number)
-            account = state_reader.read_account_data(address)
-            location_hash = hashing.hex_as_hash(str(index))
-            value = state_reader.read_account_storage(address, account.incarnation, location_hash)
+            with self.request_scope() as database:
+                block_number = self.read_block_number(database, block_number_or_hash)
+                state_reader = reader.StateReader(database, block_number, self.change_set_cache)
+                account = state_reader.read_account_data(address)
+                location_hash = hashing.hex_as_hash(str(index))
+                value = state_reader.read_account_storage(address, account.incarnation, location_hash)
             return '0x' + value.hex().zfill(2*HASH_SIZE)
         except Exception:
             return '0x'
 
+    def get_code(self, address: str, block_number_or_hash: Union[int, str]) -> str:
+        """ Returns the code at address in the given block or '0x' if no code (e.g. externally owned account or unknown block)."""
+        with self.request_scope() as database:
+            block_number = self.read_block_number(database, block_number_or_hash)
+            if block_number is None:
+                return '0x'
+            state_reader = reader.StateReader(database, block_number, self.change_set_cache)
+            code_hash = state_reader.read_code_hash(address)
+            if not code_hash or code_hash == code_cache.EMPTY_CODE_HASH:
+                return '0x'
+            code = self.code_cache.get(database.view(), code_hash)
+        return '0x' + code.hex() if code is not None else '0x'
+
+    def read_block_number(self, database: kvstore.KV, block_number_or_hash: Union[int, str]) -> int:
+        """ Return the given block number or the number of the canonical block having the given hash."""
+        if isinstance(block_number_or_hash, int):
+            return int(block_number_or_hash)
+        block_hash_bytes = hashing.hex_as_hash(str(block_number_or_hash))
+        return chain.Blockchain(database).read_canonical_block_number(block_hash_bytes)
+
     def syncing(self) -> Union[bool, Tuple[int ,int]]:
         """Returns false is already sync'd, otherwise the (currentBlock, highestBlock) couple."""
         try:
-            highest_block, _ = stages.get_stage_progress(self.remote_kv, stages.SyncStage.HEADERS)
-            current_block, _ = stages.get_stage_progress(self.remote_kv, stages.SyncStage.FINISH)
+            with self.request_scope() as database:
+                highest_block, _ = stages.get_stage_progress(database, stages.SyncStage.HEADERS)
+                current_block, _ = stages.get_stage_progress(database, stages.SyncStage.FINISH)
             if current_block >= highest_block:
                 return False
             return highest_block, current_block
@@ -3,13 +3,16 @@
 
 from ..core import chain, reader
 from ..helpers import hashing
-from ..remote import kv_remote
+from ..remote import kv_pool, kv_remote
 
 class TurboAPI:
     """ TurboAPI"""
-    def __init__(self, target: str = kv_remote.DEFAULT_TARGET):
-        remote_kv_client = kv_remote.RemoteClient(target)
-        self.remote_kv = remote_kv_client.open()
+    def __init__(self, target: str = kv_remote.DEFAULT_TARGET, pool: kv_pool.ChannelPool = None):
+        if pool is not None:
+            self.remote_kv = pool.acquire(target)
+        else:
+            remote_kv_client = kv_remote.RemoteClient(target)
+            self.remote_kv = remote_kv_client.open()
 
     def close(self):
         """ close"""
@@ -2,6 +2,7 @@
 """The storage encoding/decoding for accounts."""
 
 import enum
+from typing import Iterable, List, Tuple
 
 from .constants import HASH_SIZE
 
@@ -15,48 +16,50 @@ class AccountFieldSet(enum.IntFlag):
     CODE_HASH = 8
     STORAGE_ROOT = 16
 
+# The indexes of the decoded fields, integer ones first
+NONCE_FIELD, BALANCE_FIELD, INCARNATION_FIELD, CODE_HASH_FIELD = range(4)
+
+DECODED_FIELD_FLAGS: Tuple[AccountFieldSet, ...] = (
+    AccountFieldSet.NONCE, AccountFieldSet.BALANCE, AccountFieldSet.INCARNATION, AccountFieldSet.CODE_HASH)
+
+# The ordered indexes of the decoded fields present in each fieldset
+FIELDSET_LAYOUTS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(field for field, flag in enumerate(DECODED_FIELD_FLAGS) if fieldset & flag)
+    for fieldset in range(AccountFieldSet.STORAGE_ROOT << 1))
+
+def decode_fields(account_bytes: bytes) -> List:
+    """ Decode the [nonce, balance, incarnation, code_hash] fields from serialized account_bytes."""
+    size = len(account_bytes)
+    if size == 0:
+        raise ValueError('zero length account_bytes')
+    fieldset = account_bytes[0]
+    if fieldset >= len(FIELDSET_LAYOUTS):
+        raise ValueError('invalid fieldset {}'.format(fieldset))
+    fields = [0, 0, 0, b'']
+    pos = 1
+    for field in FIELDSET_LAYOUTS[fieldset]:
+        if pos >= size:
+            raise ValueError('missing length at {}'.format(pos))
+        end = pos + 1 + account_bytes[pos]
+        if end > size:
+            raise ValueError('expected length ' + str(account_bytes[pos]) + ', actual ' + str(size - pos - 1))
+        value_bytes = account_bytes[pos + 1 : end]
+        fields[field] = bytes(value_bytes) if field == CODE_HASH_FIELD else int.from_bytes(value_bytes, 'big')
+        pos = end
+    return fields
+
 class Account:
     """ This class represents the blockchain account.
     """
+    __slots__ = ('nonce', 'balance', 'incarnation', 'code_hash', 'storage_root')
+
     @classmethod
     def from_storage(cls, account_bytes: bytes):
         """ Create an account from serialized account_bytes."""
-        if len(account_bytes) == 0:
-            raise ValueError('zero length account_bytes')
-
-        def read_next(pos: int, length: int) -> (int, bytes):
-            value_bytes = account_bytes[pos + 1 : pos + length + 1]
-            value_length = len(value_bytes)
-            if value_length != length:
-                raise ValueError('expected length ' + str(length) + ', actual ' + str(value_length))
-            return pos + length + 1, value_bytes
-
-        fieldset = AccountFieldSet(account_bytes[0])
-        pos = 1
-
-        nonce = 0
-        if fieldset & AccountFieldSet.NONCE:
-            pos, nonce_bytes = read_next(pos, account_bytes[pos])
-            nonce = int.from_bytes(nonce_bytes, 'big')
-
-        balance = 0
-        if fieldset & AccountFieldSet.BALANCE:
-            pos, balance_bytes = read_next(pos, account_bytes[pos])
-            balance = int.from_bytes(balance_bytes, 'big')
+        nonce, balance, incarnation, code_hash = decode_fields(account_bytes)
+        return cls(nonce, balance, incarnation, code_hash)
 
-        incarnation = 0
-        if fieldset & AccountFieldSet.INCARNATION:
-            pos, incarnation_bytes = read_next(pos, account_bytes[pos])
-            incarnation = int.from_bytes(incarnation_bytes, 'big')
-
-        code_hash = ''
-        if fieldset & AccountFieldSet.CODE_HASH:
-            pos, code_hash_bytes = read_next(pos, account_bytes[pos])
-            code_hash = code_hash_bytes.hex()
-
-        return Account(nonce, balance, incarnation, code_hash, '')
-
-    def __init__(self, nonce: int, balance: int, incarnation: int, code_hash: str, storage_root: str):
+    def __init__(self, nonce: int = 0, balance: int = 0, incarnation: int = 0, code_hash: bytes = b'', storage_root: bytes = b''):
         self.nonce = nonce
         self.balance = balance
         self.incarnation = incarnation
@@ -68,23 +71,20 @@ class Account:
         length = 1 # always 1 byte for fieldset
 
         if self.nonce > 0:
-            num_nonce_bytes = (self.nonce.bit_length() + 7) // 8
-            length += 1 + num_nonce_bytes
+            length += 1 + (self.nonce.bit_length() + 7) // 8
 
         if self.balance > 0:
-            num_balance_bytes = (self.balance.bit_length() + 7) // 8
-            length += 1 + num_balance_bytes
+            length += 1 + (self.balance.bit_length() + 7) // 8
 
         if self.incarnation > 0:
-            num_incarnation_bytes = (self.incarnation.bit_length() + 7) // 8
-            length += 1 + num_incarnation_bytes
+            length += 1 + (self.incarnation.bit_length() + 7) // 8
 
         if self.code_hash:
             length += 1 + HASH_SIZE
 
         return length
 
-    def to_storage(self, account_bytes: bytes) -> None:
+    def to_storage(self, account_bytes: bytearray) -> None:
         """ to_storage """
         if len(account_bytes) == 0:
             raise ValueError('zero length account_bytes')
@@ -94,42 +94,29 @@ class Account:
         fieldset = AccountFieldSet.NONE
         pos = 1
 
-        if self.nonce > 0:
-            fieldset = AccountFieldSet.NONCE
-            num_nonce_bytes = (self.nonce.bit_length() + 7) // 8
-            account_bytes[pos] = num_nonce_bytes
-            nonce = self.nonce
-            for i in range(num_nonce_bytes, 0, -1):
-                account_bytes[pos+i] = nonce
-                nonce >>= 8
-            pos += num_nonce_bytes + 1
-
-        if self.balance > 0:
-            fieldset |= AccountFieldSet.BALANCE
-            num_balance_bytes = (self.balance.bit_length() + 7) // 8
-            account_bytes[pos] = num_balance_bytes
-            pos += 1
-            account_bytes[pos : pos+num_balance_bytes] = self.balance.to_bytes(num_balance_bytes, 'big') # TBD: check
-            pos += num_balance_bytes
-
-        if self.incarnation > 0:
-            fieldset |= AccountFieldSet.INCARNATION
-            num_incarnation_bytes = (self.incarnation.bit_length() + 7) // 8
-            account_bytes[pos] = num_incarnation_bytes
-            incarnation = self.incarnation
-            for i in range(num_incarnation_bytes, 0, -1):
-                account_bytes[pos+i] = incarnation
-                incarnation >>= 8
-            pos += num_incarnation_bytes + 1
+        for flag, value in ((AccountFieldSet.NONCE, self.nonce), (AccountFieldSet.BALANCE, self.balance),
+                            (AccountFieldSet.INCARNATION, self.incarnation)):
+            if value > 0:
+                fieldset |= flag
+                num_value_bytes = (value.bit_length() + 7) // 8
+                account_bytes[pos] = num_value_bytes
+                account_bytes[pos+1 : pos+1+num_value_bytes] = value.to_bytes(num_value_bytes, 'big')
+                pos += num_value_bytes + 1
 
         if self.code_hash:
             fieldset |= AccountFieldSet.CODE_HASH
             account_bytes[pos] = HASH_SIZE
-            account_bytes[pos+1:] = bytes.fromhex(self.code_hash)
+            account_bytes[pos+1:] = self.code_hash
 
         account_bytes[0] = fieldset
 
     def __str__(self):
         beautify = (lambda v: v.hex() if isinstance(v, bytes) else v)
-        fields = tuple('{}={!r}'.format(k, beautify(v)) for k, v in self.__dict__.items())
+        fields = tuple('{}={!r}'.format(k, beautify(getattr(self, k))) for k in self.__slots__)
         return '({})'.format(", ".join(fields))
+
+def decode_accounts(buffers: Iterable[bytes]) -> List[Account]:
+    """ Decode the accounts serialized in the given buffers, None for the empty ones (i.e. missing accounts)."""
+    if buffers is None:
+        raise ValueError('buffers is null')
+    return [Account(*decode_fields(account_bytes)) if account_bytes else None for account_bytes in buffers]
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """The reader of chain state."""
 
+import asyncio
+
 import rlp
 
 from ..core import kvstore
@@ -77,3 +79,81 @@ class Blockchain:
             return sedes.decode_block_body(block_body_bytes)
         except rlp.exceptions.DecodingError:
             return None
+
+class AsyncBlockchain:
+    """ Blockchain for asyncio """
+    def __init__(self, database: kvstore.AsyncKV):
+        if database is None:
+            raise ValueError('database is null')
+        self.database = database
+
+    async def read_block_by_number(self, block_number: int) -> sedes.Block:
+        """ read_block_by_number """
+        block_hash_bytes = await self.read_canonical_block_hash(block_number)
+        if not block_hash_bytes:
+            return None
+        return await self.read_block(block_number, block_hash_bytes)
+
+    async def read_block_by_hash(self, block_hash_bytes: bytes) -> sedes.Block:
+        """ read_block_by_hash """
+        block_number = await self.read_canonical_block_number(block_hash_bytes)
+        if block_number is None:
+            return None
+        return await self.read_block(block_number, block_hash_bytes)
+
+    async def read_canonical_block_hash(self, block_number: int) -> bytes:
+        """ read_canonical_hash """
+        canonical_block_number = sedes.encode_canonical_block_number(block_number)
+        key, block_hash_bytes = await self.database.view().get(tables.BLOCK_HEADERS_LABEL, canonical_block_number)
+        if key != canonical_block_number:
+            return None
+        return block_hash_bytes
+
+    async def read_canonical_block_number(self, block_hash_bytes: bytes) -> bytes:
+        """ read_canonical_block_number """
+        key, block_number_bytes = await self.database.view().get(tables.BLOCK_HEADER_NUMBERS_LABEL, block_hash_bytes)
+        if key != block_hash_bytes:
+            return None
+        try:
+            return sedes.decode_block_number(block_number_bytes)
+        except rlp.exceptions.DeserializationError:
+            return None
+
+    async def read_block(self, block_number: int, block_hash_bytes: bytes) -> sedes.Block:
+        """ read_block """
+        encoded_block_key = sedes.encode_block_key(block_number, block_hash_bytes)
+        view = self.database.view()
+        (header_key, block_header_bytes), (body_key, block_body_bytes) = await asyncio.gather(
+            view.get(tables.BLOCK_HEADERS_LABEL, encoded_block_key),
+            view.get(tables.BLOCK_BODIES_LABEL, encoded_block_key),
+        )
+        if header_key != encoded_block_key or body_key != encoded_block_key:
+            return None
+        try:
+            block_header = sedes.decode_block_header(block_header_bytes)
+            block_body = sedes.decode_block_body(block_body_bytes)
+        except rlp.exceptions.DecodingError:
+            return None
+        return sedes.Block(block_header, block_body)
+
+    async def read_block_header(self, block_number: int, block_hash_bytes: bytes) -> sedes.BlockHeader:
+        """ read_block_header """
+        encoded_block_key = sedes.encode_block_key(block_number, block_hash_bytes)
+        key, block_header_bytes = await self.database.view().get(tables.BLOCK_HEADERS_LABEL, encoded_block_key)
+        if key != encoded_block_key:
+            return None
+        try:
+            return sedes.decode_block_header(block_header_bytes)
+        except rlp.exceptions.DecodingError:
+            return None
+
+    async def read_block_body(self, block_number: int, block_hash_bytes: bytes) -> sedes.BlockBody:
+        """ read_block_body """
+        encoded_block_key = sedes.encode_block_key(block_number, block_hash_bytes)
+        key, block_body_bytes = await self.database.view().get(tables.BLOCK_BODIES_LABEL, encoded_block_key)
+        if key != encoded_block_key:
+            return None
+        try:
+            return sedes.decode_block_body(block_body_bytes)
+        except rlp.exceptions.DecodingError:
+            return None
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 """The chain change sets."""
 
+import numpy as np
+
 from ..helpers import algo
 from .constants import ADDRESS_SIZE, INCARNATION_SIZE, HASH_SIZE
 
-# pylint: disable=cell-var-from-loop,too-many-locals,too-many-return-statements
+# pylint: disable=cell-var-from-loop,too-many-instance-attributes,too-many-locals,too-many-return-statements
 
 class Change:
     """ Represents a single value change. """
@@ -54,13 +56,30 @@ class AccountChangeSet:
         self.total_length = self.values_start + self.values_length
         if self.total_length > len(buffer):
             raise ValueError('buffer too short ({0} bytes, expected at least {1}'.format(len(buffer), self.total_length))
+        self.index = None
+
+    def build_index(self):
+        """ Build once the index from key to value span, so that next find calls are hash lookups."""
+        if self.index is None:
+            keys_end = 4 + self.num_changes * self.key_length
+            keys = (bytes(self.buffer[i : i + self.key_length]) for i in range(4, keys_end, self.key_length))
+            value_ends = np.frombuffer(self.buffer, dtype='>u4', count=self.num_changes, offset=keys_end).astype(np.int64)
+            value_ends += self.values_start
+            value_starts = np.concatenate(([self.values_start], value_ends))[:-1]
+            self.index = dict(zip(keys, zip(value_starts.tolist(), value_ends.tolist())))
+        return self
 
     def find(self, key: bytes) -> bytes:
         """ Find specified key in changeset buffer. """
-        find_key = (lambda i: key >= self.buffer[4 + i * self.key_length : 4 + (i + 1) * self.key_length])
+        if self.index is not None:
+            value_span = self.index.get(key)
+            return self.buffer[value_span[0] : value_span[1]] if value_span is not None else None
+
+        # Smallest index having key greater or equal than the searched one, like Go sort.Search (none if past the last one)
+        find_key = (lambda i: self.buffer[4 + i * self.key_length : 4 + (i + 1) * self.key_length] >= key)
         key_index = algo.binary_search(0, self.num_changes, find_key)
 
-        if key_index > self.num_changes:
+        if key_index >= self.num_changes:
             return None
         if key != self.buffer[4 + key_index * self.key_length : 4 + (key_index + 1) * self.key_length]:
             return None
@@ -95,43 +114,11 @@ class PlainAccountChangeSet(AccountChangeSet):
     def __init__(self, buffer: bytes):
         AccountChangeSet.__init__(self, buffer, ADDRESS_SIZE)
 
-def find_storage_value(buffer: bytes, index: int) -> bytes:
-    """ find_value """
-    num_of_unit8 = int.from_bytes(buffer[0 : 4], 'big')
-    num_of_unit16 = int.from_bytes(buffer[4 : 8], 'big')
-    num_of_unit32 = int.from_bytes(buffer[8 : 12], 'big')
-    len_of_vals_start_pointer = 12
-    vals_pointer = len_of_vals_start_pointer + num_of_unit8 + num_of_unit16*2 + num_of_unit32*4
-
-    len_of_val_start = 0
-    len_of_val_end = 0
-    if index < num_of_unit8:
-        len_of_val_end = int(buffer[len_of_vals_start_pointer+index])
-        if index > 0:
-            one = len_of_vals_start_pointer+index-1
-            len_of_val_start = int(buffer[len_of_vals_start_pointer+index-1])
-    elif index < num_of_unit8+num_of_unit16:
-        one = len_of_vals_start_pointer + (index-num_of_unit8) * 2 + num_of_unit8
-        len_of_val_end = int.from_bytes(buffer[one : one+2], 'big')
-        if index-1 < num_of_unit8:
-            len_of_val_start = int(buffer[len_of_vals_start_pointer+index-1])
-        else:
-            one = len_of_vals_start_pointer + (index-1)*2 - num_of_unit8
-            len_of_val_start = int.from_bytes(buffer[one : one+2], 'big')
-    elif index < num_of_unit8+num_of_unit16+num_of_unit32:
-        one = len_of_vals_start_pointer + num_of_unit8 + num_of_unit16*2 + (index-num_of_unit8-num_of_unit16)*4
-        len_of_val_end = int.from_bytes(buffer[one : one+4], 'big')
-        if index-1 < num_of_unit8+num_of_unit16:
-            one = len_of_vals_start_pointer + (index-1)*2 - num_of_unit8
-            len_of_val_start = int.from_bytes(buffer[one : one+2], 'big')
-        else:
-            one = len_of_vals_start_pointer + num_of_unit8 + num_of_unit16*2 + (index-1-num_of_unit8-num_of_unit16)*4
-            len_of_val_start = int.from_bytes(buffer[one : one+4], 'big')
-
-    return buffer[vals_pointer+len_of_val_start : vals_pointer+len_of_val_end]
-
 class StorageChangeSet:
-    """ This class represents a single change-set for storage. """
+    """ This class represents a single change-set for storage.
+        The buffer is decoded once into columns (addresses with key ranges, incarnations, keys, value offsets)
+        viewing the buffer without copying, so lookups and iteration never slice the values region.
+    """
     DEFAULT_INCARNATION = 1
 
     def __init__(self, buffer: bytes, key_prefix_length: int):
@@ -144,11 +131,62 @@ class StorageChangeSet:
         self.key_prefix_length = key_prefix_length
         self.num_unique_elements = int.from_bytes(self.buffer[:4], 'big')
         incarnations_info = 4 + self.num_unique_elements * (self.key_prefix_length + 4)
-        num_of_elements = int.from_bytes(self.buffer[incarnations_info - 4 : incarnations_info], 'big')
+        self.num_elements = int.from_bytes(self.buffer[incarnations_info - 4 : incarnations_info], 'big')
         self.num_of_not_default_incarnations = int.from_bytes(self.buffer[incarnations_info : incarnations_info + 4], 'big')
         self.incarnations_start = incarnations_info + 4
         self.keys_start = self.incarnations_start + self.num_of_not_default_incarnations * 12
-        self.vals_info_start = self.keys_start + num_of_elements * HASH_SIZE
+        self.vals_info_start = self.keys_start + self.num_elements * HASH_SIZE
+
+        address_dtype = np.dtype([('address', 'S{}'.format(self.key_prefix_length)), ('end', '>u4')])
+        if self.num_unique_elements == 0:
+            # Empty change sets may lack the incarnations and values info (e.g. just the 4-byte count)
+            self.addresses = np.empty(0, dtype=address_dtype['address'])
+            self.key_starts = self.key_ends = np.empty(0, dtype=np.int64)
+            self.incarnations = np.empty(0, dtype=np.uint64)
+            self.keys = np.empty(0, dtype='S{}'.format(HASH_SIZE))
+            self.values_start = self.vals_info_start
+            self.value_starts = self.value_ends = np.empty(0, dtype=np.int64)
+            return
+
+        address_table = np.frombuffer(self.buffer, dtype=address_dtype, count=self.num_unique_elements, offset=4)
+        self.addresses = address_table['address']
+        self.key_ends = address_table['end'].astype(np.int64)
+        self.key_starts = np.concatenate(([0], self.key_ends))[:-1].astype(np.int64)
+
+        incarnation_dtype = np.dtype([('index', '>u4'), ('incarnation', '>u8')])
+        incarnation_table = np.frombuffer(self.buffer, dtype=incarnation_dtype, count=self.num_of_not_default_incarnations,
+                                          offset=self.incarnations_start)
+        self.incarnations = np.full(self.num_unique_elements, StorageChangeSet.DEFAULT_INCARNATION, dtype=np.uint64)
+        self.incarnations[incarnation_table['index']] = incarnation_table['incarnation']
+
+        self.keys = np.frombuffer(self.buffer, dtype='S{}'.format(HASH_SIZE), count=self.num_elements, offset=self.keys_start)
+
+        num_of_uint8, num_of_uint16, num_of_uint32 = np.frombuffer(self.buffer, dtype='>u4', count=3, offset=self.vals_info_start)
+        offsets_start = self.vals_info_start + 12
+        value_ends = np.concatenate((
+            np.frombuffer(self.buffer, dtype='>u1', count=num_of_uint8, offset=offsets_start),
+            np.frombuffer(self.buffer, dtype='>u2', count=num_of_uint16, offset=offsets_start + num_of_uint8),
+            np.frombuffer(self.buffer, dtype='>u4', count=num_of_uint32, offset=offsets_start + num_of_uint8 + 2 * num_of_uint16),
+        )).astype(np.int64)
+        if len(value_ends) != self.num_elements:
+            raise ValueError('value count {0} does not match key count {1}'.format(len(value_ends), self.num_elements))
+        self.values_start = offsets_start + int(num_of_uint8) + 2 * int(num_of_uint16) + 4 * int(num_of_uint32)
+        self.value_ends = value_ends + self.values_start
+        self.value_starts = np.concatenate(([self.values_start], self.value_ends))[:-1].astype(np.int64)
+
+    def address(self, address_index: int) -> bytes:
+        """ Return the address (or key prefix) at the given index."""
+        address_start = 4 + address_index * (4 + self.key_prefix_length)
+        return bytes(self.buffer[address_start : address_start + self.key_prefix_length])
+
+    def key(self, index: int) -> bytes:
+        """ Return the storage key at the given index."""
+        key_start = self.keys_start + HASH_SIZE * index
+        return bytes(self.buffer[key_start : key_start + HASH_SIZE])
+
+    def value(self, index: int) -> bytes:
+        """ Return the storage value at the given index."""
+        return bytes(self.buffer[self.value_starts[index] : self.value_ends[index]])
 
     def find(self, key: bytes) -> bytes:
         """ Find specified key in changeset buffer. """
@@ -156,79 +194,26 @@ class StorageChangeSet:
         key_to_find = key[self.key_prefix_length + INCARNATION_SIZE : self.key_prefix_length + INCARNATION_SIZE + HASH_SIZE]
         incarnation = int.from_bytes(key[self.key_prefix_length : self.key_prefix_length + INCARNATION_SIZE], 'big')
 
-        find_addr = (lambda i:\
-            self.buffer[4+i*(4+self.key_prefix_length) : 4+i*(4+self.key_prefix_length)+self.key_prefix_length] >= address_to_find)
-        address_index = algo.binary_search(0, self.num_unique_elements, find_addr)
-
-        if address_index > self.num_unique_elements:
+        address_index = int(np.searchsorted(self.addresses, np.bytes_(address_to_find)))
+        if address_index == self.num_unique_elements or self.address(address_index) != address_to_find:
             return None
-        address_start = 4 + address_index * (4 + self.key_prefix_length)
-        if address_to_find != self.buffer[address_start : address_start + self.key_prefix_length]:
+        if incarnation > 0 and int(self.incarnations[address_index]) != incarnation:
             return None
 
-        if incarnation > 0:
-            find_incarnation = (lambda i: int.from_bytes(\
-                self.buffer[self.incarnations_start + 12 * i : self.incarnations_start + 12 * i + 4], 'big') >= address_index)
-            inc_index = algo.binary_search(0, self.num_of_not_default_incarnations, find_incarnation)
-
-            found_incarnation = StorageChangeSet.DEFAULT_INCARNATION
-            address_index_start = self.incarnations_start + 12 * inc_index
-            found_address_index = int.from_bytes(self.buffer[address_index_start : address_index_start + 4], 'big')
-            if inc_index < self.num_of_not_default_incarnations and found_address_index == address_index:
-                found_inc_start = self.incarnations_start + 12 * inc_index + 4
-                found_incarnation = int.from_bytes(self.buffer[found_inc_start : found_inc_start + INCARNATION_SIZE], 'big')
-            if found_incarnation != incarnation:
-                return None
-
-        from_index = 0
-        from_index_end = 4 + address_index * (self.key_prefix_length + 4)
-        if address_index > 0:
-            from_index = int.from_bytes(self.buffer[from_index_end - 4 : from_index_end], 'big')
-        to_index_start = from_index_end + self.key_prefix_length
-        to_index = int.from_bytes(self.buffer[to_index_start : to_index_start + 4], 'big')
-
-        find_key = (lambda i:\
-            self.buffer[self.keys_start + HASH_SIZE * (from_index + i) : self.keys_start + HASH_SIZE * (from_index + i) + HASH_SIZE] >=\
-                key_to_find)
-        key_index = algo.binary_search(0, to_index - from_index, find_key)
-        index = from_index + key_index
-
-        if index > to_index:
-            return None
-        key_start = self.keys_start + HASH_SIZE * index
-        if key_to_find != self.buffer[key_start : key_start + HASH_SIZE]:
+        from_index, to_index = int(self.key_starts[address_index]), int(self.key_ends[address_index])
+        index = from_index + int(np.searchsorted(self.keys[from_index:to_index], np.bytes_(key_to_find)))
+        if index == to_index or self.key(index) != key_to_find:
             return None
 
-        return find_storage_value(self.buffer[self.vals_info_start:], index)
+        return self.value(index)
 
     def __iter__(self):
         for i in range(self.num_unique_elements):
-            address = self.buffer[4+i*(4+self.key_prefix_length) : 4+i*(4+self.key_prefix_length)+self.key_prefix_length]
-
-            find_incarnation = (lambda j: int.from_bytes(\
-                self.buffer[self.incarnations_start + 12 * j : self.incarnations_start + 12 * j + 4], 'big') >= i)
-            inc_index = algo.binary_search(0, self.num_of_not_default_incarnations, find_incarnation)
-            if inc_index > self.num_of_not_default_incarnations:
-                incarnation = StorageChangeSet.DEFAULT_INCARNATION
-            else:
-                incarnation_start = self.incarnations_start + 12 * inc_index
-                incarnation = int.from_bytes(self.buffer[incarnation_start : incarnation_start + 4], 'big')
-
-            from_index = 0
-            from_index_end = 4 + i * (self.key_prefix_length + 4)
-            if i > 0:
-                from_index = int.from_bytes(self.buffer[from_index_end - 4 : from_index_end], 'big')
-            to_index_start = from_index_end + self.key_prefix_length
-            to_index = int.from_bytes(self.buffer[to_index_start : to_index_start + 4], 'big')
-
             change_set = ChangeSet()
-            for k in range(to_index - from_index):
-                index = from_index + k
-                key = self.buffer[self.keys_start + HASH_SIZE * index : self.keys_start + HASH_SIZE * index + HASH_SIZE]
-                value = find_storage_value(self.buffer[self.vals_info_start:], index)
-                change_set.add(Change(key, value))
+            for index in range(int(self.key_starts[i]), int(self.key_ends[i])):
+                change_set.add(Change(self.key(index), self.value(index)))
 
-            yield address.hex(), incarnation, change_set
+            yield self.address(i).hex(), int(self.incarnations[i]), change_set
 
     def __str__(self):
         return 'change_set(' + str(self.num_unique_elements) + ')'
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""The cache of decoded change sets."""
+
+import threading
+from typing import Dict, Iterable, List, Tuple, Union
+
+from . import changeset
+from . import kvstore
+from ..helpers import cache
+from ..helpers.dbutils import tables, timestamp
+from ..stagedsync import stages
+
+DEFAULT_MAX_SIZE: int = 64 * 1024 * 1024
+
+# Change sets of the blocks closer than this to the head may still be rewritten by an unwind
+DEFAULT_FINALITY_DEPTH: int = 64
+
+# Zero counts and lengths, decoded as no changes by both the account and the storage change set
+EMPTY_CHANGE_SET_DATA: bytes = bytes(20)
+
+ChangeSet = Union[changeset.PlainAccountChangeSet, changeset.PlainStorageChangeSet]
+
+CHANGE_SET_TYPES: Dict[str, type] = {
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: changeset.PlainAccountChangeSet,
+    tables.PLAIN_STORAGE_CHANGE_SET_LABEL: changeset.PlainStorageChangeSet,
+}
+
+class ChangeSetCache:
+    """ This class represents a thread-safe LRU cache of the PLAIN change sets decoded from the KV.
+        Entries are keyed by (bucket, encoded block number) and bounded by the total size of their buffers.
+        Only the change sets at least finality_depth blocks behind the head are cached, so they never change once cached.
+        Account change sets are indexed when cached, so that repeated lookups are hash lookups.
+    """
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, finality_depth: int = DEFAULT_FINALITY_DEPTH):
+        if finality_depth is None or finality_depth < 0:
+            raise ValueError('finality_depth is null or negative')
+        self.lru_cache = cache.LRUCache(max_size)
+        self.finality_depth = finality_depth
+
+    def get(self, view: kvstore.View, bucket_name: str, block_number: int) -> ChangeSet:
+        """ Get the change set of the given block in bucket, reading and decoding it from view if not cached."""
+        change_set_key = timestamp.encode_timestamp(block_number)
+        change_set = self.lru_cache.get((bucket_name, change_set_key))
+        if change_set is None:
+            key, change_set_data = view.get(bucket_name, change_set_key)
+            change_set = self.decode(bucket_name, change_set_key, key, change_set_data)
+            if key == change_set_key and self.is_final(view, block_number):
+                self.store(bucket_name, change_set_key, change_set)
+        return change_set
+
+    def get_many(self, view: kvstore.View, bucket_name: str, block_numbers: Iterable[int]) -> List[ChangeSet]:
+        """ Get the change sets of the given blocks in bucket in the same order, reading all the missing ones in one batch."""
+        block_numbers = list(block_numbers)
+        change_set_keys = [timestamp.encode_timestamp(block_number) for block_number in block_numbers]
+        change_sets = [self.lru_cache.get((bucket_name, change_set_key)) for change_set_key in change_set_keys]
+        misses = [i for i, change_set in enumerate(change_sets) if change_set is None]
+        if misses:
+            pairs = view.get_many(bucket_name, [change_set_keys[i] for i in misses])
+            final_block_number = self.final_block_number(view)
+            for i, (key, change_set_data) in zip(misses, pairs):
+                change_sets[i] = self.decode(bucket_name, change_set_keys[i], key, change_set_data)
+                if key == change_set_keys[i] and block_numbers[i] <= final_block_number:
+                    self.store(bucket_name, change_set_keys[i], change_sets[i])
+        return change_sets
+
+    async def get_async(self, view: kvstore.AsyncView, bucket_name: str, block_number: int) -> ChangeSet:
+        """ Get the change set of the given block in bucket, reading and decoding it from view if not cached, for asyncio."""
+        change_set_key = timestamp.encode_timestamp(block_number)
+        change_set = self.lru_cache.get((bucket_name, change_set_key))
+        if change_set is None:
+            key, change_set_data = await view.get(bucket_name, change_set_key)
+            change_set = self.decode(bucket_name, change_set_key, key, change_set_data)
+            if key == change_set_key:
+                stage_pair = await view.get(tables.SYNC_STAGE_PROGRESS_LABEL, stages.SyncStage.FINISH.value)
+                if block_number <= self.final_block_number_of(stage_pair):
+                    self.store(bucket_name, change_set_key, change_set)
+        return change_set
+
+    def is_final(self, view: kvstore.View, block_number: int) -> bool:
+        """ Return true if the given block is at least finality_depth blocks behind the head."""
+        return block_number <= self.final_block_number(view)
+
+    def final_block_number(self, view: kvstore.View) -> int:
+        """ Return the number of the latest block at least finality_depth blocks behind the head (negative if none)."""
+        return self.final_block_number_of(view.get(tables.SYNC_STAGE_PROGRESS_LABEL, stages.SyncStage.FINISH.value))
+
+    def final_block_number_of(self, stage_pair: Tuple[bytes, bytes]) -> int:
+        """ Return the number of the latest block at least finality_depth blocks behind the head read as stage_pair."""
+        stage_key, stage_data = stage_pair
+        if stage_key != stages.SyncStage.FINISH.value:
+            return -1
+        head_block_number, _ = stages.unmarshal_data(stage_data)
+        return head_block_number - self.finality_depth
+
+    @staticmethod
+    def decode(bucket_name: str, change_set_key: bytes, key: bytes, change_set_data: bytes) -> ChangeSet:
+        """ Decode the change set data read from bucket at key, as no changes if key does not match change_set_key."""
+        change_set_type = CHANGE_SET_TYPES.get(bucket_name)
+        if change_set_type is None:
+            raise ValueError('bucket_name is not a change set bucket: {}'.format(bucket_name))
+        change_set = change_set_type(change_set_data if key == change_set_key else EMPTY_CHANGE_SET_DATA)
+        if isinstance(change_set, changeset.AccountChangeSet):
+            change_set.build_index()
+        return change_set
+
+    def store(self, bucket_name: str, change_set_key: bytes, change_set: ChangeSet) -> None:
+        """ Cache the change set decoded from bucket."""
+        self.lru_cache.put((bucket_name, change_set_key), change_set, len(change_set.buffer))
+
+    def clear(self) -> None:
+        """ Remove all the cached change sets."""
+        self.lru_cache.clear()
+
+    def __len__(self):
+        return len(self.lru_cache)
+
+_DEFAULT_CHANGE_SET_CACHE: ChangeSetCache = None
+_DEFAULT_CHANGE_SET_CACHE_LOCK = threading.Lock()
+
+def default_change_set_cache() -> ChangeSetCache:
+    """ Get the process-wide change set cache, creating it at first use."""
+    global _DEFAULT_CHANGE_SET_CACHE # pylint: disable=global-statement
+    with _DEFAULT_CHANGE_SET_CACHE_LOCK:
+        if _DEFAULT_CHANGE_SET_CACHE is None:
+            _DEFAULT_CHANGE_SET_CACHE = ChangeSetCache()
+        return _DEFAULT_CHANGE_SET_CACHE
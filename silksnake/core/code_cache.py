@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""The content-addressed cache of contract code."""
+
+import os
+import tempfile
+import threading
+
+from . import kvstore
+from ..helpers import cache, hashing
+from ..helpers.dbutils import tables
+
+DEFAULT_MAX_SIZE: int = 64 * 1024 * 1024
+EMPTY_CODE_HASH: bytes = hashing.bytes_to_hash(b'')
+
+class CodeCache:
+    """ This class represents a thread-safe cache of contract code keyed by code hash, i.e. the keccak256 digest of the code.
+        Code never changes for a given hash, so the entries have no expiration and may be shared by any number of processes
+        when persisted in directory (one file per hash, written atomically). Codes are checked against their hash
+        before being cached, so a corrupted file or a wrong KV value is never served.
+    """
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, directory: str = None):
+        self.lru_cache = cache.LRUCache(max_size)
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, view: kvstore.View, code_hash: bytes) -> bytes:
+        """ Get the code having the given hash, reading it from the CODE bucket in view if not cached (None if missing)."""
+        if code_hash is None:
+            raise ValueError('code_hash is null')
+        code = self.lookup(code_hash)
+        if code is None:
+            key, code = view.get(tables.CODE_LABEL, code_hash)
+            if key != code_hash:
+                return None
+            code = self.store(code_hash, code)
+        return code
+
+    def lookup(self, code_hash: bytes) -> bytes:
+        """ Get the cached code having the given hash from memory, then from directory if any (None if missing)."""
+        if code_hash == EMPTY_CODE_HASH:
+            return b''
+        code = self.lru_cache.get(code_hash)
+        if code is None and self.directory is not None:
+            try:
+                with open(self.path(code_hash), 'rb') as code_file:
+                    code = code_file.read()
+            except FileNotFoundError:
+                return None
+            if hashing.bytes_to_hash(code) != code_hash:
+                return None
+            self.lru_cache.put(code_hash, code, len(code_hash) + len(code))
+        return code
+
+    def store(self, code_hash: bytes, code: bytes) -> bytes:
+        """ Cache the given code having the given hash in memory and in directory if any, returning the code."""
+        code = bytes(code)
+        if hashing.bytes_to_hash(code) != code_hash:
+            raise ValueError('code does not match code hash {}'.format(code_hash.hex()))
+        self.lru_cache.put(code_hash, code, len(code_hash) + len(code))
+        if self.directory is not None and not os.path.exists(self.path(code_hash)):
+            code_directory = os.path.dirname(self.path(code_hash))
+            os.makedirs(code_directory, exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(dir=code_directory)
+            try:
+                with os.fdopen(descriptor, 'wb') as code_file:
+                    code_file.write(code)
+                os.replace(temporary_path, self.path(code_hash))
+            except OSError:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+        return code
+
+    def path(self, code_hash: bytes) -> str:
+        """ Return the path of the file holding the code having the given hash in directory."""
+        code_hash_hex = code_hash.hex()
+        return os.path.join(self.directory, code_hash_hex[:2], code_hash_hex)
+
+    def clear(self) -> None:
+        """ Remove all the entries from memory, keeping the files in directory."""
+        self.lru_cache.clear()
+
+    def __len__(self):
+        return len(self.lru_cache)
+
+_DEFAULT_CODE_CACHE: CodeCache = None
+_DEFAULT_CODE_CACHE_LOCK = threading.Lock()
+
+def default_code_cache() -> CodeCache:
+    """ Get the process-wide code cache, creating it at first use."""
+    global _DEFAULT_CODE_CACHE # pylint: disable=global-statement
+    with _DEFAULT_CODE_CACHE_LOCK:
+        if _DEFAULT_CODE_CACHE is None:
+            _DEFAULT_CODE_CACHE = CodeCache()
+        return _DEFAULT_CODE_CACHE
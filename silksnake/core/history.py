@@ -3,66 +3,250 @@
 
 # pylint: disable=too-many-branches,too-many-locals
 
+from typing import Iterator, List, Sequence, Tuple
+
 from . import account
 from . import changeset
+from . import changeset_cache
 from . import kvstore
 from . import history_index
-from ..helpers import hashing
 from ..helpers.dbutils import composite_keys, tables, timestamp
 
 from .constants import ADDRESS_SIZE, BLOCK_NUMBER_SIZE, HASH_SIZE
 
-def get_as_of(database: kvstore.KV, storage: bool, key: bytes, block_number: int) -> bytes:
+DEFAULT_HISTORY_BATCH_SIZE: int = 256
+MAX_BLOCK_NUMBER: int = (1 << 64) - 1
+
+def get_as_of(database: kvstore.KV, storage: bool, key: bytes, block_number: int,
+              change_set_cache: changeset_cache.ChangeSetCache = None) -> bytes:
     """get_as_of"""
     view = database.view()
 
-    value = find_by_history(view, storage, key, block_number)
+    value = find_by_history(view, storage, key, block_number, change_set_cache)
     if value is None:
         _, value = view.get(tables.PLAIN_STATE_LABEL, key)
     return value
 
-def find_by_history(view: kvstore.View, storage: bool, key: bytes, block_number: int) -> (bytes, bytes):
-    """find_by_history"""
-    if storage:
-        bucket = tables.STORAGE_HISTORY_LABEL
+def find_by_history(view: kvstore.View, storage: bool, key: bytes, block_number: int,
+                    change_set_cache: changeset_cache.ChangeSetCache = None) -> (bytes, bytes):
+    """ Return the value of key as of block_number found in history (None if not found).
+        The change set is read from change_set_cache if given, otherwise it is fetched and decoded at each call.
+    """
+    index_chunck_key = history_index.index_chunck_key(key, block_number)
+    k, value = view.cursor(history_bucket(storage)).seek(index_chunck_key)
+    change_set_block = find_change_set_block(storage, key, block_number, k, value)
+    if change_set_block is None:
+        return None
+
+    if change_set_cache is not None:
+        data = change_set_cache.get(view, change_set_bucket(storage), change_set_block).find(key)
     else:
-        bucket = tables.ACCOUNTS_HISTORY_LABEL
+        change_set_key = timestamp.encode_timestamp(change_set_block)
+        _, change_set_data = view.get(change_set_bucket(storage), change_set_key)
+        data = find_in_change_set(storage, change_set_data, key)
+
+    if not storage and data:
+        acc = account.Account.from_storage(data)
+        if needs_code_hash(acc):
+            _, code_hash = view.get(tables.PLAIN_CONTRACT_CODE_LABEL, composite_keys.create_storage_prefix(key, acc.incarnation))
+            data = restore_code_hash(acc, code_hash)
+
+    return data
+
+def get_many_as_of(database: kvstore.KV, storage: bool, keys: Sequence[bytes], block_number: int,
+                   change_set_cache: changeset_cache.ChangeSetCache = None) -> List[bytes]:
+    """ Return the values of the given keys as of block_number in the same order, like get_as_of for each key.
+        The lookups are staged on one view: index chunck seeks, de-duplicated change set fetches, plain state fallbacks.
+    """
+    view = database.view()
+
+    values = find_many_by_history(view, storage, keys, block_number, change_set_cache)
+    misses = [i for i, value in enumerate(values) if value is None]
+    if misses:
+        pairs = view.get_many(tables.PLAIN_STATE_LABEL, [keys[i] for i in misses])
+        for i, (_, value) in zip(misses, pairs):
+            values[i] = value
+    return values
+
+def find_many_by_history(view: kvstore.View, storage: bool, keys: Sequence[bytes], block_number: int,
+                         change_set_cache: changeset_cache.ChangeSetCache = None) -> List[bytes]:
+    """ Return the values of the given keys as of block_number found in history (None if not found) in the same order.
+        Each change set is fetched and parsed once, however many keys it holds.
+    """
+    if keys is None:
+        raise ValueError('keys is null')
+    keys = list(keys)
+    index_chunck_keys = [history_index.index_chunck_key(key, block_number) for key in keys]
+    chuncks = view.get_many(history_bucket(storage), index_chunck_keys)
+    change_set_blocks = [find_change_set_block(storage, key, block_number, k, value) for key, (k, value) in zip(keys, chuncks)]
+
+    unique_blocks = sorted({block for block in change_set_blocks if block is not None})
+    change_sets = read_change_sets(view, storage, unique_blocks, change_set_cache)
+
+    values = [None if block is None else change_sets[block].find(key) for key, block in zip(keys, change_set_blocks)]
+
+    if not storage:
+        restore_many_code_hashes(view, keys, values)
+    return values
+
+def read_change_sets(view: kvstore.View, storage: bool, blocks: Sequence[int],
+                     change_set_cache: changeset_cache.ChangeSetCache = None) -> dict:
+    """ Return the decoded change sets of the given unique blocks as {block: change set}, reading the missing ones in one batch."""
+    if change_set_cache is not None:
+        return dict(zip(blocks, change_set_cache.get_many(view, change_set_bucket(storage), blocks)))
+    change_set_keys = [timestamp.encode_timestamp(block) for block in blocks]
+    change_set_pairs = view.get_many(change_set_bucket(storage), change_set_keys) if change_set_keys else []
+    return {block: parse_change_set(storage, data) for block, (_, data) in zip(blocks, change_set_pairs)}
+
+def iter_account_history(view: kvstore.View, address: bytes, from_block: int = 0, to_block: int = None,
+                         change_set_cache: changeset_cache.ChangeSetCache = None,
+                         batch_size: int = DEFAULT_HISTORY_BATCH_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """ Yield the (block_number, value_before) versions of the account changed in [from_block, to_block) in block order.
+        value_before is the encoded account before the change at block_number (empty if the account did not exist).
+    """
+    return iter_history(view, False, address, from_block, to_block, change_set_cache, batch_size)
+
+def iter_storage_history(view: kvstore.View, address: bytes, incarnation: int, location: bytes, from_block: int = 0,
+                         to_block: int = None, change_set_cache: changeset_cache.ChangeSetCache = None,
+                         batch_size: int = DEFAULT_HISTORY_BATCH_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """ Yield the (block_number, value_before) versions of the storage location changed in [from_block, to_block) in block order."""
+    storage_key = composite_keys.create_plain_composite_storage_key(address, incarnation, location)
+    return iter_history(view, True, storage_key, from_block, to_block, change_set_cache, batch_size)
+
+def iter_history(view: kvstore.View, storage: bool, key: bytes, from_block: int, to_block: int,
+                 change_set_cache: changeset_cache.ChangeSetCache, batch_size: int) -> Iterator[Tuple[int, bytes]]:
+    """ Yield the (block_number, value_before) versions of key, fetching the change sets in batches of batch_size blocks."""
+    if from_block is None or from_block < 0:
+        raise ValueError('from_block is null or negative')
+    if batch_size is None or batch_size <= 0:
+        raise ValueError('batch_size is null or not positive')
+    batch = []
+    for block_number, is_set in iter_history_blocks(view, storage, key, from_block, to_block):
+        batch.append((block_number, is_set))
+        if len(batch) == batch_size:
+            yield from find_history_values(view, storage, key, batch, change_set_cache)
+            batch = []
+    if batch:
+        yield from find_history_values(view, storage, key, batch, change_set_cache)
+
+def iter_history_blocks(view: kvstore.View, storage: bool, key: bytes, from_block: int, to_block: int) -> Iterator[Tuple[int, bool]]:
+    """ Yield the (block_number, is_set) entries of the history index of key in [from_block, to_block), walking its chuncks."""
+    start_key = history_index.index_chunck_key(key, from_block)
+    prefix = start_key[:-BLOCK_NUMBER_SIZE]
+    end_block = to_block if to_block is not None else MAX_BLOCK_NUMBER
+    chuncks = view.cursor(history_bucket(storage)).with_prefix(prefix).range(start_key)
+    try:
+        for chunck_key, chunck in chuncks:
+            if not bytes(chunck_key).startswith(prefix):
+                break
+            index = history_index.HistoryIndex(chunck)
+            blocks, set_flags = index.blocks_in_range(from_block, end_block)
+            yield from zip(blocks.tolist(), set_flags.tolist())
+            last_block, _ = index.last_element()
+            if last_block + 1 >= end_block:
+                break
+    finally:
+        chuncks.close()
+
+def find_history_values(view: kvstore.View, storage: bool, key: bytes, blocks: Sequence[Tuple[int, bool]],
+                        change_set_cache: changeset_cache.ChangeSetCache) -> List[Tuple[int, bytes]]:
+    """ Return the (block_number, value_before) versions of key at the given (block_number, is_set) history entries."""
+    # Set flag on account history means the account was created at that block, so there is no change set to read
+    needed_blocks = [block_number for block_number, is_set in blocks if storage or not is_set]
+    change_sets = read_change_sets(view, storage, needed_blocks, change_set_cache)
+    values = [change_sets[block_number].find(key) if block_number in change_sets else b'' for block_number, _ in blocks]
+    if not storage:
+        restore_many_code_hashes(view, [key] * len(values), values)
+    return [(block_number, value) for (block_number, _), value in zip(blocks, values)]
+
+def restore_many_code_hashes(view: kvstore.View, keys: Sequence[bytes], values: List[bytes]) -> None:
+    """ Restore in place the code hash of the history accounts missing it, fetching all of them at once."""
+    accounts = account.decode_accounts(values)
+    missing = [i for i, acc in enumerate(accounts) if acc is not None and needs_code_hash(acc)]
+    if not missing:
+        return
+    code_hash_keys = [composite_keys.create_storage_prefix(keys[i], accounts[i].incarnation) for i in missing]
+    for i, (_, code_hash) in zip(missing, view.get_many(tables.PLAIN_CONTRACT_CODE_LABEL, code_hash_keys)):
+        values[i] = restore_code_hash(accounts[i], code_hash)
 
+async def get_as_of_async(database: kvstore.AsyncKV, storage: bool, key: bytes, block_number: int,
+                          change_set_cache: changeset_cache.ChangeSetCache = None) -> bytes:
+    """get_as_of for asyncio"""
+    view = database.view()
+
+    value = await find_by_history_async(view, storage, key, block_number, change_set_cache)
+    if value is None:
+        _, value = await view.get(tables.PLAIN_STATE_LABEL, key)
+    return value
+
+async def find_by_history_async(view: kvstore.AsyncView, storage: bool, key: bytes, block_number: int,
+                                change_set_cache: changeset_cache.ChangeSetCache = None) -> (bytes, bytes):
+    """find_by_history for asyncio"""
     index_chunck_key = history_index.index_chunck_key(key, block_number)
+    k, value = await view.cursor(history_bucket(storage)).seek(index_chunck_key)
+    change_set_block = find_change_set_block(storage, key, block_number, k, value)
+    if change_set_block is None:
+        return None
+
+    if change_set_cache is not None:
+        change_set = await change_set_cache.get_async(view, change_set_bucket(storage), change_set_block)
+        data = change_set.find(key)
+    else:
+        change_set_key = timestamp.encode_timestamp(change_set_block)
+        _, change_set_data = await view.get(change_set_bucket(storage), change_set_key)
+        data = find_in_change_set(storage, change_set_data, key)
+
+    if not storage and data:
+        acc = account.Account.from_storage(data)
+        if needs_code_hash(acc):
+            code_hash_key = composite_keys.create_storage_prefix(key, acc.incarnation)
+            _, code_hash = await view.get(tables.PLAIN_CONTRACT_CODE_LABEL, code_hash_key)
+            data = restore_code_hash(acc, code_hash)
+
+    return data
+
+def history_bucket(storage: bool) -> str:
+    """history_bucket"""
+    return tables.STORAGE_HISTORY_LABEL if storage else tables.ACCOUNTS_HISTORY_LABEL
 
-    k, value = view.cursor(bucket).seek(index_chunck_key)
+def change_set_bucket(storage: bool) -> str:
+    """change_set_bucket"""
+    return tables.PLAIN_STORAGE_CHANGE_SET_LABEL if storage else tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL
+
+def find_change_set_block(storage: bool, key: bytes, block_number: int, chunck_key: bytes, chunck: bytes) -> int:
+    """ Return the block of the change set holding the value of key as of block_number from the given index chunck (if any)."""
     if storage:
-        if not k[:ADDRESS_SIZE] == key[:ADDRESS_SIZE] or not k[ADDRESS_SIZE:ADDRESS_SIZE+HASH_SIZE] == key[ADDRESS_SIZE+BLOCK_NUMBER_SIZE:]:
+        if not chunck_key[:ADDRESS_SIZE] == key[:ADDRESS_SIZE] or \
+            not chunck_key[ADDRESS_SIZE:ADDRESS_SIZE+HASH_SIZE] == key[ADDRESS_SIZE+BLOCK_NUMBER_SIZE:]:
             return None
     else:
-        if not key.startswith(k):
-            return None
-
-    change_set_block, is_set, found = history_index.HistoryIndex(value).search(block_number)
-    if found:
-        if is_set and not storage:
+        if not chunck_key.startswith(key):
             return None
-        change_set_bucket = tables.PLAIN_STORAGE_CHANGE_SET_LABEL if storage else tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL
-        change_set_key = timestamp.encode_timestamp(change_set_block)
-        _, change_set_data = view.get(change_set_bucket, change_set_key)
 
-        if storage:
-            data = changeset.PlainStorageChangeSet(change_set_data).find(key)
-        else:
-            data = changeset.PlainAccountChangeSet(change_set_data).find(key)
-    else:
+    change_set_block, is_set, found = history_index.HistoryIndex(chunck).search(block_number)
+    if not found or (is_set and not storage):
         return None
+    return change_set_block
 
-    if not storage:
-        acc = account.Account.from_storage(data)
-        if acc.incarnation > 0 and not acc.code_hash:
-            _, code_hash = view.get(tables.PLAIN_CONTRACT_CODE_LABEL, composite_keys.create_storage_prefix(key, acc.incarnation))
-            if not code_hash:
-                return None
-            if len(code_hash) > 0:
-                acc.code_hash = hashing.bytes_to_hash(code_hash)
-            data = bytearray(acc.length_for_storage())
-            acc.to_storage(data)
-            data = bytes(data)
+def find_in_change_set(storage: bool, change_set_data: bytes, key: bytes) -> bytes:
+    """find_in_change_set"""
+    return parse_change_set(storage, change_set_data).find(key)
 
-    return data
+def parse_change_set(storage: bool, change_set_data: bytes):
+    """ Return the PLAIN storage or account change set encoded in the given data."""
+    if storage:
+        return changeset.PlainStorageChangeSet(change_set_data)
+    return changeset.PlainAccountChangeSet(change_set_data)
+
+def needs_code_hash(acc: account.Account) -> bool:
+    """ Return true if the account from change set is a contract missing its code hash."""
+    return acc.incarnation > 0 and not acc.code_hash
+
+def restore_code_hash(acc: account.Account, code_hash: bytes) -> bytes:
+    """ Restore the code hash from PLAIN-contractCode into the account and return its storage encoding (None if missing)."""
+    if not code_hash:
+        return None
+    acc.code_hash = bytes(code_hash)
+    data = bytearray(acc.length_for_storage())
+    acc.to_storage(data)
+    return bytes(data)
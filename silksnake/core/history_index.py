@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """Some useful indeces of the chain data history."""
 
-from ..helpers import algo
+import numpy as np
+
 from .constants import ADDRESS_SIZE, BLOCK_NUMBER_SIZE, HASH_SIZE
 
 def index_chunck_key(key: bytes, block_number: int) -> bytes:
@@ -40,63 +41,48 @@ MIN_CHUNCK_SIZE = 8
 MAX_CHUNCK_SIZE = 1000
 
 class HistoryIndex:
-    """ HistoryIndex."""
+    """ HistoryIndex decoded at once into the array of block numbers and the array of set flags."""
     def __init__(self, buffer: bytes = bytearray(8)):
         self.buffer = buffer
         assert len(self.buffer) >= MIN_CHUNCK_SIZE, 'length is too small'
         assert (len(self.buffer) - MIN_CHUNCK_SIZE) % ITEM_LENGTH == 0, 'length is not 8 mod ITEM_LENGTH'
 
+        min_element = int.from_bytes(self.buffer[:MIN_CHUNCK_SIZE], 'big')
+        elements = np.frombuffer(self.buffer, dtype=np.uint8, offset=MIN_CHUNCK_SIZE).reshape(-1, ITEM_LENGTH)
+        deltas = ((elements[:, 0] & 0x7f).astype(np.uint64) << 16) | (elements[:, 1].astype(np.uint64) << 8) | elements[:, 2]
+        self.blocks = deltas + np.uint64(min_element)
+        self.set_flags = (elements[:, 0] & 0x80) != 0
+
     def length(self) -> int:
         """ length"""
-        return (len(self.buffer) - MIN_CHUNCK_SIZE) // ITEM_LENGTH
+        return len(self.blocks)
 
     def truncate_greater(self, lower: int):
         """ truncateGreater"""
-        assert len(self.buffer) >= MIN_CHUNCK_SIZE, 'length is too small'
-        assert (len(self.buffer) - MIN_CHUNCK_SIZE) % ITEM_LENGTH == 0, 'length is not 8 mod ITEM_LENGTH'
-
-        num_elements = (len(self.buffer) - MIN_CHUNCK_SIZE) // ITEM_LENGTH
-        min_element = int.from_bytes(self.buffer[:MIN_CHUNCK_SIZE], 'big')
-        elements = self.buffer[MIN_CHUNCK_SIZE:]
-        def greater_than_lower(i: int) -> bool:
-            offset = i * ITEM_LENGTH
-            return lower < min_element + (int(elements[offset]&0x7f)<<16) + (int(elements[offset+1])<<8) + int(elements[offset+2])
-
-        truncation_point = algo.binary_search(0, num_elements - 1, greater_than_lower)
-
+        truncation_point = int(np.searchsorted(self.blocks, lower, side='right'))
         return self.buffer[:MIN_CHUNCK_SIZE + truncation_point*ITEM_LENGTH]
 
     def search(self, value: int) -> (int, bool, bool):
         """ Search looks for the element which is equal or greater of given value. """
-        assert len(self.buffer) >= MIN_CHUNCK_SIZE, 'length is too small'
-        assert (len(self.buffer) - MIN_CHUNCK_SIZE) % ITEM_LENGTH == 0, 'length is not 8 mod ITEM_LENGTH'
-
-        num_elements = (len(self.buffer) - MIN_CHUNCK_SIZE) // ITEM_LENGTH
-        min_element = int.from_bytes(self.buffer[:MIN_CHUNCK_SIZE], 'big')
-        elements = self.buffer[MIN_CHUNCK_SIZE:]
-
-        def greater_than_or_equal_value(i: int) -> bool:
-            offset = i * ITEM_LENGTH
-            return value <= min_element + (int(elements[offset]&0x7f)<<16) + (int(elements[offset+1])<<8) + int(elements[offset+2])
-        idx = algo.binary_search(0, num_elements - 1, greater_than_or_equal_value) * ITEM_LENGTH
-        if idx == len(elements):
+        idx = int(np.searchsorted(self.blocks, value, side='left'))
+        if idx == len(self.blocks):
             return 0, False, False
+        return int(self.blocks[idx]), bool(self.set_flags[idx]), True
 
-        found_element = min_element + (int(elements[idx]&0x7f)<<16) + (int(elements[idx+1])<<8) + int(elements[idx+2])
-        return found_element, (elements[idx]&0x80) != 0, True
+    def blocks_in_range(self, start: int, end: int) -> (np.ndarray, np.ndarray):
+        """ Return the block numbers in [start, end) and their set flags."""
+        lower, upper = np.searchsorted(self.blocks, [start, end], side='left')
+        return self.blocks[lower:upper], self.set_flags[lower:upper]
 
     def last_element(self) -> (int, bool):
         """ last_element"""
-        num_elements = (len(self.buffer) - MIN_CHUNCK_SIZE) // ITEM_LENGTH
-        if num_elements == 0:
+        if len(self.blocks) == 0:
             return 0, False
-        min_element = int.from_bytes(self.buffer[:MIN_CHUNCK_SIZE], 'big')
-        elements = self.buffer
-        idx = MIN_CHUNCK_SIZE + (num_elements-1) * ITEM_LENGTH
-        found_element = min_element + (int(elements[idx]&0x7f)<<16) + (int(elements[idx+1])<<8) + int(elements[idx+2])
-        return found_element, (elements[idx]&0x80) != 0, True
+        return int(self.blocks[-1]), bool(self.set_flags[-1])
 
     def chunck_key(self, key: bytes):
         """ chunck_key"""
-        block_number = self.last_element()
-        return index_chunck_key(key, block_number) if block_number is not None else None
+        if len(self.blocks) == 0:
+            return None
+        block_number, _ = self.last_element()
+        return index_chunck_key(key, block_number)
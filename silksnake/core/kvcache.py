@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""The read-through caching and memoizing key-value (KV) stores."""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from . import kvstore
+from .changeset_cache import DEFAULT_FINALITY_DEPTH
+from .constants import HASH_SIZE
+from ..helpers import cache
+from ..helpers.dbutils import tables
+from ..stagedsync import stages
+
+BLOCK_NUMBER_SIZE: int = 8
+
+class CachePolicy:
+    """ This class represents the caching policy of one bucket.
+        Immutable buckets (no ttl) cache exact-key hits forever, mutable ones cache any seek result until ttl seconds elapse.
+        Keys shorter than min_key_size are never cached, e.g. to keep just the hash-addressed keys of a bucket.
+        If finality_depth is set, the keys start with the block number and the exact-key hits of the blocks at least
+        finality_depth blocks behind the head are cached forever, since no unwind can rewrite them anymore.
+    """
+    def __init__(self, max_size: int, ttl: float = None, min_key_size: int = 0, finality_depth: int = None):
+        if max_size is None or max_size < 0:
+            raise ValueError('max_size is null or negative')
+        if ttl is not None and ttl < 0:
+            raise ValueError('ttl is negative')
+        if min_key_size is None or min_key_size < 0:
+            raise ValueError('min_key_size is null or negative')
+        if finality_depth is not None and finality_depth < 0:
+            raise ValueError('finality_depth is negative')
+        self.max_size = max_size
+        self.ttl = ttl
+        self.min_key_size = min_key_size
+        self.finality_depth = finality_depth
+
+    @property
+    def immutable(self) -> bool:
+        """ Return true if the cached entries never change."""
+        return self.ttl is None
+
+MB: int = 1024 * 1024
+
+# Block number followed by block hash: the only keys whose value cannot change on reorg
+BLOCK_KEY_SIZE: int = 8 + HASH_SIZE
+
+# Buckets keyed by block number or address are rewritten on unwind, so they are cached just for about one block time, except
+# the change sets of the blocks past finality. Code hashes by address and incarnation carry no block number to tell when they
+# are final, but the code itself is keyed by its hash
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    tables.BLOCK_HEADERS_LABEL: CachePolicy(16 * MB, min_key_size=BLOCK_KEY_SIZE),
+    tables.BLOCK_BODIES_LABEL: CachePolicy(64 * MB, min_key_size=BLOCK_KEY_SIZE),
+    tables.CODE_LABEL: CachePolicy(16 * MB, min_key_size=HASH_SIZE),
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: CachePolicy(32 * MB, 12.0, finality_depth=DEFAULT_FINALITY_DEPTH),
+    tables.PLAIN_STORAGE_CHANGE_SET_LABEL: CachePolicy(64 * MB, 12.0, finality_depth=DEFAULT_FINALITY_DEPTH),
+    tables.PLAIN_CONTRACT_CODE_LABEL: CachePolicy(4 * MB, 12.0),
+    tables.PLAIN_STATE_LABEL: CachePolicy(32 * MB, 12.0),
+    tables.SYNC_STAGE_PROGRESS_LABEL: CachePolicy(MB // 16, 1.0),
+}
+
+class CachingCursor(kvstore.Cursor):
+    """ This class represents a read-only cursor on the caching KV.
+        Seeks are served from the bucket cache when bound to the default prefix, streaming always goes to the backing cursor.
+    """
+    def __init__(self, cursor: kvstore.Cursor, bucket_cache: cache.LRUCache, policy: CachePolicy, caching_view=None):
+        if cursor is None:
+            raise ValueError('cursor is null')
+        self.cursor = cursor
+        self.bucket_cache = bucket_cache
+        self.policy = policy
+        self.caching_view = caching_view
+        self.prefix = b''
+
+    def with_prefix(self, prefix: bytes):
+        """ Configure the cursor with the specified prefix."""
+        self.cursor.with_prefix(prefix)
+        self.prefix = prefix
+        return self
+
+    def enable_streaming(self, streaming: bool):
+        """ Configure the cursor with the specified streaming flag."""
+        self.cursor.enable_streaming(streaming)
+        return self
+
+    def cacheable(self) -> bool:
+        """ Return true if the seek results of this cursor can be cached."""
+        return self.bucket_cache is not None and not self.prefix
+
+    def lookup(self, key: bytes) -> (bytes, bytes):
+        """ Return the cached key-value pair for key (None if missing)."""
+        if not self.cacheable():
+            return None
+        return self.bucket_cache.get(key)
+
+    def store(self, key: bytes, pair: Tuple[bytes, bytes]) -> None:
+        """ Cache the key-value pair returned by seeking key, if allowed by the policy."""
+        if not self.cacheable() or len(key) < self.policy.min_key_size:
+            return
+        if self.policy.immutable and pair[0] != key:
+            return
+        expires = not self.policy.immutable and (pair[0] != key or not self.is_final(key))
+        self.bucket_cache.put(key, pair, len(key) + len(pair[0]) + len(pair[1]), expires)
+
+    def is_final(self, key: bytes) -> bool:
+        """ Return true if key starts with the number of a block past finality according to the policy."""
+        if self.policy.finality_depth is None or self.caching_view is None or len(key) < BLOCK_NUMBER_SIZE:
+            return False
+        block_number = int.from_bytes(key[:BLOCK_NUMBER_SIZE], 'big')
+        return block_number <= self.caching_view.final_block_number(self.policy.finality_depth)
+
+    def seek(self, key: bytes) -> (bytes, bytes):
+        """ Seek the value in the bucket associated to the specified key."""
+        if key is None:
+            raise ValueError('key is null')
+        pair = self.lookup(key)
+        if pair is None:
+            pair = tuple(self.cursor.seek(key))
+            self.store(key, pair)
+        return pair
+
+    def seek_exact(self, key: bytes) -> bytes:
+        """ Seek the value in the bucket associated to the specified key, matching key exactly."""
+        rsp_key, rsp_value = self.seek(key)
+        return rsp_value if rsp_key == key else None
+
+    def next(self, start_key: bytes = None) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        """ Get key-value streaming iterator for the bucket bound to prefix, starting at start_key if any."""
+        return self.cursor.next(start_key)
+
+    def range(self, start_key: bytes = None, end_key: bytes = None, limit: int = None,
+              reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        """ Get key-value iterator for the bucket bound to prefix in [start_key, end_key) range, stopping after limit pairs."""
+        return self.cursor.range(start_key, end_key, limit, reverse)
+
+    def key_sizes(self, start_key: bytes = None, end_key: bytes = None, limit: int = None) -> Iterator[Tuple[bytes, int]]:
+        """ Get key-value size iterator for the bucket bound to prefix in [start_key, end_key) range, without the values."""
+        return self.cursor.key_sizes(start_key, end_key, limit)
+
+class CachingView(kvstore.View):
+    """ This class represents a read-only view on the caching KV.
+    """
+    def __init__(self, view: kvstore.View, caching_kv):
+        if view is None:
+            raise ValueError('view is null')
+        self.view = view
+        self.caching_kv = caching_kv
+        self.head_block_number = None
+
+    def cursor(self, bucket_name: str) -> CachingCursor:
+        """ Create a new caching cursor on the KV."""
+        bucket_cache = self.caching_kv.caches.get(bucket_name)
+        policy = self.caching_kv.policies.get(bucket_name)
+        return CachingCursor(self.view.cursor(bucket_name), bucket_cache, policy, self)
+
+    def final_block_number(self, finality_depth: int) -> int:
+        """ Return the number of the latest block at least finality_depth blocks behind the head (negative if none).
+            The head is read once per view as the FINISH stage progress: a later head would just make more blocks final.
+        """
+        if self.head_block_number is None:
+            stage_key, stage_data = self.get(tables.SYNC_STAGE_PROGRESS_LABEL, stages.SyncStage.FINISH.value)
+            self.head_block_number = stages.unmarshal_data(stage_data)[0] if stage_key == stages.SyncStage.FINISH.value else -1
+        return self.head_block_number - finality_depth
+
+    def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
+        """ Get the value associated to the key in specified bucket."""
+        return self.cursor(bucket_name).seek(key)
+
+    def get_exact(self, bucket_name: str, key: bytes) -> bytes:
+        """ Get the value associated to the key in specified bucket, checking exact key match."""
+        return self.cursor(bucket_name).seek_exact(key)
+
+    def get_many(self, bucket_name: str, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs associated to the keys in specified bucket, fetching only the missing ones in one batch."""
+        if keys is None:
+            raise ValueError('keys is null')
+        keys = list(keys)
+        cursor = self.cursor(bucket_name)
+        pairs = [cursor.lookup(key) for key in keys]
+        missing_indexes = [i for i, pair in enumerate(pairs) if pair is None]
+        if missing_indexes:
+            missing_pairs = self.view.get_many(bucket_name, [keys[i] for i in missing_indexes])
+            for i, pair in zip(missing_indexes, missing_pairs):
+                pairs[i] = tuple(pair)
+                cursor.store(keys[i], pairs[i])
+        return pairs
+
+    def close(self) -> None:
+        """ Close the backing view, if closeable."""
+        if hasattr(self.view, 'close'):
+            self.view.close()
+
+class CachingKV(kvstore.KV):
+    """ This class represents a read-through caching KV store in front of any backing KV store.
+        Each bucket having a policy gets its own LRU cache bounded by size, shared by all the views.
+    """
+    def __init__(self, kv: kvstore.KV, policies: Dict[str, CachePolicy] = None):
+        if kv is None:
+            raise ValueError('kv is null')
+        self.kv = kv
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.caches = {bucket: cache.LRUCache(policy.max_size, policy.ttl) for bucket, policy in self.policies.items()}
+
+    def view(self) -> CachingView:
+        """ Get a read-only caching view on the KV."""
+        return CachingView(self.kv.view(), self)
+
+    def invalidate(self, bucket_name: str = None, key: bytes = None) -> None:
+        """ Drop the cached entry for key in bucket_name, all entries in bucket_name if no key or all entries if no bucket."""
+        if bucket_name is None:
+            for bucket_cache in self.caches.values():
+                bucket_cache.clear()
+            return
+        bucket_cache = self.caches.get(bucket_name)
+        if bucket_cache is None:
+            return
+        if key is None:
+            bucket_cache.clear()
+        else:
+            bucket_cache.invalidate(key)
+
+    def close(self) -> None:
+        """ Close the backing KV, if closeable."""
+        if hasattr(self.kv, 'close'):
+            self.kv.close()
+
+class MemoizingCursor(kvstore.Cursor):
+    """ This class represents a read-only cursor on the memoizing KV.
+        Seeks are memoized when bound to the default prefix, streaming always goes to the backing cursor.
+    """
+    def __init__(self, cursor: kvstore.Cursor, seeks: Dict[bytes, Tuple[bytes, bytes]]):
+        if cursor is None:
+            raise ValueError('cursor is null')
+        if seeks is None:
+            raise ValueError('seeks is null')
+        self.cursor = cursor
+        self.seeks = seeks
+        self.prefix = b''
+
+    def with_prefix(self, prefix: bytes):
+        """ Configure the cursor with the specified prefix."""
+        self.cursor.with_prefix(prefix)
+        self.prefix = prefix
+        return self
+
+    def enable_streaming(self, streaming: bool):
+        """ Configure the cursor with the specified streaming flag."""
+        self.cursor.enable_streaming(streaming)
+        return self
+
+    def seek(self, key: bytes) -> (bytes, bytes):
+        """ Seek the value in the bucket associated to the specified key."""
+        if key is None:
+            raise ValueError('key is null')
+        if self.prefix:
+            return self.cursor.seek(key)
+        pair = self.seeks.get(key)
+        if pair is None:
+            pair = self.seeks[key] = tuple(self.cursor.seek(key))
+        return pair
+
+    def seek_exact(self, key: bytes) -> bytes:
+        """ Seek the value in the bucket associated to the specified key, matching key exactly."""
+        rsp_key, rsp_value = self.seek(key)
+        return rsp_value if rsp_key == key else None
+
+    def next(self, start_key: bytes = None) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        """ Get key-value streaming iterator for the bucket bound to prefix, starting at start_key if any."""
+        return self.cursor.next(start_key)
+
+    def range(self, start_key: bytes = None, end_key: bytes = None, limit: int = None,
+              reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        """ Get key-value iterator for the bucket bound to prefix in [start_key, end_key) range, stopping after limit pairs."""
+        return self.cursor.range(start_key, end_key, limit, reverse)
+
+    def key_sizes(self, start_key: bytes = None, end_key: bytes = None, limit: int = None) -> Iterator[Tuple[bytes, int]]:
+        """ Get key-value size iterator for the bucket bound to prefix in [start_key, end_key) range, without the values."""
+        return self.cursor.key_sizes(start_key, end_key, limit)
+
+class MemoizingView(kvstore.View):
+    """ This class represents a read-only view memoizing all the seek results of the backing view in memory, by bucket.
+        Nothing is ever invalidated, so the view must live just for one request (or one batch of requests).
+    """
+    def __init__(self, view: kvstore.View):
+        if view is None:
+            raise ValueError('view is null')
+        self.view = view
+        self.seeks: Dict[str, Dict[bytes, Tuple[bytes, bytes]]] = {}
+
+    def cursor(self, bucket_name: str) -> MemoizingCursor:
+        """ Create a new memoizing cursor on the KV."""
+        return MemoizingCursor(self.view.cursor(bucket_name), self.seeks.setdefault(bucket_name, {}))
+
+    def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
+        """ Get the value associated to the key in specified bucket, reading it through the backing view get if new."""
+        if key is None:
+            raise ValueError('key is null')
+        bucket_seeks = self.seeks.setdefault(bucket_name, {})
+        pair = bucket_seeks.get(key)
+        if pair is None:
+            pair = bucket_seeks[key] = tuple(self.view.get(bucket_name, key))
+        return pair
+
+    def get_exact(self, bucket_name: str, key: bytes) -> bytes:
+        """ Get the value associated to the key in specified bucket, checking exact key match."""
+        rsp_key, rsp_value = self.get(bucket_name, key)
+        return rsp_value if rsp_key == key else None
+
+    def get_many(self, bucket_name: str, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs associated to the keys in specified bucket, fetching only the new ones in one batch."""
+        if keys is None:
+            raise ValueError('keys is null')
+        keys = list(keys)
+        bucket_seeks = self.seeks.setdefault(bucket_name, {})
+        missing_keys = list(dict.fromkeys(key for key in keys if key not in bucket_seeks))
+        if missing_keys:
+            for key, pair in zip(missing_keys, self.view.get_many(bucket_name, missing_keys)):
+                bucket_seeks[key] = tuple(pair)
+        return [bucket_seeks[key] for key in keys]
+
+    def close(self) -> None:
+        """ Drop the memoized results. The backing view is left open, its lifetime belongs to the backing KV."""
+        self.seeks = {}
+
+class MemoizingKV(kvstore.KV):
+    """ This class represents the KV store scoped to one request: every view is the same memoizing view on the backing KV,
+        opened at the first one, so duplicate reads from any reader within the request are served from memory.
+    """
+    def __init__(self, kv: kvstore.KV):
+        if kv is None:
+            raise ValueError('kv is null')
+        self.kv = kv
+        self.memoizing_view = None
+
+    def view(self) -> MemoizingView:
+        """ Get the read-only memoizing view of the request."""
+        if self.memoizing_view is None:
+            self.memoizing_view = MemoizingView(self.kv.view())
+        return self.memoizing_view
+
+    def close(self) -> None:
+        """ End the request dropping its memoized results, if any. The backing KV and its views are left open."""
+        if self.memoizing_view is not None:
+            self.memoizing_view.close()
+            self.memoizing_view = None
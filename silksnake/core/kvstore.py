@@ -3,7 +3,7 @@
 
 import abc
 
-from typing import Iterator, NamedTuple
+from typing import AsyncIterator, Iterable, Iterator, List, NamedTuple, Tuple
 
 class Cursor(abc.ABC):
     """ This class represents a remote read-only cursor on the KV.
@@ -29,10 +29,27 @@ class Cursor(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def next(self) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
-        """ Get key-value streaming iterator for the bucket bound to prefix."""
+    def next(self, start_key: bytes = None) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        """ Get key-value streaming iterator for the bucket bound to prefix, starting at start_key if any."""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def range(self, start_key: bytes = None, end_key: bytes = None, limit: int = None,
+              reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        """ Get key-value iterator for the bucket bound to prefix in [start_key, end_key) range, stopping after limit pairs.
+            In reverse order the range is scanned from end_key down, so end_key is required.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def key_sizes(self, start_key: bytes = None, end_key: bytes = None, limit: int = None) -> Iterator[Tuple[bytes, int]]:
+        """ Get key-value size iterator for the bucket bound to prefix in [start_key, end_key) range, without the values."""
+        raise NotImplementedError
+
+    def keys(self, start_key: bytes = None, end_key: bytes = None, limit: int = None) -> Iterator[bytes]:
+        """ Get key iterator for the bucket bound to prefix in [start_key, end_key) range, without the values."""
+        return (key for key, _ in self.key_sizes(start_key, end_key, limit))
+
 class View(abc.ABC):
     """ This class represents a read-only view on the KV store.
     """
@@ -51,6 +68,39 @@ class View(abc.ABC):
         """ Get the value associated to the key in specified bucket, checking exact key match."""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_many(self, bucket_name: str, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs associated to the keys in specified bucket, in the same order."""
+        raise NotImplementedError
+
+def check_range(end_key: bytes, limit: int, reverse: bool) -> None:
+    """ Check the arguments of a range scan, raising ValueError if invalid."""
+    if limit is not None and limit < 0:
+        raise ValueError('limit is negative')
+    if reverse is None:
+        raise ValueError('reverse is null')
+    if reverse and end_key is None:
+        raise ValueError('end_key is null in reverse range')
+
+def bound_range(pairs: Iterable[Tuple[bytes, bytes]], end_key: bytes, limit: int, reverse: bool) -> Iterator[Tuple[bytes, bytes]]:
+    """ Bound the forward key-value iterator to end_key (exclusive) and limit pairs, stopping at the first empty key.
+        In reverse order the range is buffered and then iterated backwards.
+    """
+    if limit == 0:
+        return
+    if reverse:
+        buffer = list(bound_range(pairs, end_key, None, False))
+        yield from reversed(buffer if limit is None else buffer[-limit:])
+        return
+    count = 0
+    for pair in pairs:
+        if not pair[0] or (end_key is not None and pair[0] >= end_key):
+            return
+        yield pair
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
 class KV(abc.ABC):
     """ This class represents the KV store.
     """
@@ -58,3 +108,62 @@ class KV(abc.ABC):
     def view(self) -> View:
         """Returns a new view on the KV store."""
         raise NotImplementedError
+
+class AsyncCursor(abc.ABC):
+    """ This class represents a read-only cursor on the KV for asyncio.
+    """
+    @abc.abstractmethod
+    def with_prefix(self, prefix: bytes):
+        """ Configure the cursor with the specified prefix."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def enable_streaming(self, streaming: bool):
+        """ Configure the cursor with the specified streaming flag."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def seek(self, key: bytes) -> (bytes, bytes):
+        """ Seek the value in the bucket associated to the specified key."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def seek_exact(self, key: bytes) -> bytes:
+        """ Seek the value in the bucket associated to the specified key, matching key exactly."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def next(self, start_key: bytes = None) -> AsyncIterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        """ Get key-value asynchronous streaming iterator for the bucket bound to prefix, starting at start_key if any."""
+        raise NotImplementedError
+
+class AsyncView(abc.ABC):
+    """ This class represents a read-only view on the KV store for asyncio.
+    """
+    @abc.abstractmethod
+    def cursor(self, bucket_name: str) -> AsyncCursor:
+        """ Create a new cursor on the KV."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
+        """ Get the value associated to the key in specified bucket."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_exact(self, bucket_name: str, key: bytes) -> bytes:
+        """ Get the value associated to the key in specified bucket, checking exact key match."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_many(self, bucket_name: str, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs associated to the keys in specified bucket, in the same order."""
+        raise NotImplementedError
+
+class AsyncKV(abc.ABC):
+    """ This class represents the KV store for asyncio.
+    """
+    @abc.abstractmethod
+    def view(self) -> AsyncView:
+        """Returns a new view on the KV store."""
+        raise NotImplementedError
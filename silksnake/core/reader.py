@@ -1,36 +1,163 @@
 # -*- coding: utf-8 -*-
 """The reader of chain state."""
 
+import heapq
+import itertools
+from typing import Iterator, List, Tuple
+
 from ..core import account
+from ..core import changeset_cache
 from ..core import kvstore
 from ..core import history
-from ..helpers.dbutils import composite_keys
+from ..core.constants import ADDRESS_SIZE, HASH_SIZE
+from ..helpers.dbutils import composite_keys, tables
 from ..state import supply
 from ..types.address import Address
 
 class StateReader:
     """ StateReader """
-    def __init__(self, database: kvstore.KV, block_number: int):
+    def __init__(self, database: kvstore.KV, block_number: int, change_set_cache: changeset_cache.ChangeSetCache = None):
         if database is None:
             raise ValueError('database is null')
         if block_number is None:
             raise ValueError('block_number is null')
         self.database = database
         self.block_number = block_number
+        self.change_set_cache = change_set_cache
 
     def read_account_data(self, address: str) -> account.Account:
         """ read_account_data """
         address_bytes = Address.from_hex(address).bytes
-        encoded_account_bytes = history.get_as_of(self.database, False, address_bytes, self.block_number+1)
+        encoded_account_bytes = history.get_as_of(self.database, False, address_bytes, self.block_number+1, self.change_set_cache)
         return account.Account.from_storage(encoded_account_bytes)
 
     def read_account_storage(self, address: str, incarnation: int, location_hash: bytes) -> bytes:
         """ read_account_storage """
         address_bytes = Address.from_hex(address).bytes
         storage_key = composite_keys.create_plain_composite_storage_key(address_bytes, incarnation, location_hash)
-        location_value = history.get_as_of(self.database, True, storage_key, self.block_number+1)
+        location_value = history.get_as_of(self.database, True, storage_key, self.block_number+1, self.change_set_cache)
         return location_value
 
     def read_eth_supply(self) -> int:
         """ read_eth_supply """
         return supply.read_eth_supply(self.database.view(), self.block_number)
+
+    def storage_range(self, address: str, start_key: bytes, limit: int) -> Tuple[List[Tuple[bytes, bytes]], bytes]:
+        """ Return the page of at most limit (location, value) storage slots of the account having location >= start_key
+            in location order, plus the location starting the next page (None if no more), like debug_storageRangeAt but
+            ordered by plain location. The locations in the current plain state and in the storage history index are merged,
+            then their values are found in history in batches, falling back on the plain state.
+        """
+        if start_key is None:
+            raise ValueError('start_key is null')
+        if limit is None or limit <= 0:
+            raise ValueError('limit is null or not positive')
+        address_bytes = Address.from_hex(address).bytes
+        view = self.database.view()
+        storage_prefix = self.read_storage_prefix(view, address_bytes)
+        if storage_prefix is None:
+            return [], None
+
+        page = []
+        locations = iter_storage_locations(view, address_bytes, storage_prefix, start_key)
+        try:
+            while True:
+                # One more non-empty slot than the page size is needed to know where the next page starts
+                batch = list(itertools.islice(locations, limit + 1 - len(page)))
+                if not batch:
+                    return page, None
+                storage_keys = [storage_prefix + location for location, _ in batch]
+                values = history.find_many_by_history(view, True, storage_keys, self.block_number+1, self.change_set_cache)
+                for (location, current_value), value in zip(batch, values):
+                    value = current_value if value is None else value
+                    if not value:
+                        continue
+                    if len(page) == limit:
+                        return page, location
+                    page.append((location, value))
+        finally:
+            locations.close()
+
+    def read_code_hash(self, address: str) -> bytes:
+        """ Return the code hash of the account at address (empty if missing or not a contract)."""
+        address_bytes = Address.from_hex(address).bytes
+        view = self.database.view()
+        acc = self.read_account(view, address_bytes)
+        if acc is None:
+            return b''
+        if history.needs_code_hash(acc):
+            code_hash_key = composite_keys.create_storage_prefix(address_bytes, acc.incarnation)
+            key, code_hash = view.get(tables.PLAIN_CONTRACT_CODE_LABEL, code_hash_key)
+            return bytes(code_hash) if key == code_hash_key else b''
+        return acc.code_hash
+
+    def read_account(self, view: kvstore.View, address_bytes: bytes) -> account.Account:
+        """ Return the account at address_bytes (None if missing), matching the plain state key exactly."""
+        encoded_account_bytes = history.find_by_history(view, False, address_bytes, self.block_number+1, self.change_set_cache)
+        if encoded_account_bytes is None:
+            key, encoded_account_bytes = view.get(tables.PLAIN_STATE_LABEL, address_bytes)
+            encoded_account_bytes = encoded_account_bytes if key == address_bytes else b''
+        return account.Account.from_storage(encoded_account_bytes) if encoded_account_bytes else None
+
+    def read_storage_prefix(self, view: kvstore.View, address_bytes: bytes) -> bytes:
+        """ Return the storage prefix (address and incarnation) of the account at address_bytes (None if missing)."""
+        acc = self.read_account(view, address_bytes)
+        return composite_keys.create_storage_prefix(address_bytes, acc.incarnation) if acc is not None else None
+
+class AsyncStateReader:
+    """ StateReader for asyncio """
+    def __init__(self, database: kvstore.AsyncKV, block_number: int, change_set_cache: changeset_cache.ChangeSetCache = None):
+        if database is None:
+            raise ValueError('database is null')
+        if block_number is None:
+            raise ValueError('block_number is null')
+        self.database = database
+        self.block_number = block_number
+        self.change_set_cache = change_set_cache
+
+    async def read_account_data(self, address: str) -> account.Account:
+        """ read_account_data """
+        address_bytes = Address.from_hex(address).bytes
+        block_number = self.block_number+1
+        encoded_account_bytes = await history.get_as_of_async(self.database, False, address_bytes, block_number, self.change_set_cache)
+        return account.Account.from_storage(encoded_account_bytes)
+
+    async def read_account_storage(self, address: str, incarnation: int, location_hash: bytes) -> bytes:
+        """ read_account_storage """
+        address_bytes = Address.from_hex(address).bytes
+        storage_key = composite_keys.create_plain_composite_storage_key(address_bytes, incarnation, location_hash)
+        location_value = await history.get_as_of_async(self.database, True, storage_key, self.block_number+1, self.change_set_cache)
+        return location_value
+
+    async def read_eth_supply(self) -> int:
+        """ read_eth_supply """
+        return await supply.read_eth_supply_async(self.database.view(), self.block_number)
+
+def iter_prefix(view: kvstore.View, bucket_name: str, prefix: bytes, start_key: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    """ Yield the key-value pairs of the bucket having the given prefix from start_key in key order."""
+    pairs = view.cursor(bucket_name).with_prefix(prefix).range(start_key)
+    try:
+        for key, value in pairs:
+            key = bytes(key)
+            if not key.startswith(prefix):
+                break
+            yield key, value
+    finally:
+        pairs.close()
+
+def iter_storage_locations(view: kvstore.View, address_bytes: bytes, storage_prefix: bytes,
+                           start_key: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    """ Yield once each (location, current value) from start_key in location order of the storage slots in the current plain
+        state (under storage_prefix, i.e. address and incarnation) or ever changed (in the storage history index of address).
+        The current value is empty for the slots missing from the current plain state.
+    """
+    current_slots = ((key[len(storage_prefix):], bytes(value))
+                     for key, value in iter_prefix(view, tables.PLAIN_STATE_LABEL, storage_prefix, storage_prefix + start_key))
+    changed_slots = ((key[ADDRESS_SIZE:ADDRESS_SIZE+HASH_SIZE], b'')
+                     for key, _ in iter_prefix(view, tables.STORAGE_HISTORY_LABEL, address_bytes, address_bytes + start_key))
+    last_location = None
+    # Merge is stable, so the current value comes first for the slots found in both
+    for location, current_value in heapq.merge(current_slots, changed_slots, key=lambda slot: slot[0]):
+        if location != last_location:
+            last_location = location
+            yield location, current_value
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""The read-only key-value (KV) store on local memory-mapped snapshot files."""
+
+import bisect
+import io
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+from . import kvstore
+
+SEGMENT_EXTENSION: str = '.seg'
+INDEX_EXTENSION: str = '.idx'
+DEFAULT_INDEX_INTERVAL: int = 64
+
+RECORD_HEADER = struct.Struct('>II')
+INDEX_HEADER = struct.Struct('>IQ')
+
+Pair = NamedTuple('Pair', [('key', bytes), ('value', bytes)])
+
+def segment_path(directory: str, bucket_name: str) -> str:
+    """ Return the path of the segment file for the given bucket in the snapshot directory."""
+    return os.path.join(directory, bucket_name + SEGMENT_EXTENSION)
+
+class SegmentWriter:
+    """ This class represents the writer of one bucket segment, i.e. a sequence of [u32 klen][u32 vlen][key][value] records
+        (big-endian) sorted by strictly increasing key. The sparse index sidecar file holds a [u32 klen][u64 offset][key]
+        entry every index_interval records and is written at close.
+        If resume is true, the existing segment (if any) is kept, any partially written record at its tail is dropped
+        and the new records are appended after its last key. Writes are buffered up to buffer_size bytes.
+    """
+    def __init__(self, path: str, index_interval: int = DEFAULT_INDEX_INTERVAL, resume: bool = False,
+                 buffer_size: int = io.DEFAULT_BUFFER_SIZE):
+        if not path:
+            raise ValueError('path is null')
+        if index_interval is None or index_interval <= 0:
+            raise ValueError('index_interval is null or not positive')
+        self.path = path
+        self.index_interval = index_interval
+        self.count = 0
+        self.offset = 0
+        self.last_key = None
+        self.index = []
+        if resume and os.path.exists(path):
+            self.recover()
+            self.segment_file = open(path, 'r+b', buffering=buffer_size)
+            self.segment_file.truncate(self.offset)
+            self.segment_file.seek(self.offset)
+        else:
+            self.segment_file = open(path, 'wb', buffering=buffer_size)
+
+    def recover(self) -> None:
+        """ Restore the writer state after the last complete record of the existing segment, scanning its memory map from
+            the last entry of its sparse index if consistent with the segment (from the start otherwise).
+        """
+        if os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, 'rb') as segment_file:
+            data = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.recover_records(data)
+        finally:
+            data.close()
+
+    def recover_records(self, data: mmap.mmap) -> None:
+        """ Restore the index entries, count, last key and offset from the records in data."""
+        index = read_index(index_path(self.path)) if os.path.exists(index_path(self.path)) else []
+        if not self.is_consistent(data, index):
+            index = []
+        self.index = index[:-1]
+        self.count = len(self.index) * self.index_interval
+        for key, _, offset, next_offset in iterate_records(data, index[-1][1] if index else 0):
+            if self.count % self.index_interval == 0:
+                self.index.append((bytes(key), offset))
+            self.last_key = bytes(key)
+            self.count += 1
+            self.offset = next_offset
+
+    def is_consistent(self, data: mmap.mmap, index: List[Tuple[bytes, int]]) -> bool:
+        """ Check the sparse index entries point to records with their keys every index_interval records in data."""
+        if not index or index[0][1] != 0:
+            return False
+        if any(offset >= next_offset for (_, offset), (_, next_offset) in zip(index, index[1:])):
+            return False
+        for key, offset in index:
+            record = next(iterate_records(data, offset), None)
+            if record is None or record[0] != key:
+                return False
+        if len(index) == 1:
+            return True
+        num_records = 0
+        for _, _, offset, _ in iterate_records(data, index[-2][1]):
+            if offset == index[-1][1] or num_records > self.index_interval:
+                break
+            num_records += 1
+        return num_records == self.index_interval
+
+    def append(self, key: bytes, value: bytes) -> None:
+        """ Append the key-value pair, key being greater than all the previous ones."""
+        if not key:
+            raise ValueError('key is null or empty')
+        if value is None:
+            raise ValueError('value is null')
+        if self.last_key is not None and key <= self.last_key:
+            raise ValueError('key {} is not greater than last key {}'.format(key.hex(), self.last_key.hex()))
+        if self.count % self.index_interval == 0:
+            self.index.append((bytes(key), self.offset))
+        self.segment_file.write(RECORD_HEADER.pack(len(key), len(value)))
+        self.segment_file.write(key)
+        self.segment_file.write(value)
+        self.offset += RECORD_HEADER.size + len(key) + len(value)
+        self.last_key = bytes(key)
+        self.count += 1
+
+    def flush(self) -> None:
+        """ Flush the written records to disk."""
+        self.segment_file.flush()
+        os.fsync(self.segment_file.fileno())
+
+    def close(self) -> None:
+        """ Close the segment and write its sparse index."""
+        if self.segment_file.closed:
+            return
+        self.flush()
+        self.segment_file.close()
+        with open(index_path(self.path), 'wb') as index_file:
+            for key, offset in self.index:
+                index_file.write(INDEX_HEADER.pack(len(key), offset))
+                index_file.write(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def index_path(path: str) -> str:
+    """ Return the path of the sparse index file for the given segment file."""
+    return path[:-len(SEGMENT_EXTENSION)] + INDEX_EXTENSION if path.endswith(SEGMENT_EXTENSION) else path + INDEX_EXTENSION
+
+def iterate_records(data, offset: int) -> Iterator[Tuple[memoryview, memoryview, int, int]]:
+    """ Iterate over the complete (key, value, record offset, next offset) records in data starting at offset."""
+    size = len(data)
+    while offset + RECORD_HEADER.size <= size:
+        key_length, value_length = RECORD_HEADER.unpack_from(data, offset)
+        key_offset = offset + RECORD_HEADER.size
+        value_offset = key_offset + key_length
+        next_offset = value_offset + value_length
+        if next_offset > size:
+            return
+        yield memoryview(data)[key_offset:value_offset], memoryview(data)[value_offset:next_offset], offset, next_offset
+        offset = next_offset
+
+def read_index(path: str) -> List[Tuple[bytes, int]]:
+    """ Read the (key, offset) entries of the sparse index file at path."""
+    with open(path, 'rb') as index_file:
+        index_data = index_file.read()
+    index = []
+    offset = 0
+    while offset + INDEX_HEADER.size <= len(index_data):
+        key_length, key_offset = INDEX_HEADER.unpack_from(index_data, offset)
+        offset += INDEX_HEADER.size
+        index.append((index_data[offset:offset + key_length], key_offset))
+        offset += key_length
+    return index
+
+class Segment:
+    """ This class represents a read-only memory-mapped bucket segment with its sparse index loaded in memory.
+    """
+    def __init__(self, path: str):
+        if not path:
+            raise ValueError('path is null')
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.mmap = None
+        self.data = memoryview(b'')
+        if self.size > 0:
+            with open(path, 'rb') as segment_file:
+                self.mmap = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = memoryview(self.mmap)
+        index = read_index(index_path(path)) if os.path.exists(index_path(path)) else []
+        self.index_keys = [key for key, _ in index]
+        self.index_offsets = [offset for _, offset in index]
+
+    def seek_offset(self, key: bytes) -> int:
+        """ Return the offset of the first record having key greater than or equal to the specified key (size if none).
+            The sparse index bounds the scan to the records of one index interval.
+        """
+        block = bisect.bisect_right(self.index_keys, key) - 1
+        offset = self.index_offsets[block] if block >= 0 else 0
+        for record_key, _, record_offset, _ in iterate_records(self.data, offset):
+            if bytes(record_key) >= key:
+                return record_offset
+        return self.size
+
+    def records(self, offset: int) -> Iterator[Tuple[memoryview, memoryview, int, int]]:
+        """ Iterate over the records starting at offset, as zero-copy memory views."""
+        return iterate_records(self.data, offset)
+
+    def close(self) -> None:
+        """ Unmap the segment. If memory views from next are still alive, the mapping is released when the last one is."""
+        self.data.release()
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                pass
+
+class SnapshotCursor(kvstore.Cursor):
+    """ This class represents a read-only cursor on one bucket segment of the snapshot.
+        Values from seek are copied bytes, pairs from next are zero-copy memory views valid until the snapshot is closed.
+    """
+    def __init__(self, segment: Segment, bucket_name: str):
+        if bucket_name is None:
+            raise ValueError('bucket_name is null')
+        self.segment = segment
+        self.bucket_name = bucket_name
+        self.prefix = b''
+        self.streaming = False
+
+    def with_prefix(self, prefix: bytes):
+        """ Configure the cursor with the specified prefix."""
+        if prefix is None:
+            raise ValueError('prefix is null')
+        self.prefix = prefix
+        return self
+
+    def enable_streaming(self, streaming: bool):
+        """ Configure the cursor with the specified streaming flag."""
+        if streaming is None:
+            raise ValueError('streaming is null')
+        self.streaming = streaming
+        return self
+
+    def seek(self, key: bytes) -> (bytes, bytes):
+        """ Seek the value in the bucket associated to the specified key."""
+        if key is None:
+            raise ValueError('key is null')
+        if self.segment is None:
+            return b'', b''
+        for record_key, record_value, _, _ in self.segment.records(self.segment.seek_offset(key)):
+            if record_key[:len(self.prefix)] == self.prefix:
+                return bytes(record_key), bytes(record_value)
+            break
+        return b'', b''
+
+    def seek_exact(self, key: bytes) -> bytes:
+        """ Seek the value in the bucket associated to the specified key, matching key exactly."""
+        rsp_key, rsp_value = self.seek(key)
+        return rsp_value if rsp_key == key else None
+
+    def next(self, start_key: bytes = None) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        """ Get key-value streaming iterator for the bucket bound to prefix starting at start_key if any, ending with the
+            empty pair like the remote one. Without streaming enabled only the first pair is returned.
+        """
+        seek_key = max(start_key, self.prefix) if start_key is not None else self.prefix
+        if self.segment is not None:
+            for record_key, record_value, _, _ in self.segment.records(self.segment.seek_offset(seek_key)):
+                if record_key[:len(self.prefix)] != self.prefix:
+                    break
+                yield Pair(record_key, record_value)
+                if not self.streaming:
+                    return
+        yield Pair(b'', b'')
+
+    def range(self, start_key: bytes = None, end_key: bytes = None, limit: int = None,
+              reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        """ Get key-value iterator for the bucket bound to prefix in [start_key, end_key) range, stopping after limit pairs.
+            Keys are copied bytes, values are zero-copy memory views. In reverse order end_key is required.
+        """
+        kvstore.check_range(end_key, limit, reverse)
+        return self._range(start_key, end_key, limit, reverse)
+
+    def _range(self, start_key: bytes, end_key: bytes, limit: int, reverse: bool) -> Iterator[Tuple[bytes, bytes]]:
+        pairs = (Pair(bytes(key), value) for key, value in self.enable_streaming(True).next(start_key))
+        return kvstore.bound_range(pairs, end_key, limit, reverse)
+
+    def key_sizes(self, start_key: bytes = None, end_key: bytes = None, limit: int = None) -> Iterator[Tuple[bytes, int]]:
+        """ Get key-value size iterator for the bucket bound to prefix in [start_key, end_key) range, without the values."""
+        kvstore.check_range(end_key, limit, False)
+        return ((key, len(value)) for key, value in self._range(start_key, end_key, limit, False))
+
+class SnapshotView(kvstore.View):
+    """ This class represents a read-only view on the snapshot.
+    """
+    def __init__(self, snapshot_kv):
+        if snapshot_kv is None:
+            raise ValueError('snapshot_kv is null')
+        self.snapshot_kv = snapshot_kv
+
+    def cursor(self, bucket_name: str) -> SnapshotCursor:
+        """ Create a new cursor on the snapshot, empty if the bucket is missing."""
+        return SnapshotCursor(self.snapshot_kv.segment(bucket_name), bucket_name)
+
+    def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
+        """ Get the value associated to the key in specified bucket."""
+        return self.cursor(bucket_name).seek(key)
+
+    def get_exact(self, bucket_name: str, key: bytes) -> bytes:
+        """ Get the value associated to the key in specified bucket, checking exact key match."""
+        return self.cursor(bucket_name).seek_exact(key)
+
+    def get_many(self, bucket_name: str, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs associated to the keys in specified bucket, in the same order."""
+        if keys is None:
+            raise ValueError('keys is null')
+        cursor = self.cursor(bucket_name)
+        return [cursor.seek(key) for key in keys]
+
+class SnapshotKV(kvstore.KV):
+    """ This class represents the read-only KV store on a snapshot directory holding one segment file per bucket.
+        Segments are memory-mapped at first use.
+    """
+    def __init__(self, directory: str):
+        if not directory:
+            raise ValueError('directory is null')
+        if not os.path.isdir(directory):
+            raise ValueError('directory {} does not exist'.format(directory))
+        self.directory = directory
+        self.segments = {}
+
+    def bucket_names(self) -> List[str]:
+        """ Get the names of the buckets available in the snapshot."""
+        names = os.listdir(self.directory)
+        return sorted(name[:-len(SEGMENT_EXTENSION)] for name in names if name.endswith(SEGMENT_EXTENSION))
+
+    def segment(self, bucket_name: str) -> Segment:
+        """ Get the segment of the specified bucket (None if missing)."""
+        if bucket_name not in self.segments:
+            path = segment_path(self.directory, bucket_name)
+            self.segments[bucket_name] = Segment(path) if os.path.exists(path) else None
+        return self.segments[bucket_name]
+
+    def view(self) -> SnapshotView:
+        """ Get a read-only view on the snapshot."""
+        return SnapshotView(self)
+
+    def close(self) -> None:
+        """ Close all the segments."""
+        for segment in self.segments.values():
+            if segment is not None:
+                segment.close()
+        self.segments.clear()
+
+def write_segment(directory: str, bucket_name: str, pairs: Iterable[Tuple[bytes, bytes]],
+                  index_interval: int = DEFAULT_INDEX_INTERVAL) -> int:
+    """ Write the sorted key-value pairs as the segment of bucket_name in the snapshot directory, returning the count."""
+    with SegmentWriter(segment_path(directory, bucket_name), index_interval) as writer:
+        for key, value in pairs:
+            writer.append(key, value)
+        return writer.count
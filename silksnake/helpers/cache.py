@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Common caches."""
+
+import collections
+import threading
+import time
+from typing import Any, Hashable
+
+ENTRY_OVERHEAD_SIZE: int = 64
+
+class LRUCache:
+    """ This class represents a thread-safe least-recently-used cache bounded by the total byte size of its entries.
+        Entries may optionally expire after a time-to-live (TTL) in seconds.
+    """
+    def __init__(self, max_size: int, ttl: float = None):
+        if max_size is None or max_size < 0:
+            raise ValueError('max_size is null or negative')
+        if ttl is not None and ttl < 0:
+            raise ValueError('ttl is negative')
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Get the value associated to key (or default if missing or expired), marking it as most recently used."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, entry_size, expiry_time = entry
+            if expiry_time is not None and time.monotonic() >= expiry_time:
+                del self.entries[key]
+                self.size -= entry_size
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, entry_size: int, expires: bool = True) -> None:
+        """ Associate value having the given byte size to key, evicting the least recently used entries if needed.
+            If expires is false, the entry never expires whatever the TTL.
+        """
+        entry_size += ENTRY_OVERHEAD_SIZE
+        if entry_size > self.max_size:
+            return
+        expiry_time = time.monotonic() + self.ttl if self.ttl is not None and expires else None
+        with self.lock:
+            old_entry = self.entries.pop(key, None)
+            if old_entry is not None:
+                self.size -= old_entry[1]
+            while self.entries and self.size + entry_size > self.max_size:
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+            self.entries[key] = (value, entry_size, expiry_time)
+            self.size += entry_size
+
+    def invalidate(self, key: Hashable) -> None:
+        """ Remove the entry associated to key (if any)."""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def clear(self) -> None:
+        """ Remove all the entries."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def __contains__(self, key: Hashable):
+        with self.lock:
+            return key in self.entries
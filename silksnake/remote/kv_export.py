@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""The exporter of turbo-geth/silkworm KV buckets to local snapshot segments."""
+
+# pylint: disable=too-many-locals
+
+import io
+import os
+import time
+from typing import Callable, NamedTuple
+
+from . import kv_utils
+from ..core import snapshot
+
+DEFAULT_BUFFER_SIZE: int = 4 * 1024 * 1024
+DEFAULT_PROGRESS_INTERVAL: int = 100000
+
+ExportProgress = NamedTuple('ExportProgress', [('count', int), ('size', int), ('last_key', bytes), ('elapsed', float)])
+
+def throughput(progress: ExportProgress) -> (float, float):
+    """ Return the (pairs/s, bytes/s) throughput of the export so far."""
+    if progress.elapsed <= 0:
+        return 0.0, 0.0
+    return progress.count / progress.elapsed, progress.size / progress.elapsed
+
+def export_bucket(target: str, bucket: str, directory: str, prefix: bytes = b'', start_key: bytes = None, end_key: bytes = None,
+                  resume: bool = True, progress: Callable[[ExportProgress], None] = None,
+                  progress_interval: int = DEFAULT_PROGRESS_INTERVAL, buffer_size: int = DEFAULT_BUFFER_SIZE) -> ExportProgress:
+    """ Stream the pairs of bucket bound to prefix in range [start_key, end_key) from the KV of turbo-geth/silkworm running at
+        target into the bucket segment of the snapshot directory. If resume is true and the segment exists, the export
+        continues after its last written key. The progress callback gets called every progress_interval exported pairs
+        and at completion. Return the final progress, counting only the pairs exported by this call.
+    """
+    if bucket is None:
+        raise ValueError('bucket is null')
+    if not directory:
+        raise ValueError('directory is null')
+    if prefix is None:
+        raise ValueError('prefix is null')
+    if progress_interval is None or progress_interval <= 0:
+        raise ValueError('progress_interval is null or not positive')
+    os.makedirs(directory, exist_ok=True)
+
+    start_time = time.monotonic()
+    state = {'count': 0, 'size': 0, 'last_key': b''}
+
+    def current_progress() -> ExportProgress:
+        return ExportProgress(state['count'], state['size'], state['last_key'], time.monotonic() - start_time)
+
+    path = snapshot.segment_path(directory, bucket)
+    with snapshot.SegmentWriter(path, resume=resume, buffer_size=buffer_size) as writer:
+        resume_key = writer.last_key
+        if resume_key is not None and (start_key is None or resume_key >= start_key):
+            start_key = resume_key
+
+        def write_pair(key: bytes, value: bytes) -> bool:
+            if end_key is not None and key >= end_key:
+                return True
+            if key == resume_key:
+                return False
+            writer.append(key, value)
+            state['count'] += 1
+            state['size'] += len(key) + len(value)
+            state['last_key'] = key
+            if progress and state['count'] % progress_interval == 0:
+                progress(current_progress())
+            return False
+
+        kv_utils.kv_walk(target, bucket, prefix, write_pair, start_key)
+
+    final_progress = current_progress()
+    if progress:
+        progress(final_progress)
+    return final_progress
+
+def format_size(size: float) -> str:
+    """ Format the given byte size in human-readable units."""
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            return '{:.1f} {}'.format(size, unit)
+        size /= 1024
+    return '{:.1f} TiB'.format(size)
+
+def print_progress(progress: ExportProgress, output: io.TextIOBase = None) -> None:
+    """ Print the export progress with its throughput."""
+    pairs_per_second, bytes_per_second = throughput(progress)
+    print('EXPORT pairs: {} size: {} last_key: {} elapsed: {:.1f}s rate: {:.0f} pairs/s {}/s'.format(
+        progress.count, format_size(progress.size), progress.last_key.hex(), progress.elapsed, pairs_per_second,
+        format_size(bytes_per_second)), file=output)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""The instrumentation of the TurboGeth/Silkworm KV gRPC remote client."""
+
+import bisect
+import collections
+import threading
+import time
+from typing import Dict, Iterator, Tuple
+
+import grpc
+
+from .proto import kv_pb2, kv_pb2_grpc
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX: str = 'silksnake_kv'
+
+COUNTERS: Dict[str, str] = {
+    'seeks': 'Seek requests sent',
+    'pairs': 'Non-empty key-value pairs received',
+    'bytes_out': 'Serialized request bytes sent',
+    'bytes_in': 'Serialized response bytes received',
+    'errors': 'Seek calls failed with RPC error',
+}
+
+HISTOGRAMS: Dict[str, str] = {
+    'seek_latency': 'Round trip time of non-streaming seeks in seconds',
+    'first_pair_latency': 'Time to first pair of streaming seeks in seconds',
+}
+
+class Instrumentation:
+    """ This class represents the instrumentation hooks called for each Seek call, doing nothing by default.
+        Hooks are called from the gRPC request and caller threads, so implementations must be thread-safe.
+    """
+    def on_request(self, bucket_name: str, request_size: int) -> None:
+        """ Called when a Seek request having the given serialized size is sent."""
+
+    def on_response(self, bucket_name: str, response_size: int, empty: bool) -> None:
+        """ Called when a response having the given serialized size (empty if the pair has no key) is received."""
+
+    def on_seek_latency(self, bucket_name: str, latency: float) -> None:
+        """ Called with the round trip time in seconds of one non-streaming seek."""
+
+    def on_first_pair_latency(self, bucket_name: str, latency: float) -> None:
+        """ Called with the time in seconds from request to first response of one streaming seek."""
+
+    def on_error(self, bucket_name: str, code: grpc.StatusCode) -> None:
+        """ Called when a Seek call fails with the given status code."""
+
+def check_bounds(bounds: Tuple[float, ...]) -> Tuple[float, ...]:
+    """ Return the histogram upper bounds as tuple, raising ValueError if they are null or not sorted."""
+    if not bounds or list(bounds) != sorted(bounds):
+        raise ValueError('bounds are null or not sorted')
+    return tuple(bounds)
+
+class Histogram:
+    """ This class represents a latency histogram having fixed upper bounds.
+    """
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.bounds = check_bounds(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """ Record the value in its bucket."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> Iterator[Tuple[str, int]]:
+        """ Get the (upper bound, cumulative count) pairs including the +Inf bucket."""
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            yield ('+Inf' if bound == float('inf') else repr(bound)), total
+
+    def snapshot(self) -> dict:
+        """ Get the histogram state as dict."""
+        return {'count': self.count, 'sum': self.sum, 'buckets': dict(self.cumulative_counts())}
+
+class BucketMetrics:
+    """ This class represents the metrics of one bucket.
+    """
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram(bounds) for name in HISTOGRAMS}
+
+class MetricsCollector(Instrumentation):
+    """ This class represents the thread-safe instrumentation collecting per-bucket counters and latency histograms.
+    """
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.bounds = check_bounds(bounds)
+        self.buckets: Dict[str, BucketMetrics] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, bucket_name: str) -> BucketMetrics:
+        """ Get the metrics of the given bucket, creating them if missing. To be called holding the lock."""
+        metrics = self.buckets.get(bucket_name)
+        if metrics is None:
+            metrics = self.buckets[bucket_name] = BucketMetrics(self.bounds)
+        return metrics
+
+    def on_request(self, bucket_name: str, request_size: int) -> None:
+        with self.lock:
+            counters = self.bucket(bucket_name).counters
+            counters['seeks'] += 1
+            counters['bytes_out'] += request_size
+
+    def on_response(self, bucket_name: str, response_size: int, empty: bool) -> None:
+        with self.lock:
+            counters = self.bucket(bucket_name).counters
+            counters['bytes_in'] += response_size
+            if not empty:
+                counters['pairs'] += 1
+
+    def on_seek_latency(self, bucket_name: str, latency: float) -> None:
+        with self.lock:
+            self.bucket(bucket_name).histograms['seek_latency'].observe(latency)
+
+    def on_first_pair_latency(self, bucket_name: str, latency: float) -> None:
+        with self.lock:
+            self.bucket(bucket_name).histograms['first_pair_latency'].observe(latency)
+
+    def on_error(self, bucket_name: str, code: grpc.StatusCode) -> None:
+        with self.lock:
+            self.bucket(bucket_name).counters['errors'] += 1
+
+    def reset(self) -> None:
+        """ Drop all the collected metrics."""
+        with self.lock:
+            self.buckets.clear()
+
+    def snapshot(self) -> dict:
+        """ Get the collected metrics as {bucket: {counter: value, histogram: {count, sum, buckets}}} dict."""
+        with self.lock:
+            return {
+                bucket_name: dict(metrics.counters, **{name: h.snapshot() for name, h in metrics.histograms.items()})
+                for bucket_name, metrics in sorted(self.buckets.items())
+            }
+
+    def prometheus(self) -> str:
+        """ Get the collected metrics in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, help_text in COUNTERS.items():
+            metric = '{}_{}_total'.format(METRIC_PREFIX, name)
+            lines += ['# HELP {} {}'.format(metric, help_text), '# TYPE {} counter'.format(metric)]
+            lines += ['{}{{bucket="{}"}} {}'.format(metric, bucket_name, metrics[name]) for bucket_name, metrics in snapshot.items()]
+        for name, help_text in HISTOGRAMS.items():
+            metric = '{}_{}_seconds'.format(METRIC_PREFIX, name)
+            lines += ['# HELP {} {}'.format(metric, help_text), '# TYPE {} histogram'.format(metric)]
+            for bucket_name, metrics in snapshot.items():
+                histogram = metrics[name]
+                for bound, count in histogram['buckets'].items():
+                    lines.append('{}_bucket{{bucket="{}",le="{}"}} {}'.format(metric, bucket_name, bound, count))
+                lines.append('{}_sum{{bucket="{}"}} {}'.format(metric, bucket_name, repr(histogram['sum'])))
+                lines.append('{}_count{{bucket="{}"}} {}'.format(metric, bucket_name, histogram['count']))
+        return '\n'.join(lines) + '\n'
+
+class InstrumentedCall:
+    """ This class represents a Seek call reporting its requests and responses to the instrumentation.
+        Each non-streaming request is answered by exactly one response, so round trips are matched in order.
+    """
+    def __init__(self, call_factory, request_iterator: Iterator[kv_pb2.SeekRequest], instrumentation: Instrumentation):
+        self.instrumentation = instrumentation
+        self.bucket_name = ''
+        self.pending = collections.deque()
+        self.streaming = False
+        self.first_response = True
+        self.call = call_factory(self.instrument_requests(request_iterator))
+
+    def instrument_requests(self, request_iterator: Iterator[kv_pb2.SeekRequest]) -> Iterator[kv_pb2.SeekRequest]:
+        """ Report each request before it is sent."""
+        for request in request_iterator:
+            if not self.bucket_name:
+                self.bucket_name = request.bucketName
+            self.streaming = request.startSreaming
+            self.instrumentation.on_request(self.bucket_name, request.ByteSize())
+            self.pending.append(time.monotonic())
+            yield request
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            response = next(self.call)
+        except grpc.RpcError as error:
+            self.instrumentation.on_error(self.bucket_name, error.code()) # pylint: disable=no-member
+            raise
+        now = time.monotonic()
+        if self.streaming:
+            if self.first_response and self.pending:
+                self.instrumentation.on_first_pair_latency(self.bucket_name, now - self.pending.popleft())
+        elif self.pending:
+            self.instrumentation.on_seek_latency(self.bucket_name, now - self.pending.popleft())
+        self.first_response = False
+        self.instrumentation.on_response(self.bucket_name, response.ByteSize(), not response.key)
+        return response
+
+    def cancel(self):
+        """ Cancel the underlying call."""
+        return self.call.cancel()
+
+    def __getattr__(self, name: str):
+        return getattr(self.call, name)
+
+class InstrumentedKVStub:
+    """ This class represents the KV stub reporting every call to the instrumentation.
+    """
+    def __init__(self, kv_stub: kv_pb2_grpc.KVStub, instrumentation: Instrumentation):
+        if kv_stub is None:
+            raise ValueError('kv_stub is null')
+        if instrumentation is None:
+            raise ValueError('instrumentation is null')
+        self.kv_stub = kv_stub
+        self.instrumentation = instrumentation
+
+    def Seek(self, request_iterator: Iterator[kv_pb2.SeekRequest], **kwargs) -> InstrumentedCall: # pylint: disable=invalid-name
+        """ Seek, see KVStub."""
+        return InstrumentedCall(lambda requests: self.kv_stub.Seek(requests, **kwargs), request_iterator, self.instrumentation)
+
+    def SeekKeys(self, request_iterator: Iterator[kv_pb2.SeekRequest], **kwargs) -> InstrumentedCall: # pylint: disable=invalid-name
+        """ SeekKeys, see KVStub."""
+        return InstrumentedCall(lambda requests: self.kv_stub.SeekKeys(requests, **kwargs), request_iterator, self.instrumentation)
+
+def instrument(kv_stub: kv_pb2_grpc.KVStub, instrumentation: Instrumentation) -> kv_pb2_grpc.KVStub:
+    """ Return the KV stub reporting to instrumentation, replacing any previous one (None removes instrumentation)."""
+    if isinstance(kv_stub, InstrumentedKVStub):
+        kv_stub = kv_stub.kv_stub
+    if instrumentation is None:
+        return kv_stub
+    return InstrumentedKVStub(kv_stub, instrumentation)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""The process-wide pool of TurboGeth/Silkworm KV gRPC channels."""
+
+import atexit
+import threading
+import time
+
+from . import kv_remote
+
+DEFAULT_MAX_IDLE_TIME: float = 300.0
+
+class PooledRemoteKV(kv_remote.RemoteKV):
+    """ This class represents a remote KV store borrowed from the channel pool: closing it gives the channel back.
+    """
+    def __init__(self, pool, pool_key: tuple, remote_kv: kv_remote.RemoteKV):
+        kv_remote.RemoteKV.__init__(self, remote_kv.channel, remote_kv.kv_stub, remote_kv.persistent_streams, remote_kv.timeout,
+                                    remote_kv.instrumentation, remote_kv.max_stream_age)
+        self.pool = pool
+        self.pool_key = pool_key
+        self.released = False
+
+    def close(self) -> None:
+        """ Release the remote KV to the pool, leaving the channel open."""
+        if self.released:
+            return
+        self.released = True
+        self.close_views()
+        self.pool.release(self.pool_key)
+
+class PoolEntry:
+    """ This class represents a pooled channel with its usage info.
+    """
+    def __init__(self, remote_kv: kv_remote.RemoteKV):
+        self.remote_kv = remote_kv
+        self.users = 0
+        self.last_used = time.monotonic()
+
+class ChannelPool:
+    """ This class represents a thread-safe pool of channels keyed by target and security options.
+        Channels are opened lazily at first acquire and closed after max_idle_time seconds without users.
+    """
+    def __init__(self, max_idle_time: float = DEFAULT_MAX_IDLE_TIME):
+        if max_idle_time is None or max_idle_time < 0:
+            raise ValueError('max_idle_time is null or negative')
+        self.max_idle_time = max_idle_time
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def acquire(self, target: str = kv_remote.DEFAULT_TARGET,
+                options: kv_remote.SecurityOptions = kv_remote.SecurityOptions()) -> PooledRemoteKV:
+        """ Borrow a remote KV store for target using a pooled channel, opening it if needed."""
+        if not target:
+            raise ValueError('target is null')
+        pool_key = (target, options.server_cert, options.client_cert, options.client_key)
+        with self.lock:
+            if self.closed:
+                raise ValueError('pool is shut down')
+            self._evict_idle()
+            entry = self.entries.get(pool_key)
+            if entry is None:
+                entry = PoolEntry(kv_remote.RemoteClient(target, options).open())
+                self.entries[pool_key] = entry
+            entry.users += 1
+            entry.last_used = time.monotonic()
+        return PooledRemoteKV(self, pool_key, entry.remote_kv)
+
+    def release(self, pool_key: tuple) -> None:
+        """ Give back a remote KV store previously acquired for pool_key."""
+        with self.lock:
+            entry = self.entries.get(pool_key)
+            if entry is not None:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+            self._evict_idle()
+
+    def evict_idle(self) -> int:
+        """ Close the channels without users for more than max_idle_time seconds, returning how many."""
+        with self.lock:
+            return self._evict_idle()
+
+    def _evict_idle(self) -> int:
+        now = time.monotonic()
+        idle_keys = [k for k, e in self.entries.items() if e.users <= 0 and now - e.last_used >= self.max_idle_time]
+        for pool_key in idle_keys:
+            self.entries.pop(pool_key).remote_kv.close()
+        return len(idle_keys)
+
+    def shutdown(self) -> None:
+        """ Close all the pooled channels, including the ones still in use, and refuse any further acquire."""
+        with self.lock:
+            self.closed = True
+            for entry in self.entries.values():
+                entry.remote_kv.close()
+            self.entries.clear()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+_DEFAULT_POOL: ChannelPool = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+def default_pool() -> ChannelPool:
+    """ Get the process-wide channel pool, creating it at first use."""
+    global _DEFAULT_POOL # pylint: disable=global-statement
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is None or _DEFAULT_POOL.closed:
+            _DEFAULT_POOL = ChannelPool()
+        return _DEFAULT_POOL
+
+def shutdown() -> None:
+    """ Shut down the process-wide channel pool, if any. Also called at interpreter exit."""
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is not None:
+            _DEFAULT_POOL.shutdown()
+
+atexit.register(shutdown)
@@ -1,15 +1,61 @@
 # -*- coding: utf-8 -*-
 """The TurboGeth/Silkworm KV gRPC remote client."""
 
-from typing import Iterator, NamedTuple
+import queue
+import threading
+import time
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
 
 import grpc
 
+from . import kv_metrics
 from .proto import kv_pb2, kv_pb2_grpc
+from ..core import kvstore
+
+# pylint: disable=too-many-instance-attributes
 
 DEFAULT_TARGET: str = 'localhost:9090'
 DEFAULT_PREFIX: str = b''
 
+# The server holds one read transaction per Seek stream, so long-lived streams are rotated after about one block time
+DEFAULT_MAX_STREAM_AGE: float = 12.0
+
+class SeekStream:
+    """ This class represents a long-lived bidirectional Seek stream serving many requests.
+        The server binds bucket and prefix to the stream at the first request: next requests with non-empty seek key
+        reposition the server-side cursor, so each seek costs one message round trip instead of a brand-new RPC.
+    """
+    def __init__(self, kv_stub: kv_pb2_grpc.KVStub):
+        if kv_stub is None:
+            raise ValueError('kv_stub is null')
+        self.request_queue = queue.SimpleQueue()
+        self.response_iterator = kv_stub.Seek(iter(self.request_queue.get, None))
+        self.opened_time = time.monotonic()
+        self.closed = False
+
+    def age(self) -> float:
+        """ Return the seconds elapsed since the stream was opened."""
+        return time.monotonic() - self.opened_time
+
+    def seek(self, request: kv_pb2.SeekRequest) -> kv_pb2.Pair:
+        """ Send the specified request down the stream and wait for its response."""
+        if self.closed:
+            raise ValueError('stream is closed')
+        self.request_queue.put(request)
+        try:
+            return next(self.response_iterator)
+        except StopIteration:
+            self.close()
+            return kv_pb2.Pair()
+
+    def close(self) -> None:
+        """ Half-close the stream and cancel any pending response."""
+        if self.closed:
+            return
+        self.closed = True
+        self.request_queue.put(None) # stop the request iterator consumed by gRPC
+        self.response_iterator.cancel()
+
 class RemoteCursor:
     """ This class represents a remote read-only cursor on the KV.
     """
@@ -22,14 +68,38 @@ class RemoteCursor:
         self.bucket_name = bucket_name
         self.prefix = DEFAULT_PREFIX
         self.streaming = False
+        self.persistent = False
+        self.seek_stream = None
+        self.max_stream_age = DEFAULT_MAX_STREAM_AGE
+        self.timeout = None
+        self.instrumentation = None
+        self.streams = []
 
     def with_prefix(self, prefix: bytes):
         """ Configure the cursor with the specified prefix."""
         if prefix is None:
             raise ValueError('prefix is null')
+        if prefix != self.prefix:
+            self.close_seek_stream()
         self.prefix = prefix
         return self
 
+    def with_timeout(self, timeout: float):
+        """ Configure the cursor with the specified deadline in seconds for each Seek call (None means no deadline).
+            The long-lived stream used by persistent seeks has no deadline.
+        """
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout is not positive')
+        self.timeout = timeout
+        return self
+
+    def with_instrumentation(self, instrumentation: kv_metrics.Instrumentation):
+        """ Configure the cursor to report each Seek call to the specified instrumentation (None means no instrumentation)."""
+        self.close_seek_stream()
+        self.kv_stub = kv_metrics.instrument(self.kv_stub, instrumentation)
+        self.instrumentation = instrumentation
+        return self
+
     def enable_streaming(self, streaming: bool):
         """ Configure the cursor with the specified streaming flag."""
         if streaming is None:
@@ -37,16 +107,61 @@ class RemoteCursor:
         self.streaming = streaming
         return self
 
+    def enable_persistent_stream(self, persistent: bool):
+        """ Configure the cursor to keep one long-lived Seek stream open across seeks.
+            The server holds one read transaction per stream, so the seeks read the snapshot taken when the stream was opened
+            and the node cannot reclaim the pages freed since then. The stream is reopened at the first seek after
+            max_stream_age seconds, an idle stream is kept until then or until the cursor is closed.
+        """
+        if persistent is None:
+            raise ValueError('persistent is null')
+        if not persistent:
+            self.close_seek_stream()
+        self.persistent = persistent
+        return self
+
+    def with_max_stream_age(self, max_age: float):
+        """ Configure the cursor with the specified age in seconds of the long-lived Seek stream after which it is reopened,
+            bounding the staleness of the persistent seeks (None means never).
+        """
+        if max_age is not None and max_age <= 0:
+            raise ValueError('max_age is not positive')
+        self.max_stream_age = max_age
+        return self
+
     def seek(self, key: bytes) -> (bytes, bytes):
         """ Seek the value in the bucket associated to the specified key."""
         if key is None:
             raise ValueError('key is null')
         request = kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=key, prefix=self.prefix)
+        if self.persistent:
+            return self._seek_persistent(request)
         request_iterator = iter([request])
-        response_iterator = self.kv_stub.Seek(request_iterator)
+        response_iterator = self.kv_stub.Seek(request_iterator, timeout=self.timeout)
         response = next(response_iterator)
         return response.key, response.value
 
+    def _seek_persistent(self, request: kv_pb2.SeekRequest) -> (bytes, bytes):
+        """ Seek on the long-lived stream, (re)opening it when needed."""
+        # Empty seek key on an open stream means 'next' for the server, so it needs a fresh stream
+        if self.seek_stream is not None and (self.seek_stream.closed or not request.seekKey or self.is_seek_stream_expired()):
+            self.close_seek_stream()
+        if self.seek_stream is None:
+            self.seek_stream = SeekStream(self.kv_stub)
+        try:
+            response = self.seek_stream.seek(request)
+        except grpc.RpcError:
+            self.close_seek_stream()
+            raise
+        if not response.key:
+            # The server ends the stream after reaching the end of bucket or prefix
+            self.close_seek_stream()
+        return response.key, response.value
+
+    def is_seek_stream_expired(self) -> bool:
+        """ Return true if the long-lived Seek stream is older than max_stream_age."""
+        return self.max_stream_age is not None and self.seek_stream.age() >= self.max_stream_age
+
     def seek_exact(self, key: bytes) -> bytes:
         """ Seek the value in the bucket associated to the specified key, matching key exactly."""
         rsp_key, rsp_value = self.seek(key)
@@ -56,12 +171,116 @@ class RemoteCursor:
             value = None
         return value
 
-    def next(self) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
-        """ Get key-value streaming iterator for the bucket bound to prefix."""
-        request = kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=self.prefix, prefix=self.prefix, startSreaming=self.streaming)
+    def seek_many(self, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Seek the values in the bucket associated to the specified keys, returning the key-value pairs in the same order.
+            All the requests are pipelined on one Seek stream without waiting for each reply, cancelled once done.
+        """
+        if keys is None:
+            raise ValueError('keys is null')
+        keys = list(keys)
+        if any(key is None for key in keys):
+            raise ValueError('key is null')
+        pairs = []
+        while len(pairs) < len(keys):
+            start = len(pairs)
+            # Empty seek key is 'next' for the server after the first request, so it must start a new stream
+            end = next((i for i in range(start + 1, len(keys)) if not keys[i]), len(keys))
+            requests = [kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=key, prefix=self.prefix) for key in keys[start:end]]
+            response_iterator = self.kv_stub.Seek(iter(requests), timeout=self.timeout)
+            try:
+                for response in response_iterator:
+                    pairs.append((response.key, response.value))
+                    # The server ends the stream after reaching the end of bucket or prefix, next requests need a new one
+                    if len(pairs) == end or not response.key:
+                        break
+            finally:
+                response_iterator.cancel()
+            if len(pairs) == start:
+                pairs.append((b'', b''))
+        return pairs
+
+    def next(self, start_key: bytes = None) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        """ Get key-value streaming iterator for the bucket bound to prefix, starting at start_key if any.
+            The Seek call starts at the first iteration and is tracked by the cursor only while live. Callers stopping early
+            should close the returned iterator (or the cursor) to stop the server streaming.
+        """
+        return self._next(start_key)
+
+    def _next(self, start_key: bytes) -> Iterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        seek_key = max(start_key, self.prefix) if start_key is not None else self.prefix
+        request = kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=seek_key, prefix=self.prefix, startSreaming=self.streaming)
         request_iterator = iter([request])
-        response_iterator = self.kv_stub.Seek(request_iterator)
-        return response_iterator
+        response_iterator = self.kv_stub.Seek(request_iterator, timeout=self.timeout)
+        self.streams.append(response_iterator)
+        try:
+            yield from response_iterator
+        except GeneratorExit:
+            response_iterator.cancel()
+            raise
+        finally:
+            if response_iterator in self.streams:
+                self.streams.remove(response_iterator)
+
+    def range(self, start_key: bytes = None, end_key: bytes = None, limit: int = None,
+              reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        """ Get key-value iterator for the bucket bound to prefix in [start_key, end_key) range, stopping after limit pairs.
+            The Seek stream is cancelled as soon as the iteration stops. In reverse order the range is scanned from end_key
+            down, so end_key is required and the whole range is buffered.
+        """
+        kvstore.check_range(end_key, limit, reverse)
+        return self._range(start_key, end_key, limit, reverse)
+
+    def _range(self, start_key: bytes, end_key: bytes, limit: int, reverse: bool) -> Iterator[Tuple[bytes, bytes]]:
+        if limit == 0:
+            return
+        seek_key = max(start_key, self.prefix) if start_key is not None else self.prefix
+        request = kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=seek_key, prefix=self.prefix, startSreaming=True)
+        response_iterator = self.kv_stub.Seek(iter([request]), timeout=self.timeout)
+        try:
+            pairs = ((response.key, response.value) for response in response_iterator)
+            yield from kvstore.bound_range(pairs, end_key, limit, reverse)
+        finally:
+            response_iterator.cancel()
+
+    def key_sizes(self, start_key: bytes = None, end_key: bytes = None, limit: int = None) -> Iterator[Tuple[bytes, int]]:
+        """ Get key-value size iterator for the bucket bound to prefix in [start_key, end_key) range, without the values.
+            The values are not transferred unless the server does not implement SeekKeys, then they are sized locally.
+        """
+        kvstore.check_range(end_key, limit, False)
+        return self._key_sizes(start_key, end_key, limit)
+
+    def _key_sizes(self, start_key: bytes, end_key: bytes, limit: int) -> Iterator[Tuple[bytes, int]]:
+        if limit == 0:
+            return
+        seek_key = max(start_key, self.prefix) if start_key is not None else self.prefix
+        request = kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=seek_key, prefix=self.prefix, startSreaming=True)
+        response_iterator = self.kv_stub.SeekKeys(iter([request]), timeout=self.timeout)
+        try:
+            key_sizes = ((response.key, response.vSize) for response in response_iterator)
+            yield from kvstore.bound_range(key_sizes, end_key, limit, False)
+        except grpc.RpcError as error:
+            if error.code() != grpc.StatusCode.UNIMPLEMENTED: # pylint: disable=no-member
+                raise
+            yield from ((key, len(value)) for key, value in self._range(start_key, end_key, limit, False))
+        finally:
+            response_iterator.cancel()
+
+    def keys(self, start_key: bytes = None, end_key: bytes = None, limit: int = None) -> Iterator[bytes]:
+        """ Get key iterator for the bucket bound to prefix in [start_key, end_key) range, without the values."""
+        return (key for key, _ in self.key_sizes(start_key, end_key, limit))
+
+    def close_seek_stream(self) -> None:
+        """ Close the long-lived Seek stream, if any."""
+        if self.seek_stream is not None:
+            self.seek_stream.close()
+            self.seek_stream = None
+
+    def close(self) -> None:
+        """ Close the long-lived Seek stream and cancel the streams opened by next, if any."""
+        self.close_seek_stream()
+        for response_iterator in self.streams:
+            response_iterator.cancel()
+        self.streams.clear()
 
 class RemoteView:
     """ This class represents a remote read-only view on the KV.
@@ -70,36 +289,129 @@ class RemoteView:
         if kv_stub is None:
             raise ValueError('kv_stub is null')
         self.kv_stub = kv_stub
+        self.persistent = False
+        self.bucket_cursors = {}
+        self.max_stream_age = DEFAULT_MAX_STREAM_AGE
+        self.timeout = None
+        self.instrumentation = None
+
+    def with_timeout(self, timeout: float):
+        """ Configure the view with the specified deadline in seconds for each Seek call of its cursors (None means no deadline)."""
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout is not positive')
+        self.timeout = timeout
+        return self
+
+    def with_max_stream_age(self, max_age: float):
+        """ Configure the view with the specified age in seconds after which its long-lived Seek streams are reopened (None means never)."""
+        if max_age is not None and max_age <= 0:
+            raise ValueError('max_age is not positive')
+        self.max_stream_age = max_age
+        for cursor in self.bucket_cursors.values():
+            cursor.with_max_stream_age(max_age)
+        return self
+
+    def with_instrumentation(self, instrumentation: kv_metrics.Instrumentation):
+        """ Configure the view to report each Seek call of its cursors to the specified instrumentation (None means no instrumentation)."""
+        self.close()
+        self.kv_stub = kv_metrics.instrument(self.kv_stub, instrumentation)
+        self.instrumentation = instrumentation
+        return self
+
+    def enable_persistent_streams(self, persistent: bool):
+        """ Configure the view to serve get/get_exact using one long-lived Seek stream per bucket, reading the snapshot taken
+            when the stream was opened until it is reopened after max_stream_age seconds.
+        """
+        if persistent is None:
+            raise ValueError('persistent is null')
+        if not persistent:
+            self.close()
+        self.persistent = persistent
+        return self
 
     def cursor(self, bucket_name: str) -> RemoteCursor:
         """ Create a new remote cursor on the KV."""
-        return RemoteCursor(self.kv_stub, bucket_name)
+        return RemoteCursor(self.kv_stub, bucket_name).with_timeout(self.timeout).with_max_stream_age(self.max_stream_age)
+
+    def bucket_cursor(self, bucket_name: str) -> RemoteCursor:
+        """ Get the cursor used by get/get_exact for the specified bucket."""
+        if not self.persistent:
+            return self.cursor(bucket_name)
+        cursor = self.bucket_cursors.get(bucket_name)
+        if cursor is None:
+            cursor = self.cursor(bucket_name).enable_persistent_stream(True)
+            self.bucket_cursors[bucket_name] = cursor
+        return cursor
 
     def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
         """ Get the value associated to the key in specified bucket."""
-        return self.cursor(bucket_name).seek(key)
+        return self.bucket_cursor(bucket_name).seek(key)
 
     def get_exact(self, bucket_name: str, key: bytes) -> bytes:
         """ Get the value associated to the key in specified bucket, checking exact key match."""
-        return self.cursor(bucket_name).seek_exact(key)
+        return self.bucket_cursor(bucket_name).seek_exact(key)
+
+    def get_many(self, bucket_name: str, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs associated to the keys in specified bucket, pipelining the requests."""
+        return self.cursor(bucket_name).seek_many(keys)
+
+    def close(self) -> None:
+        """ Close all the long-lived Seek streams opened by the view."""
+        for cursor in self.bucket_cursors.values():
+            cursor.close()
+        self.bucket_cursors.clear()
 
 class RemoteKV:
     """ This class represents the remote KV store.
     """
-    def __init__(self, channel: grpc.Channel, kv_stub: kv_pb2_grpc.KVStub):
+    def __init__(self, channel: grpc.Channel, kv_stub: kv_pb2_grpc.KVStub, persistent_streams: bool = False, timeout: float = None,
+                 instrumentation: kv_metrics.Instrumentation = None, max_stream_age: float = DEFAULT_MAX_STREAM_AGE):
         if not channel:
             raise ValueError('channel is null')
         if not kv_stub:
             raise ValueError('kv_stub is null')
         self.channel = channel
         self.kv_stub = kv_stub
+        self.persistent_streams = persistent_streams
+        self.timeout = timeout
+        self.instrumentation = instrumentation
+        self.max_stream_age = max_stream_age
+        self.thread_local = threading.local()
+        self.persistent_views = []
+        self.persistent_views_lock = threading.Lock()
 
     def view(self) -> RemoteView:
-        """ Get a read-only view on the KV."""
-        return RemoteView(self.kv_stub)
+        """ Get a read-only view on the KV.
+            With persistent streams enabled, each thread gets its own view reusing the same Seek streams across calls, each
+            one reopened after max_stream_age seconds. Idle threads keep their streams (and the server transactions) open until
+            close_views.
+        """
+        if not self.persistent_streams:
+            return self.new_view()
+        view = getattr(self.thread_local, 'view', None)
+        if view is None:
+            view = self.new_view().enable_persistent_streams(True)
+            self.thread_local.view = view
+            with self.persistent_views_lock:
+                self.persistent_views.append(view)
+        return view
+
+    def new_view(self) -> RemoteView:
+        """ Create a new read-only view on the KV configured as the KV store."""
+        view = RemoteView(self.kv_stub).with_timeout(self.timeout).with_instrumentation(self.instrumentation)
+        return view.with_max_stream_age(self.max_stream_age)
+
+    def close_views(self) -> None:
+        """ Close the persistent views handed out by the remote KV."""
+        with self.persistent_views_lock:
+            for view in self.persistent_views:
+                view.close()
+            self.persistent_views.clear()
+        self.thread_local = threading.local()
 
     def close(self) -> None:
         """ Close the remove KV."""
+        self.close_views()
         self.channel.close()
 
 class SecurityOptions:
@@ -116,6 +428,23 @@ class SecurityOptions:
         self.client_cert = client_cert
         self.client_key = client_key
 
+    def channel_credentials(self) -> grpc.ChannelCredentials:
+        """ Load the SSL channel credentials from certificate files, None if channel is insecure.
+        """
+        if not self.server_cert:
+            return None
+        cert_chain = None
+        private_key = None
+        if self.client_cert:
+            with open(self.client_cert, 'rb') as file:
+                cert_chain = file.read()
+            with open(self.client_key, 'rb') as file:
+                private_key = file.read()
+
+        with open(self.server_cert, 'rb') as file:
+            root_cert = file.read()
+        return grpc.ssl_channel_credentials(root_cert, private_key, cert_chain)
+
 class RemoteClient:
     """ This class represents the remote KV client.
     """
@@ -124,6 +453,10 @@ class RemoteClient:
             raise ValueError('target is null')
         self.target = target
         self.options = options
+        self.persistent_streams = False
+        self.max_stream_age = DEFAULT_MAX_STREAM_AGE
+        self.timeout = None
+        self.instrumentation = None
 
     def with_target(self, target: str):
         """ Configure the client to use the specified server (address:port) end point.
@@ -133,24 +466,46 @@ class RemoteClient:
         self.target = target
         return self
 
+    def enable_persistent_streams(self, persistent: bool):
+        """ Configure the client to open KV stores reusing long-lived Seek streams (one per bucket and thread).
+        """
+        if persistent is None:
+            raise ValueError('persistent is null')
+        self.persistent_streams = persistent
+        return self
+
+    def with_max_stream_age(self, max_age: float):
+        """ Configure the client to open KV stores reopening their long-lived Seek streams after the specified age in seconds.
+            None means never, i.e. the persistent reads can be as stale as the oldest stream.
+        """
+        if max_age is not None and max_age <= 0:
+            raise ValueError('max_age is not positive')
+        self.max_stream_age = max_age
+        return self
+
+    def with_timeout(self, timeout: float):
+        """ Configure the client to open KV stores having the specified deadline in seconds for each Seek call.
+            None means no deadline. The long-lived persistent streams never have a deadline.
+        """
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout is not positive')
+        self.timeout = timeout
+        return self
+
+    def with_instrumentation(self, instrumentation: kv_metrics.Instrumentation):
+        """ Configure the client to open KV stores reporting each Seek call to the specified instrumentation (e.g. MetricsCollector).
+        """
+        self.instrumentation = instrumentation
+        return self
+
     def open(self) -> RemoteKV:
         """ Open a new remote KV store instance.
         """
-        if self.options.server_cert:
-            cert_chain = None
-            private_key = None
-            if self.options.client_cert:
-                with open(self.options.client_cert, 'rb') as file:
-                    cert_chain = file.read()
-                with open(self.options.client_key, 'rb') as file:
-                    private_key = file.read()
-
-            with open(self.options.server_cert, 'rb') as file:
-                root_cert = file.read()
-            credentials = grpc.ssl_channel_credentials(root_cert, private_key, cert_chain)
+        credentials = self.options.channel_credentials()
+        if credentials:
             channel = grpc.secure_channel(self.target, credentials)
         else:
             channel = grpc.insecure_channel(self.target)
 
         kv_stub = kv_pb2_grpc.KVStub(channel)
-        return RemoteKV(channel, kv_stub)
+        return RemoteKV(channel, kv_stub, self.persistent_streams, self.timeout, self.instrumentation, self.max_stream_age)
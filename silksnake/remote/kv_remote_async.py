@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""The TurboGeth/Silkworm KV gRPC remote client for asyncio."""
+
+from typing import AsyncIterator, Iterable, List, NamedTuple, Tuple
+
+import grpc
+import grpc.aio
+
+from .kv_remote import DEFAULT_PREFIX, DEFAULT_TARGET, SecurityOptions
+from .proto import kv_pb2, kv_pb2_grpc
+
+class AsyncRemoteCursor:
+    """ This class represents a remote read-only cursor on the KV for asyncio.
+    """
+    def __init__(self, kv_stub: kv_pb2_grpc.KVStub, bucket_name: str):
+        if kv_stub is None:
+            raise ValueError('kv_stub is null')
+        if bucket_name is None:
+            raise ValueError('bucket_name is null')
+        self.kv_stub = kv_stub
+        self.bucket_name = bucket_name
+        self.prefix = DEFAULT_PREFIX
+        self.streaming = False
+        self.timeout = None
+
+    def with_prefix(self, prefix: bytes):
+        """ Configure the cursor with the specified prefix."""
+        if prefix is None:
+            raise ValueError('prefix is null')
+        self.prefix = prefix
+        return self
+
+    def enable_streaming(self, streaming: bool):
+        """ Configure the cursor with the specified streaming flag."""
+        if streaming is None:
+            raise ValueError('streaming is null')
+        self.streaming = streaming
+        return self
+
+    def with_timeout(self, timeout: float):
+        """ Configure the cursor with the specified deadline in seconds for each Seek call (None means no deadline)."""
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout is not positive')
+        self.timeout = timeout
+        return self
+
+    async def seek(self, key: bytes) -> (bytes, bytes):
+        """ Seek the value in the bucket associated to the specified key."""
+        if key is None:
+            raise ValueError('key is null')
+        request = kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=key, prefix=self.prefix)
+        call = self.kv_stub.Seek(iter([request]), timeout=self.timeout)
+        response = await call.read()
+        if response is grpc.aio.EOF:
+            return b'', b''
+        return response.key, response.value
+
+    async def seek_exact(self, key: bytes) -> bytes:
+        """ Seek the value in the bucket associated to the specified key, matching key exactly."""
+        rsp_key, rsp_value = await self.seek(key)
+        if rsp_key == key:
+            value = rsp_value
+        else:
+            value = None
+        return value
+
+    async def seek_many(self, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Seek the values in the bucket associated to the specified keys, returning the key-value pairs in the same order.
+            All the requests are pipelined on one Seek stream without waiting for each reply.
+        """
+        if keys is None:
+            raise ValueError('keys is null')
+        keys = list(keys)
+        if any(key is None for key in keys):
+            raise ValueError('key is null')
+        pairs = []
+        while len(pairs) < len(keys):
+            start = len(pairs)
+            # Empty seek key is 'next' for the server after the first request, so it must start a new stream
+            end = next((i for i in range(start + 1, len(keys)) if not keys[i]), len(keys))
+            requests = [kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=key, prefix=self.prefix) for key in keys[start:end]]
+            call = self.kv_stub.Seek(iter(requests), timeout=self.timeout)
+            while len(pairs) < end:
+                response = await call.read()
+                if response is grpc.aio.EOF:
+                    break
+                pairs.append((response.key, response.value))
+                # The server ends the stream after reaching the end of bucket or prefix, next requests need a new one
+                if not response.key:
+                    break
+            if len(pairs) == start:
+                pairs.append((b'', b''))
+        return pairs
+
+    async def next(self, start_key: bytes = None) -> AsyncIterator[NamedTuple('Pair', [('key', bytes), ('value', bytes)])]:
+        """ Get key-value asynchronous streaming iterator for the bucket bound to prefix, starting at start_key if any."""
+        seek_key = max(start_key, self.prefix) if start_key is not None else self.prefix
+        request = kv_pb2.SeekRequest(bucketName=self.bucket_name, seekKey=seek_key, prefix=self.prefix, startSreaming=self.streaming)
+        call = self.kv_stub.Seek(iter([request]), timeout=self.timeout)
+        try:
+            async for response in call:
+                yield response
+        finally:
+            call.cancel()
+
+class AsyncRemoteView:
+    """ This class represents a remote read-only view on the KV for asyncio.
+    """
+    def __init__(self, kv_stub: kv_pb2_grpc.KVStub):
+        if kv_stub is None:
+            raise ValueError('kv_stub is null')
+        self.kv_stub = kv_stub
+        self.timeout = None
+
+    def with_timeout(self, timeout: float):
+        """ Configure the view with the specified deadline in seconds for each Seek call of its cursors (None means no deadline)."""
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout is not positive')
+        self.timeout = timeout
+        return self
+
+    def cursor(self, bucket_name: str) -> AsyncRemoteCursor:
+        """ Create a new remote cursor on the KV."""
+        return AsyncRemoteCursor(self.kv_stub, bucket_name).with_timeout(self.timeout)
+
+    async def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
+        """ Get the value associated to the key in specified bucket."""
+        return await self.cursor(bucket_name).seek(key)
+
+    async def get_exact(self, bucket_name: str, key: bytes) -> bytes:
+        """ Get the value associated to the key in specified bucket, checking exact key match."""
+        return await self.cursor(bucket_name).seek_exact(key)
+
+    async def get_many(self, bucket_name: str, keys: Iterable[bytes]) -> List[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs associated to the keys in specified bucket, pipelining the requests."""
+        return await self.cursor(bucket_name).seek_many(keys)
+
+class AsyncRemoteKV:
+    """ This class represents the remote KV store for asyncio.
+    """
+    def __init__(self, channel: grpc.aio.Channel, kv_stub: kv_pb2_grpc.KVStub, timeout: float = None):
+        if not channel:
+            raise ValueError('channel is null')
+        if not kv_stub:
+            raise ValueError('kv_stub is null')
+        self.channel = channel
+        self.kv_stub = kv_stub
+        self.timeout = timeout
+
+    def view(self) -> AsyncRemoteView:
+        """ Get a read-only view on the KV."""
+        return AsyncRemoteView(self.kv_stub).with_timeout(self.timeout)
+
+    async def close(self) -> None:
+        """ Close the remote KV."""
+        await self.channel.close()
+
+class AsyncRemoteClient:
+    """ This class represents the remote KV client for asyncio.
+    """
+    def __init__(self, target: str = DEFAULT_TARGET, options: SecurityOptions = SecurityOptions()):
+        if not target:
+            raise ValueError('target is null')
+        self.target = target
+        self.options = options
+        self.timeout = None
+
+    def with_target(self, target: str):
+        """ Configure the client to use the specified server (address:port) end point.
+        """
+        if target is None:
+            raise ValueError('target is null')
+        self.target = target
+        return self
+
+    def with_timeout(self, timeout: float):
+        """ Configure the client to open KV stores having the specified deadline in seconds for each Seek call (None means no deadline).
+        """
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout is not positive')
+        self.timeout = timeout
+        return self
+
+    def open(self) -> AsyncRemoteKV:
+        """ Open a new remote KV store instance, to be called within the running event loop.
+        """
+        credentials = self.options.channel_credentials()
+        if credentials:
+            channel = grpc.aio.secure_channel(self.target, credentials)
+        else:
+            channel = grpc.aio.insecure_channel(self.target)
+
+        kv_stub = kv_pb2_grpc.KVStub(channel)
+        return AsyncRemoteKV(channel, kv_stub, self.timeout)
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""The in-process reference TurboGeth/Silkworm KV gRPC server backed by an in-memory sorted key space."""
+
+import bisect
+import concurrent.futures
+import json
+import struct
+from typing import Dict, Iterable, Iterator, Tuple
+
+import grpc
+
+from .kv_remote import DEFAULT_TARGET
+from .proto import kv_pb2, kv_pb2_grpc
+
+BUCKET_NAME_HEADER = struct.Struct('>H')
+KEY_VALUE_HEADER = struct.Struct('>II')
+
+class MemoryBucket:
+    """ This class represents an in-memory bucket keeping its keys sorted.
+    """
+    def __init__(self):
+        self.keys = []
+        self.values = {}
+
+    def put(self, key: bytes, value: bytes) -> None:
+        """ Associate value to key in the bucket."""
+        if key not in self.values:
+            bisect.insort(self.keys, key)
+        self.values[key] = value
+
+    def load(self, pairs: Iterable[Tuple[bytes, bytes]]) -> None:
+        """ Associate the values to the keys of the given pairs in the bucket, sorting the keys just once."""
+        self.values.update(pairs)
+        self.keys = sorted(self.values)
+
+    def seek_index(self, key: bytes) -> int:
+        """ Return the index of the least key greater than or equal to the specified key."""
+        return bisect.bisect_left(self.keys, key)
+
+    def pair(self, index: int, prefix: bytes) -> (bytes, bytes):
+        """ Return the key-value pair at index, or the empty pair if out of range or not bound to prefix."""
+        if index >= len(self.keys) or not self.keys[index].startswith(prefix):
+            return b'', b''
+        key = self.keys[index]
+        return key, self.values[key]
+
+    def __len__(self):
+        return len(self.keys)
+
+class MemoryStore:
+    """ This class represents an in-memory key-value store made of sorted buckets.
+    """
+    def __init__(self):
+        self.buckets: Dict[str, MemoryBucket] = {}
+
+    def bucket(self, bucket_name: str) -> MemoryBucket:
+        """ Get the bucket having the specified name, creating it if missing."""
+        if bucket_name not in self.buckets:
+            self.buckets[bucket_name] = MemoryBucket()
+        return self.buckets[bucket_name]
+
+    def put(self, bucket_name: str, key: bytes, value: bytes) -> None:
+        """ Associate value to key in the specified bucket."""
+        if bucket_name is None:
+            raise ValueError('bucket_name is null')
+        if not key:
+            raise ValueError('key is null or empty')
+        self.bucket(bucket_name).put(key, value)
+
+    def load(self, triples: Iterable[Tuple[str, bytes, bytes]]) -> None:
+        """ Associate the values to the keys in the buckets of the given (bucket, key, value) triples, sorting each bucket once."""
+        bucket_pairs: Dict[str, list] = {}
+        for bucket_name, key, value in triples:
+            if bucket_name is None:
+                raise ValueError('bucket_name is null')
+            if not key:
+                raise ValueError('key is null or empty')
+            bucket_pairs.setdefault(bucket_name, []).append((key, value))
+        for bucket_name, pairs in bucket_pairs.items():
+            self.bucket(bucket_name).load(pairs)
+
+    def items(self) -> Iterator[Tuple[str, bytes, bytes]]:
+        """ Get the (bucket, key, value) triples in bucket and key order."""
+        for bucket_name in sorted(self.buckets):
+            bucket = self.buckets[bucket_name]
+            for key in bucket.keys:
+                yield bucket_name, key, bucket.values[key]
+
+    @classmethod
+    def from_json(cls, json_data: str):
+        """ Create a store from JSON data as object {bucket: {key: value}} or array of {bucketName, key, value} objects.
+            Objects mapping names to such arrays (like the unit test sets) are also accepted.
+            Keys and values are hex strings without leading 0x, entries having empty key are skipped.
+        """
+        store = cls()
+        data = json.loads(json_data)
+        if isinstance(data, list):
+            data = {'': data}
+        triples = []
+        for bucket_name, entries in data.items():
+            if isinstance(entries, dict):
+                entries = [{'bucketName': bucket_name, 'key': key, 'value': value} for key, value in entries.items()]
+            for entry in entries:
+                if entry['key']:
+                    triples.append((entry['bucketName'], bytes.fromhex(entry['key']), bytes.fromhex(entry['value'])))
+        store.load(triples)
+        return store
+
+    @classmethod
+    def from_binary(cls, binary_data: bytes):
+        """ Create a store from binary data as sequence of [u16 blen][bucket][u32 klen][u32 vlen][key][value] records (big-endian)."""
+        store = cls()
+        triples = []
+        offset = 0
+        while offset < len(binary_data):
+            bucket_name_length, = BUCKET_NAME_HEADER.unpack_from(binary_data, offset)
+            offset += BUCKET_NAME_HEADER.size
+            bucket_name = binary_data[offset:offset + bucket_name_length].decode()
+            offset += bucket_name_length
+            key_length, value_length = KEY_VALUE_HEADER.unpack_from(binary_data, offset)
+            offset += KEY_VALUE_HEADER.size
+            key = binary_data[offset:offset + key_length]
+            offset += key_length
+            value = binary_data[offset:offset + value_length]
+            offset += value_length
+            triples.append((bucket_name, key, value))
+        store.load(triples)
+        return store
+
+    @classmethod
+    def from_file(cls, filename: str):
+        """ Create a store from fixture file, as JSON if it has .json extension or binary otherwise."""
+        if filename.endswith('.json'):
+            with open(filename, 'r', encoding='utf-8') as fixture_file:
+                return cls.from_json(fixture_file.read())
+        with open(filename, 'rb') as fixture_file:
+            return cls.from_binary(fixture_file.read())
+
+    def to_binary(self) -> bytes:
+        """ Encode the whole store as binary fixture data."""
+        buffer = bytearray()
+        for bucket_name, key, value in self.items():
+            bucket_name_bytes = bucket_name.encode()
+            buffer += BUCKET_NAME_HEADER.pack(len(bucket_name_bytes)) + bucket_name_bytes
+            buffer += KEY_VALUE_HEADER.pack(len(key), len(value)) + key + value
+        return bytes(buffer)
+
+class KVServicer(kv_pb2_grpc.KVServicer):
+    """ This class represents the reference implementation of the KV service on the in-memory store.
+        The first request binds bucket and prefix, then each non-empty seek key seeks and each empty one moves next.
+        In streaming mode all the pairs bound to prefix are sent at once. The empty pair is sent and the stream
+        closed as soon as the end of bucket or prefix is reached.
+    """
+    def __init__(self, store: MemoryStore):
+        if store is None:
+            raise ValueError('store is null')
+        self.store = store
+
+    def Seek(self, request_iterator: Iterable[kv_pb2.SeekRequest], context) -> Iterator[kv_pb2.Pair]: # pylint: disable=invalid-name
+        return (kv_pb2.Pair(key=key, value=value) for key, value in self.seek_pairs(request_iterator))
+
+    def SeekKeys(self, request_iterator: Iterable[kv_pb2.SeekRequest], context) -> Iterator[kv_pb2.PairKey]: # pylint: disable=invalid-name
+        return (kv_pb2.PairKey(key=key, vSize=len(value)) for key, value in self.seek_pairs(request_iterator))
+
+    def seek_pairs(self, request_iterator: Iterable[kv_pb2.SeekRequest]) -> Iterator[Tuple[bytes, bytes]]:
+        """ Get the key-value pairs answering the Seek requests."""
+        request = next(request_iterator, None)
+        if request is None:
+            return
+        bucket = self.store.buckets.get(request.bucketName, MemoryBucket())
+        prefix = request.prefix
+        index = bucket.seek_index(request.seekKey)
+        while True:
+            key, value = bucket.pair(index, prefix)
+            yield key, value
+            if not key:
+                return
+            if not request.startSreaming:
+                request = next(request_iterator, None)
+                if request is None:
+                    return
+                if request.seekKey:
+                    index = bucket.seek_index(request.seekKey)
+                    continue
+            index += 1
+
+def serve(store: MemoryStore, target: str = DEFAULT_TARGET, max_workers: int = 10) -> grpc.Server:
+    """ Start serving the KV service for store at target (address:port) and return the running server.
+        Use port 0 in target to bind any free port, available as server.port.
+    """
+    if store is None:
+        raise ValueError('store is null')
+    if not target:
+        raise ValueError('target is null')
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=max_workers))
+    kv_pb2_grpc.add_KVServicer_to_server(KVServicer(store), server)
+    server.port = server.add_insecure_port(target)
+    server.start()
+    return server
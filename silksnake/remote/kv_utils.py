@@ -19,19 +19,23 @@ def kv_seek(bucket: str, seek_key: bytes, target: str) -> (bytes, bytes):
         remote_kv.close()
     return key, value
 
-def kv_walk(target: str, bucket: str, prefix: bytes, walker: Callable[[bytes, bytes], bool]):
-    """ Walk through the cursor streaming the KV interface of turbo-geth/silkworm running at target.
+def kv_walk(target: str, bucket: str, prefix: bytes, walker: Callable[[bytes, bytes], bool], start_key: bytes = None):
+    """ Walk through the cursor streaming the KV interface of turbo-geth/silkworm running at target, starting at start_key if any.
     """
     remote_kv_client = kv_remote.RemoteClient()
     remote_kv = remote_kv_client.with_target(target).open()
     try:
         cursor = remote_kv.view().cursor(bucket).with_prefix(prefix).enable_streaming(True)
-        for pair in cursor.next():
-            if not pair.key:
-                break
-            stop = walker(pair.key, pair.value)
-            if stop:
-                break
+        try:
+            for pair in cursor.next(start_key):
+                if not pair.key:
+                    break
+                stop = walker(pair.key, pair.value)
+                if stop:
+                    break
+        finally:
+            # Cancel the stream on early exit, otherwise the server keeps streaming until the channel is closed
+            cursor.close()
     finally:
         remote_kv.close()
 
@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=b'\n\020io.turbo-geth.dbB\002KVP\001Z\017./remote;remote',
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x1fsilksnake/remote/proto/kv.proto\x12\x06remote\"Y\n\x0bSeekRequest\x12\x12\n\nbucketName\x18\x01 \x01(\t\x12\x0f\n\x07seekKey\x18\x02 \x01(\x0c\x12\x0e\n\x06prefix\x18\x03 \x01(\x0c\x12\x15\n\rstartSreaming\x18\x04 \x01(\x08\"\"\n\x04Pair\x12\x0b\n\x03key\x18\x01 \x01(\x0c\x12\r\n\x05value\x18\x02 \x01(\x0c\"%\n\x07PairKey\x12\x0b\n\x03key\x18\x01 \x01(\x0c\x12\r\n\x05vSize\x18\x02 \x01(\x04\x32\x33\n\x02KV\x12-\n\x04Seek\x12\x13.remote.SeekRequest\x1a\x0c.remote.Pair(\x01\x30\x01\x42)\n\x10io.turbo-geth.dbB\x02KVP\x01Z\x0f./remote;remoteb\x06proto3'
+  serialized_pb=b'\n\x1fsilksnake/remote/proto/kv.proto\x12\x06remote\"Y\n\x0bSeekRequest\x12\x12\n\nbucketName\x18\x01 \x01(\t\x12\x0f\n\x07seekKey\x18\x02 \x01(\x0c\x12\x0e\n\x06prefix\x18\x03 \x01(\x0c\x12\x15\n\rstartSreaming\x18\x04 \x01(\x08\"\"\n\x04Pair\x12\x0b\n\x03key\x18\x01 \x01(\x0c\x12\r\n\x05value\x18\x02 \x01(\x0c\"%\n\x07PairKey\x12\x0b\n\x03key\x18\x01 \x01(\x0c\x12\r\n\x05vSize\x18\x02 \x01(\x04\x32i\n\x02KV\x12-\n\x04Seek\x12\x13.remote.SeekRequest\x1a\x0c.remote.Pair(\x01\x30\x01\x12\x34\n\x08SeekKeys\x12\x13.remote.SeekRequest\x1a\x0f.remote.PairKey(\x01\x30\x01\x42)\n\x10io.turbo-geth.dbB\x02KVP\x01Z\x0f./remote;remoteb\x06proto3'
 )
 
 
@@ -192,7 +192,7 @@ _KV = _descriptor.ServiceDescriptor(
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
   serialized_start=209,
-  serialized_end=260,
+  serialized_end=314,
   methods=[
   _descriptor.MethodDescriptor(
     name='Seek',
@@ -204,6 +204,16 @@ _KV = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='SeekKeys',
+    full_name='remote.KV.SeekKeys',
+    index=1,
+    containing_service=None,
+    input_type=_SEEKREQUEST,
+    output_type=_PAIRKEY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_KV)
 
@@ -20,6 +20,11 @@ class KVStub(object):
                 request_serializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.SeekRequest.SerializeToString,
                 response_deserializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.Pair.FromString,
                 )
+        self.SeekKeys = channel.stream_stream(
+                '/remote.KV/SeekKeys',
+                request_serializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.SeekRequest.SerializeToString,
+                response_deserializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.PairKey.FromString,
+                )
 
 
 class KVServicer(object):
@@ -36,6 +41,13 @@ class KVServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SeekKeys(self, request_iterator, context):
+        """same as Seek but streams only the keys and the value sizes, without the values
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_KVServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -44,6 +56,11 @@ def add_KVServicer_to_server(servicer, server):
                     request_deserializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.SeekRequest.FromString,
                     response_serializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.Pair.SerializeToString,
             ),
+            'SeekKeys': grpc.stream_stream_rpc_method_handler(
+                    servicer.SeekKeys,
+                    request_deserializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.SeekRequest.FromString,
+                    response_serializer=silksnake_dot_remote_dot_proto_dot_kv__pb2.PairKey.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'remote.KV', rpc_method_handlers)
@@ -71,3 +88,20 @@ class KV(object):
             silksnake_dot_remote_dot_proto_dot_kv__pb2.Pair.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SeekKeys(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/remote.KV/SeekKeys',
+            silksnake_dot_remote_dot_proto_dot_kv__pb2.SeekRequest.SerializeToString,
+            silksnake_dot_remote_dot_proto_dot_kv__pb2.PairKey.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
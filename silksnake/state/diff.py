@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""The chain state difference between two block heights."""
+
+import os
+import sqlite3
+import tempfile
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+from ..core import changeset, history, kvstore
+from ..core.constants import ADDRESS_SIZE
+from ..helpers.dbutils import composite_keys, tables, timestamp
+
+DEFAULT_MAX_ENTRIES: int = 1000000
+DEFAULT_BATCH_SIZE: int = 1024
+
+class StateChange(NamedTuple):
+    """ This class represents the net change of one account (encoded) or storage slot (plain composite key).
+        Empty before means missing at from_block, empty after means missing at to_block.
+    """
+    storage: bool
+    key: bytes
+    before: bytes
+    after: bytes
+
+class FirstValueStore:
+    """ This class represents the first value seen for each key, kept in memory up to max_entries and then
+        spilled to a temporary SQLite file, so that folding any block range takes bounded memory.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, directory: str = None):
+        if max_entries is None or max_entries < 0:
+            raise ValueError('max_entries is null or negative')
+        self.max_entries = max_entries
+        self.directory = directory
+        self.values = {}
+        self.path = None
+        self.connection = None
+
+    @property
+    def spilled(self) -> bool:
+        """ Return true if the values have been spilled to disk."""
+        return self.connection is not None
+
+    def add(self, key: bytes, value: bytes) -> None:
+        """ Associate value to key unless key has already been seen."""
+        if self.connection is not None:
+            self.connection.execute('INSERT OR IGNORE INTO first_values VALUES (?, ?)', (key, value))
+            return
+        if key not in self.values:
+            self.values[key] = value
+            if len(self.values) > self.max_entries:
+                self.spill()
+
+    def spill(self) -> None:
+        """ Move the values in memory to a new temporary SQLite file."""
+        descriptor, self.path = tempfile.mkstemp(suffix='.sqlite', dir=self.directory)
+        os.close(descriptor)
+        # The store may be filled in one thread and read in another one, never concurrently
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE first_values (key BLOB PRIMARY KEY, value BLOB) WITHOUT ROWID')
+        self.connection.executemany('INSERT INTO first_values VALUES (?, ?)', self.values.items())
+        self.values = {}
+
+    def items(self) -> Iterator[Tuple[bytes, bytes]]:
+        """ Get the (key, first value) iterator in key order."""
+        if self.connection is None:
+            yield from sorted(self.values.items())
+            return
+        for key, value in self.connection.execute('SELECT key, value FROM first_values ORDER BY key'):
+            yield bytes(key), bytes(value)
+
+    def __len__(self):
+        if self.connection is None:
+            return len(self.values)
+        return self.connection.execute('SELECT COUNT(*) FROM first_values').fetchone()[0]
+
+    def close(self) -> None:
+        """ Drop the values, removing the temporary SQLite file if any."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+            os.remove(self.path)
+        self.values = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def diff(view: kvstore.View, from_block: int, to_block: int, accounts: Iterable[bytes] = None,
+         max_entries: int = DEFAULT_MAX_ENTRIES, directory: str = None, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[StateChange]:
+    """ Yield the net changes of accounts then storage slots between the state as of from_block and as of to_block in key order.
+        The state as of a block is the one after executing it, as read by StateReader. The change sets of the blocks in
+        (from_block, to_block] are streamed once: the first value seen for a key is its before value, the after values are
+        read in batches as of to_block. Keys whose before and after values match are skipped.
+        Only the given accounts (addresses) are considered if any. Values beyond max_entries keys spill to directory.
+    """
+    if from_block is None or from_block < 0:
+        raise ValueError('from_block is null or negative')
+    if to_block is None or to_block < from_block:
+        raise ValueError('to_block is null or lower than from_block')
+    if batch_size is None or batch_size <= 0:
+        raise ValueError('batch_size is null or not positive')
+    addresses = set(bytes(address) for address in accounts) if accounts is not None else None
+
+    for storage in (False, True):
+        with FirstValueStore(max_entries, directory) as first_values:
+            for key, value in iter_changes(view, storage, from_block + 1, to_block + 1):
+                if addresses is None or key[:ADDRESS_SIZE] in addresses:
+                    first_values.add(key, value)
+            batch = []
+            for key, before in first_values.items():
+                batch.append((key, before))
+                if len(batch) == batch_size:
+                    yield from diff_batch(view, storage, batch, to_block)
+                    batch = []
+            if batch:
+                yield from diff_batch(view, storage, batch, to_block)
+
+def iter_changes(view: kvstore.View, storage: bool, from_block: int, to_block: int = None) -> Iterator[Tuple[bytes, bytes]]:
+    """ Yield the (key, value before change) pairs of the account or storage change sets in [from_block, to_block) in block order.
+        No to_block means up to the latest change set.
+    """
+    start_key = timestamp.encode_timestamp(from_block)
+    end_key = timestamp.encode_timestamp(to_block) if to_block is not None else None
+    change_sets = view.cursor(history.change_set_bucket(storage)).range(start_key, end_key)
+    try:
+        for _, change_set_data in change_sets:
+            if storage:
+                for address, incarnation, changes in changeset.PlainStorageChangeSet(change_set_data):
+                    address = bytes.fromhex(address)
+                    for change in changes:
+                        yield composite_keys.create_plain_composite_storage_key(address, incarnation, change.key), change.value
+            else:
+                for change in changeset.PlainAccountChangeSet(change_set_data):
+                    yield bytes(change.key), bytes(change.value)
+    finally:
+        change_sets.close()
+
+def diff_batch(view: kvstore.View, storage: bool, batch: List[Tuple[bytes, bytes]], to_block: int) -> List[StateChange]:
+    """ Return the net changes of the given (key, before) batch, reading the after values as of to_block (i.e. after executing it)."""
+    keys = [key for key, _ in batch]
+    befores = [before for _, before in batch]
+    if not storage:
+        restored = list(befores)
+        history.restore_many_code_hashes(view, keys, restored)
+        befores = [value if value is not None else before for value, before in zip(restored, befores)]
+    afters = history.find_many_by_history(view, storage, keys, to_block + 1)
+    misses = [i for i, after in enumerate(afters) if after is None]
+    if misses:
+        pairs = view.get_many(tables.PLAIN_STATE_LABEL, [keys[i] for i in misses])
+        for i, (key, value) in zip(misses, pairs):
+            afters[i] = value if key == keys[i] else b''
+    return [StateChange(storage, key, before or b'', after or b'') for key, before, after in zip(keys, befores, afters)
+            if (before or b'') != (after or b'')]
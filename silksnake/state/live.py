@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""The in-memory chain state following the chain head."""
+
+import threading
+import time
+from typing import Iterable, List, Set
+
+from . import diff
+from ..core import account, kvstore
+from ..helpers import cache
+from ..helpers.dbutils import composite_keys, tables
+from ..rlp import sedes
+from ..stagedsync import stages
+from ..types.address import Address
+
+DEFAULT_MAX_SIZE: int = 16 * 1024 * 1024
+DEFAULT_POLL_INTERVAL: float = 1.0
+DEFAULT_MAX_CATCH_UP_BLOCKS: int = 128
+
+class LiveStateCache: # pylint: disable=too-many-instance-attributes
+    """ This class represents the working set of accounts (encoded) and storage slots (plain composite key) as of the latest block,
+        bounded by the total byte size of its entries. Reads poll the FINISH stage progress at most every poll_interval seconds:
+        the entries changed by each new block (from its account and storage change sets) are refreshed, while all of them are
+        dropped on unwind, on reorg (the canonical hash of the cached block changed, even if the head moved past it again) or
+        when more than max_catch_up_blocks blocks are behind. Missing keys are cached as empty values.
+        A generation counter, bumped at each refresh, prevents a read racing with a refresh from caching an outdated value.
+    """
+    def __init__(self, database: kvstore.KV, max_size: int = DEFAULT_MAX_SIZE, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 max_catch_up_blocks: int = DEFAULT_MAX_CATCH_UP_BLOCKS):
+        if database is None:
+            raise ValueError('database is null')
+        if poll_interval is None or poll_interval < 0:
+            raise ValueError('poll_interval is null or negative')
+        if max_catch_up_blocks is None or max_catch_up_blocks < 0:
+            raise ValueError('max_catch_up_blocks is null or negative')
+        self.database = database
+        self.entries = cache.LRUCache(max_size)
+        self.poll_interval = poll_interval
+        self.max_catch_up_blocks = max_catch_up_blocks
+        self.block_number = None
+        self.block_hash = None
+        self.generation = 0
+        self.last_poll_time = None
+        self.lock = threading.Lock()
+
+    def poll(self) -> int:
+        """ Follow the chain head up to the FINISH stage progress, refreshing the changed entries. Return the latest block number."""
+        with self.lock:
+            self.last_poll_time = time.monotonic()
+            head_block_number, _ = stages.get_stage_progress(self.database, stages.SyncStage.FINISH)
+            view = self.database.view()
+            head_block_hash = self.read_canonical_block_hash(view, head_block_number)
+            if self.block_number is not None:
+                same_head = head_block_number == self.block_number
+                reorg = (head_block_hash if same_head else self.read_canonical_block_hash(view, self.block_number)) != self.block_hash
+                if reorg or not same_head:
+                    self.generation += 1
+                    if reorg or head_block_number < self.block_number or head_block_number - self.block_number > self.max_catch_up_blocks:
+                        self.entries.clear()
+                    else:
+                        self.refresh(view, self.changed_keys(view, self.block_number + 1, head_block_number + 1))
+            self.block_number, self.block_hash = head_block_number, head_block_hash
+            return head_block_number
+
+    @staticmethod
+    def read_canonical_block_hash(view: kvstore.View, block_number: int) -> bytes:
+        """ Return the canonical hash of the given block (empty if missing)."""
+        canonical_block_number = sedes.encode_canonical_block_number(block_number)
+        key, block_hash_bytes = view.get(tables.BLOCK_HEADERS_LABEL, canonical_block_number)
+        return bytes(block_hash_bytes) if key == canonical_block_number else b''
+
+    def maybe_poll(self) -> None:
+        """ Poll the chain head if never done or if poll_interval seconds have elapsed since the last time."""
+        last_poll_time = self.last_poll_time
+        if last_poll_time is None or time.monotonic() - last_poll_time >= self.poll_interval:
+            self.poll()
+
+    def changed_keys(self, view: kvstore.View, from_block: int, to_block: int) -> Set[bytes]:
+        """ Return the cached keys changed by the blocks in [from_block, to_block)."""
+        keys = set()
+        for storage in (False, True):
+            for key, _ in diff.iter_changes(view, storage, from_block, to_block):
+                if key in self.entries:
+                    keys.add(key)
+        return keys
+
+    def refresh(self, view: kvstore.View, keys: Iterable[bytes]) -> None:
+        """ Read again the latest values of the given keys in one batch."""
+        keys = sorted(keys)
+        if not keys:
+            return
+        for key, (rsp_key, rsp_value) in zip(keys, view.get_many(tables.PLAIN_STATE_LABEL, keys)):
+            self.store(key, bytes(rsp_value) if rsp_key == key else b'')
+
+    def store(self, key: bytes, value: bytes) -> None:
+        """ Cache the latest value of key."""
+        self.entries.put(key, value, len(key) + len(value))
+
+    def get_many(self, keys: Iterable[bytes]) -> List[bytes]:
+        """ Get the latest values (empty if missing) of the given plain state keys, reading only the uncached ones in one batch."""
+        if keys is None:
+            raise ValueError('keys is null')
+        keys = [bytes(key) for key in keys]
+        self.maybe_poll()
+        values = [self.entries.get(key) for key in keys]
+        missing_indexes = [i for i, value in enumerate(values) if value is None]
+        if missing_indexes:
+            generation = self.generation
+            missing_keys = [keys[i] for i in missing_indexes]
+            pairs = self.database.view().get_many(tables.PLAIN_STATE_LABEL, missing_keys)
+            for i, (rsp_key, rsp_value) in zip(missing_indexes, pairs):
+                values[i] = bytes(rsp_value) if rsp_key == keys[i] else b''
+            with self.lock:
+                if generation == self.generation:
+                    for i in missing_indexes:
+                        self.store(keys[i], values[i])
+        return values
+
+    def get(self, key: bytes) -> bytes:
+        """ Get the latest value (empty if missing) of the given plain state key."""
+        if key is None:
+            raise ValueError('key is null')
+        return self.get_many([key])[0]
+
+    def read_account_data(self, address: str) -> account.Account:
+        """ Get the latest account at address (None if missing)."""
+        encoded_account_bytes = self.get(Address.from_hex(address).bytes)
+        return account.Account.from_storage(encoded_account_bytes) if encoded_account_bytes else None
+
+    def read_account_storage(self, address: str, incarnation: int, location_hash: bytes) -> bytes:
+        """ Get the latest value (empty if missing) at the storage location of address having the given incarnation."""
+        address_bytes = Address.from_hex(address).bytes
+        return self.get(composite_keys.create_plain_composite_storage_key(address_bytes, incarnation, location_hash))
+
+    @property
+    def hit_rate(self) -> float:
+        """ Return the ratio of cached reads since the creation."""
+        total = self.entries.hits + self.entries.misses
+        return self.entries.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """ Drop all the cached entries."""
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
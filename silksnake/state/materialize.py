@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""The materialization of the full chain state as of some block into a local snapshot."""
+
+# pylint: disable=too-many-locals
+
+import concurrent.futures
+import heapq
+import os
+from typing import Iterable, Iterator, List, Tuple
+
+from . import diff
+from ..core import history, kvstore, snapshot
+from ..core.constants import ADDRESS_SIZE
+from ..helpers.dbutils import tables
+from ..stagedsync import stages
+
+DEFAULT_NUM_SHARDS: int = 16
+DEFAULT_NUM_RANGES: int = 4
+MAX_NUM_SHARDS: int = 256
+DEFAULT_BATCH_SIZE: int = 1024
+SHARD_EXTENSION: str = '.part'
+
+def materialize(database: kvstore.KV, block_number: int, directory: str, num_shards: int = DEFAULT_NUM_SHARDS,
+                max_workers: int = None, max_entries: int = diff.DEFAULT_MAX_ENTRIES,
+                index_interval: int = snapshot.DEFAULT_INDEX_INTERVAL, num_ranges: int = DEFAULT_NUM_RANGES) -> int:
+    """ Write the plain state (accounts and storage) as of block_number, i.e. after executing it as read by StateReader, as the
+        PLAIN-CST2 segment of the snapshot directory. The change sets after block_number up to the latest are split into
+        num_ranges block ranges (up to the head), each one streamed once in parallel to collect per address-prefix shard the
+        first value of each key changed in the range (spilling beyond max_entries keys per range and shard): change sets are keyed
+        by block, so streaming them per shard would read all of them once per shard. Then each shard
+        merges the values of the earliest range changing each key with the current plain state in parallel.
+        Return the count of state entries written.
+        The current plain state must not advance while running, e.g. the database must be a snapshot or a stopped node.
+    """
+    if database is None:
+        raise ValueError('database is null')
+    if block_number is None or block_number < 0:
+        raise ValueError('block_number is null or negative')
+    if not directory:
+        raise ValueError('directory is null')
+    if num_shards is None or not 1 <= num_shards <= MAX_NUM_SHARDS:
+        raise ValueError('num_shards is null or not in [1, {}]'.format(MAX_NUM_SHARDS))
+    if num_ranges is None or num_ranges < 1:
+        raise ValueError('num_ranges is null or not positive')
+    os.makedirs(directory, exist_ok=True)
+
+    ranges = block_ranges(block_number + 1, read_head_block_number(database.view()), num_ranges)
+    shard_paths = [shard_path(directory, shard) for shard in range(num_shards)]
+    undo_values = [[diff.FirstValueStore(max_entries, directory) for _ in range(num_shards)] for _ in ranges]
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(collect_undo_values, database, from_block, to_block, range_undo_values)
+                       for (from_block, to_block), range_undo_values in zip(ranges, undo_values)]
+            for future in futures:
+                future.result()
+
+            futures = [executor.submit(write_shard, database, shard, num_shards,
+                                       [range_undo_values[shard] for range_undo_values in undo_values], shard_paths[shard], index_interval)
+                       for shard in range(num_shards)]
+            for future in futures:
+                future.result()
+
+        return concatenate_segments(shard_paths, snapshot.segment_path(directory, tables.PLAIN_STATE_LABEL), index_interval)
+    finally:
+        for range_undo_values in undo_values:
+            for store in range_undo_values:
+                store.close()
+        remove_segments(shard_paths)
+
+def read_head_block_number(view: kvstore.View) -> int:
+    """ Return the block number of the chain head as the FINISH stage progress (None if missing)."""
+    stage_key, stage_data = view.get(tables.SYNC_STAGE_PROGRESS_LABEL, stages.SyncStage.FINISH.value)
+    if stage_key != stages.SyncStage.FINISH.value:
+        return None
+    head_block_number, _ = stages.unmarshal_data(stage_data)
+    return head_block_number
+
+def block_ranges(from_block: int, head_block_number: int, num_ranges: int) -> List[Tuple[int, int]]:
+    """ Split the blocks from from_block up to the head into at most num_ranges consecutive [from_block, to_block) ranges.
+        The last range has no end, so that it also covers any change set beyond the head (a single one if no head).
+    """
+    if head_block_number is None or head_block_number < from_block:
+        return [(from_block, None)]
+    num_blocks = head_block_number - from_block + 1
+    num_ranges = min(num_ranges, num_blocks)
+    starts = [from_block + i * num_blocks // num_ranges for i in range(num_ranges)]
+    return list(zip(starts, starts[1:] + [None]))
+
+def shard_path(directory: str, shard: int) -> str:
+    """ Return the path of the temporary segment file of the given shard in the snapshot directory."""
+    return os.path.join(directory, '{}.{:03d}{}'.format(tables.PLAIN_STATE_LABEL, shard, SHARD_EXTENSION))
+
+def shard_of(key: bytes, num_shards: int) -> int:
+    """ Return the shard of the given plain state key, i.e. the range of its first address byte."""
+    return key[0] * num_shards // MAX_NUM_SHARDS
+
+def shard_range(shard: int, num_shards: int) -> Tuple[bytes, bytes]:
+    """ Return the [start_key, end_key) range of the plain state keys in the given shard (no end key for the last one)."""
+    start_byte = -(-shard * MAX_NUM_SHARDS // num_shards)
+    end_byte = -(-(shard + 1) * MAX_NUM_SHARDS // num_shards)
+    return bytes([start_byte]), bytes([end_byte]) if end_byte < MAX_NUM_SHARDS else None
+
+def collect_undo_values(database: kvstore.KV, from_block: int, to_block: int, undo_values: List[diff.FirstValueStore]) -> None:
+    """ Add the value before the blocks in [from_block, to_block) of each key they change to the undo values of its shard."""
+    view = database.view()
+    for storage in (False, True):
+        for key, value in diff.iter_changes(view, storage, from_block, to_block):
+            undo_values[shard_of(key, len(undo_values))].add(key, value)
+
+def write_shard(database: kvstore.KV, shard: int, num_shards: int, undo_values: List[diff.FirstValueStore], path: str,
+                index_interval: int) -> int:
+    """ Write the plain state as of the undo values of consecutive block ranges in the given shard to the segment at path,
+        returning the count.
+    """
+    view = database.view()
+    start_key, end_key = shard_range(shard, num_shards)
+    current_state = view.cursor(tables.PLAIN_STATE_LABEL).range(start_key, end_key)
+    try:
+        with snapshot.SegmentWriter(path, index_interval) as writer:
+            undo_pairs = merge_undo_values([store.items() for store in undo_values])
+            for key, value in merge_state(current_state, restore_code_hashes(view, undo_pairs)):
+                if value:
+                    writer.append(key, value)
+            return writer.count
+    finally:
+        current_state.close()
+
+def restore_code_hashes(view: kvstore.View, pairs: Iterable[Tuple[bytes, bytes]],
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[bytes, bytes]]:
+    """ Yield the given (key, value) pairs restoring in batches the code hash missing from the contract accounts in change sets."""
+    batch: List[Tuple[bytes, bytes]] = []
+    for pair in pairs:
+        batch.append(pair)
+        if len(batch) == batch_size:
+            yield from restore_batch(view, batch)
+            batch = []
+    yield from restore_batch(view, batch)
+
+def restore_batch(view: kvstore.View, batch: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """ Return the given (key, value) batch restoring the code hash of the contract accounts, if found."""
+    account_indexes = [i for i, (key, _) in enumerate(batch) if len(key) == ADDRESS_SIZE]
+    keys = [batch[i][0] for i in account_indexes]
+    values = [batch[i][1] for i in account_indexes]
+    history.restore_many_code_hashes(view, keys, values)
+    restored = list(batch)
+    for i, value in zip(account_indexes, values):
+        if value is not None:
+            restored[i] = (batch[i][0], value)
+    return restored
+
+def merge_undo_values(range_undo_values: List[Iterable[Tuple[bytes, bytes]]]) -> Iterator[Tuple[bytes, bytes]]:
+    """ Merge the sorted undo values of consecutive block ranges, the earliest range changing a key taking precedence,
+        yielding (key, value) in key order.
+    """
+    def ranked(rank: int, pairs: Iterable[Tuple[bytes, bytes]]) -> Iterator[Tuple[bytes, int, bytes]]:
+        for key, value in pairs:
+            yield key, rank, value
+
+    last_key = None
+    for key, _, value in heapq.merge(*[ranked(rank, pairs) for rank, pairs in enumerate(range_undo_values)]):
+        if key != last_key:
+            yield key, value
+            last_key = key
+
+def merge_state(current_state: Iterable[Tuple[bytes, bytes]], undo_values: Iterable[Tuple[bytes, bytes]]) -> Iterator[Tuple[bytes, bytes]]:
+    """ Merge the sorted current state with the sorted undo values taking precedence, yielding (key, value) in key order."""
+    current_state, undo_values = iter(current_state), iter(undo_values)
+    current, undo = next(current_state, None), next(undo_values, None)
+    while current is not None or undo is not None:
+        current_key = bytes(current[0]) if current is not None else None
+        if undo is None or (current_key is not None and current_key < undo[0]):
+            yield current_key, bytes(current[1])
+            current = next(current_state, None)
+        else:
+            yield undo
+            if current_key == undo[0]:
+                current = next(current_state, None)
+            undo = next(undo_values, None)
+
+def concatenate_segments(paths: List[str], path: str, index_interval: int) -> int:
+    """ Concatenate the given segments having increasing key ranges into the segment at path, returning the count."""
+    with snapshot.SegmentWriter(path, index_interval) as writer:
+        for shard_segment_path in paths:
+            segment = snapshot.Segment(shard_segment_path)
+            try:
+                for key, value, _, _ in segment.records(0):
+                    writer.append(bytes(key), bytes(value))
+            finally:
+                segment.close()
+        return writer.count
+
+def remove_segments(paths: List[str]) -> None:
+    """ Remove the given segments with their sparse index, if any."""
+    for path in paths:
+        for file_path in (path, snapshot.index_path(path)):
+            if os.path.exists(file_path):
+                os.remove(file_path)
@@ -15,3 +15,12 @@ def read_eth_supply(view: kvstore.View, block_number: int) -> int:
         return ETH_SUPPLY_NOT_AVAILABLE
     supply = int.from_bytes(value, 'big')
     return supply
+
+async def read_eth_supply_async(view: kvstore.AsyncView, block_number: int) -> int:
+    """ read_eth_supply for asyncio """
+    encoded_block_number = sedes.encode_block_number(block_number)
+    key, value = await view.get(tables.ETH_SUPPLY_LABEL, encoded_block_number)
+    if key != encoded_block_number:
+        return ETH_SUPPLY_NOT_AVAILABLE
+    supply = int.from_bytes(value, 'big')
+    return supply
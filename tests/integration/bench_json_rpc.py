@@ -14,11 +14,12 @@ import requests
 import context # pylint: disable=unused-import
 
 from silksnake.api import eth
+from silksnake.core import reader
 from silksnake.helpers import hashing
 from silksnake.remote.kv_remote import DEFAULT_TARGET
 from silksnake.types import LATEST_BLOCK_NUMBER
 
-# pylint: disable=unused-argument,too-many-return-statements,too-many-locals,too-many-nested-blocks,line-too-long
+# pylint: disable=unused-argument,too-many-return-statements,too-many-locals,too-many-nested-blocks,too-many-branches,line-too-long
 
 def terminate_process(signal_number: int, frame):
     """ terminate_process """
@@ -133,13 +134,17 @@ def bench_json_rpc(block_number_from: int, block_number_to: int, target: str = D
                         logging.info('Processing next_key: %s req_id: %s', next_key, req_id)
                         rng = json_rpc_storage_range_at(cmp_node_url, block.hash.hex(), index, transaction.to.hex(), next_key, 1024, req_id)
                         for hashed_key, entry in rng['storage'].items():
-                            key = entry['key']
-                            json_state_map[hashed_key] = entry
-                            if key is None:
+                            if entry['key'] is None:
                                 logging.info('Null key: hashed_key %s entry: %s', hashed_key, entry)
-                            value = eth_api.get_storage_at('0x' + transaction.to.hex(), key, block_number)
-                            silksnake_state_map[hashed_key] = {'key': key, 'value': value}
+                            json_state_map[hashed_key] = entry
                         next_key = rng['nextKey']
+                    state_reader = reader.StateReader(eth_api.remote_kv, block_number, eth_api.change_set_cache)
+                    location = b''
+                    while location is not None:
+                        slots, location = state_reader.storage_range('0x' + transaction.to.hex(), location, 1024)
+                        for location_bytes, value in slots:
+                            key = '0x' + location_bytes.hex()
+                            silksnake_state_map[hashing.hex_to_hash_str(key)] = {'key': key, 'value': '0x' + value.hex().zfill(64)}
                     if not compare_storage_ranges(json_state_map, silksnake_state_map):
                         print_storage_ranges(json_state_map, silksnake_state_map)
                         return
@@ -7,10 +7,12 @@ import pytest
 import pytest_mock
 
 from silksnake.api import eth
-from silksnake.core import account, chain, reader
-from silksnake.remote import kv_remote
+from silksnake.core import account, chain, changeset_cache, code_cache, reader
+from silksnake.remote import kv_pool, kv_remote
 from silksnake.stagedsync import stages
 
+from ..remote.test_kv_remote import MockStreamingKVStub
+
 # pylint: disable=line-too-long,no-self-use,unused-argument
 
 @pytest.fixture
@@ -36,11 +38,23 @@ def mock_chain_and_state_reader(mocker: pytest_mock.MockerFixture, block_number_
     mock_read_account_data = mocker.patch.object(reader.StateReader, 'read_account_data')
     mock_read_account_storage = mocker.patch.object(reader.StateReader, 'read_account_storage')
     if should_pass:
-        mock_read_account_data.return_value = account.Account(0, 0, incarnation, '', '')
+        mock_read_account_data.return_value = account.Account(0, 0, incarnation)
         mock_read_account_storage.return_value = value
     else:
         mock_read_account_data.side_effect = ValueError
 
+@pytest.fixture
+def mock_code_reader(mocker: pytest_mock.MockerFixture, code_hash: bytes, code: bytes) -> None:
+    """ mock_code_reader """
+    mock_read_canonical_block_number = mocker.patch.object(chain.Blockchain, 'read_canonical_block_number')
+    mock_read_canonical_block_number.return_value = 0
+    mock_read_code_hash = mocker.patch.object(reader.StateReader, 'read_code_hash')
+    if code_hash is None:
+        mock_read_code_hash.side_effect = ValueError
+    mock_read_code_hash.return_value = code_hash
+    mock_code_cache_get = mocker.patch.object(code_cache.CodeCache, 'get')
+    mock_code_cache_get.return_value = code
+
 @pytest.fixture
 def mock_read_block_by_number(mocker: pytest_mock.MockerFixture, expected_number: int) -> None:
     """ mock_read_block_by_number """
@@ -102,10 +116,23 @@ class TestEthereumAPI:
         if should_pass:
             api = eth.EthereumAPI(target)
             assert isinstance(api.remote_kv, kv_remote.RemoteKV)
+            assert len(api.change_set_cache) == 0
         else:
             with pytest.raises((AttributeError, ValueError)):
                 eth.EthereumAPI(target)
 
+    def test_init_pool(self):
+        """ Unit test for __init__ using a channel pool. """
+        pool = kv_pool.ChannelPool()
+        api1 = eth.EthereumAPI(pool=pool)
+        api2 = eth.EthereumAPI(pool=pool)
+        assert isinstance(api1.remote_kv, kv_remote.RemoteKV)
+        assert api1.remote_kv.channel is api2.remote_kv.channel
+        api1.close()
+        api2.close()
+        assert len(pool) == 1
+        pool.shutdown()
+
     @pytest.mark.parametrize("target,should_pass", [
         # Valid test list
         ('localhost:9090', True),
@@ -119,6 +146,36 @@ class TestEthereumAPI:
             api = eth.EthereumAPI(target)
             api.close()
 
+    def test_request_scope(self):
+        """ Unit test for request_scope. """
+        api = eth.EthereumAPI()
+        api.remote_kv = pytest_mock.mock.Mock()
+        mock_view = api.remote_kv.view.return_value
+        mock_get = mock_view.get
+        mock_get.return_value = stages.SyncStage.FINISH.value, (5).to_bytes(8, 'big')
+        with api.request_scope() as database:
+            assert api.block_number() == 5
+            assert api.block_number() == 5
+            with api.request_scope() as nested_database:
+                assert nested_database is database
+        api.remote_kv.view.assert_called_once()
+        mock_get.assert_called_once()
+        assert api.block_number() == 5
+        assert api.remote_kv.view.call_count == 2
+        mock_view.close.assert_not_called()
+
+    def test_request_scope_persistent_streams(self):
+        """ Unit test for request_scope keeping the persistent streams open across API calls. """
+        kv_stub = MockStreamingKVStub({stages.SyncStage.FINISH.value: (5).to_bytes(8, 'big')})
+        api = eth.EthereumAPI()
+        api.remote_kv = kv_remote.RemoteKV(pytest_mock.mock.Mock(), kv_stub, persistent_streams=True)
+        assert api.block_number() == 5
+        assert api.block_number() == 5
+        assert len(kv_stub.calls) == 1
+        assert not kv_stub.calls[0].cancelled
+        api.remote_kv.close_views()
+        assert kv_stub.calls[0].cancelled
+
     @pytest.mark.usefixtures('mock_get_stage_progress')
     @pytest.mark.parametrize("block_number,should_pass", [
         # Valid test list
@@ -217,6 +274,39 @@ class TestEthereumAPI:
         api = eth.EthereumAPI()
         assert api.get_storage_at(address, index, block_number_or_hash) == expected_value
 
+    @pytest.mark.usefixtures('mock_code_reader')
+    @pytest.mark.parametrize("address,block_number_or_hash,code_hash,code,expected_code,should_pass", [
+        # Valid test list
+        ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d63', 2000001, bytes.fromhex('ab' * 32), bytes.fromhex('6080604052'), '0x6080604052', True),
+        ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d63', '0x95d325c65cd5f92376ca9215389b2a74ba9b6802a493798018d0c851d6828ae2', bytes.fromhex('ab' * 32), bytes.fromhex('60'), '0x60', True),
+        ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d63', 2000001, b'', None, '0x', True),
+        ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d63', 2000001, code_cache.EMPTY_CODE_HASH, None, '0x', True),
+        ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d64', 2000001, bytes.fromhex('ab' * 32), None, '0x', True),
+
+        # Invalid test list
+        ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d64', 2000001, None, None, None, False),
+    ])
+    def test_get_code(self, address: str, block_number_or_hash: str, code_hash: bytes, code: bytes, expected_code: str, should_pass: bool):
+        """ Unit test for get_code. """
+        api = eth.EthereumAPI()
+        if should_pass:
+            assert api.get_code(address, block_number_or_hash) == expected_code
+        else:
+            with pytest.raises(ValueError):
+                api.get_code(address, block_number_or_hash)
+        shared_code_cache = code_cache.CodeCache()
+        assert eth.EthereumAPI(contract_code_cache=shared_code_cache).code_cache is shared_code_cache
+        shared_change_set_cache = changeset_cache.ChangeSetCache()
+        assert eth.EthereumAPI(change_set_cache=shared_change_set_cache).change_set_cache is shared_change_set_cache
+
+    def test_get_code_unknown_block(self, mocker: pytest_mock.MockerFixture):
+        """ Unit test for get_code at unknown block hash. """
+        mocker.patch.object(chain.Blockchain, 'read_canonical_block_number').return_value = None
+        mock_read_code_hash = mocker.patch.object(reader.StateReader, 'read_code_hash')
+        api = eth.EthereumAPI()
+        assert api.get_code('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d63', '0x' + 'ab' * 32) == '0x'
+        mock_read_code_hash.assert_not_called()
+
     @pytest.mark.usefixtures('mock_staged_sync')
     @pytest.mark.parametrize("highest_block,current_block,result,should_pass", [
         # Valid test list
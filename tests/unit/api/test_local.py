@@ -7,10 +7,12 @@ import pytest
 import pytest_mock
 
 from silksnake.api import local
-from silksnake.core import account, chain, reader
+from silksnake.core import account, chain, changeset_cache, reader
+from silksnake.remote import kv_pool
 from silksnake.stagedsync import stages
 from silksnake.state import supply
 
+from .test_eth import mock_code_reader # pylint: disable=unused-import
 from .test_eth import mock_read_block_by_number, mock_read_block_by_hash, mock_transaction_count_by_number, mock_transaction_count_by_hash
 
 # pylint: disable=line-too-long,no-self-use,unused-argument,invalid-name
@@ -38,7 +40,7 @@ def mock_chain_and_state_reader(mocker: pytest_mock.MockerFixture, block_number_
     mock_read_account_data = mocker.patch.object(reader.StateReader, 'read_account_data')
     mock_read_account_storage = mocker.patch.object(reader.StateReader, 'read_account_storage')
     if should_pass:
-        mock_read_account_data.return_value = account.Account(0, 0, incarnation, '', '')
+        mock_read_account_data.return_value = account.Account(0, 0, incarnation)
         mock_read_account_storage.return_value = value
     else:
         mock_read_account_data.side_effect = ValueError
@@ -68,6 +70,16 @@ def test_eth_blockNumber(block_number: int, should_pass: bool):
     else:
         assert latest_block_number == 0
 
+@pytest.mark.usefixtures('mock_get_stage_progress')
+@pytest.mark.parametrize("block_number", [0])
+def test_shared_channel(block_number: int):
+    """ Unit test for the channel shared by local calls. """
+    local.eth_blockNumber()
+    local.eth_syncing()
+    pool = kv_pool.default_pool()
+    assert len(pool) == 1
+    assert all(entry.users == 0 for entry in pool.entries.values())
+
 @pytest.mark.usefixtures(mock_read_block_by_number.__name__)
 @pytest.mark.parametrize("block_number,expected_number", [
     # Valid test list
@@ -143,6 +155,30 @@ def test_eth_getStorageAt(address: str, index: str, block_number_or_hash: str, e
     storage_location = local.eth_getStorageAt(address, index, block_number_or_hash)
     assert storage_location == expected_value
 
+def test_eth_getStorageAt_change_set_cache(mocker: pytest_mock.MockerFixture):
+    """ Unit test for eth_getStorageAt sharing the process-wide change set cache. """
+    mock_api_type = mocker.patch('silksnake.api.local.EthereumAPI')
+    local.eth_getStorageAt('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d64', '0x00', 2000001)
+    assert mock_api_type.call_args.kwargs['change_set_cache'] is changeset_cache.default_change_set_cache()
+    mock_api_type.return_value.close.assert_called_once()
+
+@pytest.mark.usefixtures('mock_code_reader')
+@pytest.mark.parametrize("address,block_number_or_hash,code_hash,code,expected_code,should_pass", [
+    # Valid test list
+    ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d63', 2000001, bytes.fromhex('ab' * 32), bytes.fromhex('6080604052'), '0x6080604052', True),
+    ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d63', 2000001, b'', None, '0x', True),
+
+    # Invalid test list
+    ('0x33ee33fc3e1aacdb75a1ad362489ac54f02d6d64', 2000001, None, None, None, False),
+])
+def test_eth_getCode(address: str, block_number_or_hash: str, code_hash: bytes, code: bytes, expected_code: str, should_pass: bool):
+    """ Unit test for eth_getCode. """
+    if should_pass:
+        assert local.eth_getCode(address, block_number_or_hash) == expected_code
+    else:
+        with pytest.raises(ValueError):
+            local.eth_getCode(address, block_number_or_hash)
+
 @pytest.mark.usefixtures('mock_staged_sync')
 @pytest.mark.parametrize("highest_block,current_block,result,should_pass", [
     # Valid test list
@@ -8,7 +8,7 @@ import pytest_mock
 
 from silksnake.api import turbo
 from silksnake.core import chain, reader
-from silksnake.remote import kv_remote
+from silksnake.remote import kv_pool, kv_remote
 from silksnake.state import supply
 
 # pylint: disable=line-too-long,no-self-use,unused-argument
@@ -46,6 +46,18 @@ class TestTurboAPI:
             with pytest.raises((AttributeError, ValueError)):
                 turbo.TurboAPI(target)
 
+    def test_init_pool(self):
+        """ Unit test for __init__ using a channel pool. """
+        pool = kv_pool.ChannelPool()
+        api1 = turbo.TurboAPI(pool=pool)
+        api2 = turbo.TurboAPI(pool=pool)
+        assert isinstance(api1.remote_kv, kv_remote.RemoteKV)
+        assert api1.remote_kv.channel is api2.remote_kv.channel
+        api1.close()
+        api2.close()
+        assert len(pool) == 1
+        pool.shutdown()
+
     @pytest.mark.parametrize("target,should_pass", [
         # Valid test list
         ('localhost:9090', True),
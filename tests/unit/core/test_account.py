@@ -3,7 +3,7 @@
 
 import pytest
 
-from silksnake.core.account import Account
+from silksnake.core.account import Account, decode_accounts
 
 # pylint: disable=line-too-long,no-self-use
 
@@ -73,6 +73,7 @@ class TestAccount:
     def test_from_storage(self, account_hex: str, nonce: int, balance: int, incarnation: int, code_hash: str, storage_root: str, should_pass: bool):
         """ Unit test for decode_from_storage method."""
         account_bytes = bytes.fromhex(account_hex)
+        code_hash, storage_root = bytes.fromhex(code_hash), bytes.fromhex(storage_root)
         if should_pass:
             acc = Account.from_storage(account_bytes)
             assert acc.nonce == nonce
@@ -87,12 +88,12 @@ class TestAccount:
 
     @pytest.mark.parametrize("nonce,balance,incarnation,code_hash,storage_root,should_pass", [
         # Valid test list
-        (0, 0, 0, '', '', True),
+        (0, 0, 0, b'', b'', True),
 
         # Invalid test list
         # (None, 0, 0, '', '', False),
     ])
-    def test_init(self, nonce: int, balance: int, incarnation: int, code_hash: str, storage_root: str, should_pass: bool):
+    def test_init(self, nonce: int, balance: int, incarnation: int, code_hash: bytes, storage_root: bytes, should_pass: bool):
         """ Unit test for __init__. """
         if should_pass:
             acc = Account(nonce, balance, incarnation, code_hash, storage_root)
@@ -101,12 +102,14 @@ class TestAccount:
             assert acc.incarnation == incarnation
             assert acc.code_hash == code_hash
             assert acc.storage_root == storage_root
+            with pytest.raises(AttributeError):
+                acc.extra = 0 # pylint: disable=assigning-non-slot
 
     @pytest.mark.parametrize(PARAMETERS_STRING, PARAMETERS_LIST)
     def test_to_storage(self, account_hex: str, nonce: int, balance: int, incarnation: int, code_hash: str, storage_root: str, should_pass: bool):
         """ Unit test for to_storage method."""
         account_bytes = bytes.fromhex(account_hex)
-        acc = Account(nonce, balance, incarnation, code_hash, storage_root)
+        acc = Account(nonce, balance, incarnation, bytes.fromhex(code_hash), bytes.fromhex(storage_root))
         if should_pass:
             data = bytearray(acc.length_for_storage())
             assert len(data) == len(account_bytes)
@@ -116,3 +119,19 @@ class TestAccount:
             data = bytearray(len(account_bytes))
             with pytest.raises((ValueError)):
                 acc.to_storage(data)
+
+def test_decode_accounts():
+    """ Unit test for decode_accounts. """
+    with pytest.raises(ValueError):
+        decode_accounts(None)
+    buffers = [bytes.fromhex(account_hex) for account_hex, *_, should_pass in PARAMETERS_LIST if should_pass]
+    accounts = decode_accounts(buffers + [b''])
+    assert accounts[-1] is None
+    for acc, account_bytes in zip(accounts, buffers):
+        expected_acc = Account.from_storage(account_bytes)
+        assert (acc.nonce, acc.balance, acc.incarnation, acc.code_hash) == \
+            (expected_acc.nonce, expected_acc.balance, expected_acc.incarnation, expected_acc.code_hash)
+    with pytest.raises(ValueError):
+        decode_accounts([bytes.fromhex('0d')])
+    with pytest.raises(ValueError):
+        decode_accounts([bytes.fromhex('20')])
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """The unit test for chain module."""
 
+import asyncio
 from typing import Dict, Tuple
 
 import pytest
@@ -194,3 +195,73 @@ class TestBlockchain:
             assert isinstance(blockchain.read_block_by_number(block_number) , sedes.Block)
         else:
             assert blockchain.read_block_by_number(block_number) is None
+
+GENESIS_HASH = 'ec5f83325a31120741a5bb6ee5e238cc3984ccfad4465a098a555bc61526899a'
+GENESIS_KEY = '0000000000000000' + GENESIS_HASH
+GENESIS_HEADER = 'f901e5a0' + '00' * 32 + 'a0' + '00' * 32 + '94' + '00' * 20 + 'a0' + '00' * 32 + 'a0' + '00' * 32 + 'a0' + '00' * 32 + \
+    'b90100' + '00' * 256 + '808080808080a0' + '00' * 32 + '80'
+GENESIS_TABLE2KV = {
+    (tables.BLOCK_HEADER_NUMBERS_LABEL, GENESIS_HASH): (GENESIS_HASH, '0000000000000000'),
+    (tables.BLOCK_HEADERS_LABEL, '00000000000000006e'): ('00000000000000006e', GENESIS_HASH),
+    (tables.BLOCK_HEADERS_LABEL, GENESIS_KEY): (GENESIS_KEY, GENESIS_HEADER),
+    (tables.BLOCK_BODIES_LABEL, GENESIS_KEY): (GENESIS_KEY, 'c2c0c0'),
+}
+
+def table2kv_without(*keys: Tuple[str, str]) -> Dict[Tuple[str, str], Tuple[str, str]]:
+    """ Get the genesis table2kv having empty pairs for the given keys. """
+    return {table_key: ('', '') if table_key in keys else pair for table_key, pair in GENESIS_TABLE2KV.items()}
+
+def table2kv_get(table2kv: Dict[Tuple[str, str], Tuple[str, str]], bucket: str, key: bytes) -> Tuple[bytes, bytes]:
+    """ Get the key-value pair for bucket and key from table2kv, empty pair if missing. """
+    return tuple(bytes.fromhex(e) for e in table2kv.get((bucket, key.hex()), ('', '')))
+
+class TestAsyncBlockchain:
+    """ Unit test case for AsyncBlockchain. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        mock_database = pytest_mock.mock.Mock()
+        blockchain = chain.AsyncBlockchain(mock_database)
+        assert blockchain.database is mock_database
+        with pytest.raises(ValueError):
+            chain.AsyncBlockchain(None)
+
+    @pytest.mark.parametrize("table2kv,should_pass", [
+        # Valid test list
+        (GENESIS_TABLE2KV, True),
+
+        # Invalid test list
+        (table2kv_without((tables.BLOCK_BODIES_LABEL, GENESIS_KEY)), False),
+        (table2kv_without((tables.BLOCK_HEADERS_LABEL, GENESIS_KEY)), False),
+        (table2kv_without((tables.BLOCK_HEADERS_LABEL, '00000000000000006e')), False),
+    ])
+    def test_read_block_by_number(self, table2kv: Dict[Tuple[str, str], Tuple[str, str]], should_pass: bool):
+        """ Unit test for read_block_by_number. """
+        mock_database = pytest_mock.mock.Mock(spec=kvstore.AsyncKV)
+        mock_database.view.return_value.get = pytest_mock.mock.AsyncMock(side_effect=lambda b, k: table2kv_get(table2kv, b, k))
+        blockchain = chain.AsyncBlockchain(mock_database)
+        if should_pass:
+            assert isinstance(asyncio.run(blockchain.read_block_by_number(0)), sedes.Block)
+        else:
+            assert asyncio.run(blockchain.read_block_by_number(0)) is None
+
+    @pytest.mark.parametrize("table2kv,should_pass", [
+        # Valid test list
+        (GENESIS_TABLE2KV, True),
+
+        # Invalid test list
+        (table2kv_without((tables.BLOCK_BODIES_LABEL, GENESIS_KEY)), False),
+        (table2kv_without((tables.BLOCK_HEADERS_LABEL, GENESIS_KEY)), False),
+        (table2kv_without((tables.BLOCK_HEADER_NUMBERS_LABEL, GENESIS_HASH)), False),
+    ])
+    def test_read_block_by_hash(self, table2kv: Dict[Tuple[str, str], Tuple[str, str]], should_pass: bool):
+        """ Unit test for read_block_by_hash, read_block_header and read_block_body. """
+        block_hash_bytes = bytes.fromhex(GENESIS_HASH)
+        mock_database = pytest_mock.mock.Mock(spec=kvstore.AsyncKV)
+        mock_database.view.return_value.get = pytest_mock.mock.AsyncMock(side_effect=lambda b, k: table2kv_get(table2kv, b, k))
+        blockchain = chain.AsyncBlockchain(mock_database)
+        if should_pass:
+            assert isinstance(asyncio.run(blockchain.read_block_by_hash(block_hash_bytes)), sedes.Block)
+            assert isinstance(asyncio.run(blockchain.read_block_header(0, block_hash_bytes)), sedes.BlockHeader)
+            assert isinstance(asyncio.run(blockchain.read_block_body(0, block_hash_bytes)), sedes.BlockBody)
+        else:
+            assert asyncio.run(blockchain.read_block_by_hash(block_hash_bytes)) is None
@@ -1,12 +1,26 @@
 # -*- coding: utf-8 -*-
 """The unit test for changeset module."""
 
+import bisect
+
 import pytest
 
-from silksnake.core.changeset import AccountChangeSet, Change, ChangeSet
+from silksnake.core.changeset import AccountChangeSet, Change, ChangeSet, PlainAccountChangeSet, PlainStorageChangeSet
+
+from ..memory_kv import encode_plain_storage_change_set
 
 # pylint: disable=line-too-long,no-self-use
 
+ADDRESS1 = bytes.fromhex('11' * 19 + '00')
+ADDRESS2 = bytes.fromhex('22' * 20)
+LOCATION1 = bytes(32)
+LOCATION2 = bytes(31) + b'\x01'
+LOCATION3 = bytes.fromhex('ff' * 31 + '00')
+STORAGE_CHANGES = [
+    (ADDRESS1, 1, [(LOCATION1, b'\x0a'), (LOCATION3, b'')]),
+    (ADDRESS2, 3, [(LOCATION1, b'\x0b' * 300), (LOCATION2, b'\x0c')]),
+]
+
 class TestChange:
     """ Unit test case for Change.
     """
@@ -89,3 +103,86 @@ class TestAccountChangeSet:
         else:
             with pytest.raises((TypeError, ValueError)):
                 AccountChangeSet(buffer, key_length)
+
+    @pytest.mark.parametrize("key_hex,expected_value_hex", [
+        ('01', '0a'),
+        ('02', ''),
+        ('03', '0c0c'),
+        ('05', '0d'),
+        ('00', None),
+        ('04', None),
+        ('06', None),
+    ])
+    def test_find(self, key_hex: str, expected_value_hex: str):
+        """ Unit test for find. """
+        keys, offsets, values = '01020305', '00000001000000010000000300000004', '0a0c0c0d'
+        changeset = AccountChangeSet(bytes.fromhex('00000004' + keys + offsets + values), 1)
+        assert changeset.index is None
+        expected_value = bytes.fromhex(expected_value_hex) if expected_value_hex is not None else None
+        assert changeset.find(bytes.fromhex(key_hex)) == expected_value
+        assert changeset.build_index().build_index().find(bytes.fromhex(key_hex)) == expected_value
+        assert len(changeset.index) == 4
+
+PLAIN_ACCOUNT_KEYS = [bytes.fromhex('11' * 20), bytes.fromhex('33' * 20), bytes.fromhex('55' * 20), bytes.fromhex('77' * 20)]
+
+class TestPlainAccountChangeSet:
+    """ Unit test case for PlainAccountChangeSet.
+    """
+    @pytest.mark.parametrize("key", PLAIN_ACCOUNT_KEYS + [bytes(20), bytes.fromhex('22' * 20), bytes.fromhex('ff' * 20)])
+    def test_find(self, key: bytes):
+        """ Unit test for find on many accounts, matching the key at the Go sort.Search index (smallest one not less than key). """
+        values = [bytes([i + 1]) * (i + 1) for i in range(len(PLAIN_ACCOUNT_KEYS))]
+        offsets = b''.join(sum(len(value) for value in values[:i + 1]).to_bytes(4, 'big') for i in range(len(values)))
+        buffer = len(PLAIN_ACCOUNT_KEYS).to_bytes(4, 'big') + b''.join(PLAIN_ACCOUNT_KEYS) + offsets + b''.join(values)
+        search_index = bisect.bisect_left(PLAIN_ACCOUNT_KEYS, key)
+        found = search_index < len(PLAIN_ACCOUNT_KEYS) and PLAIN_ACCOUNT_KEYS[search_index] == key
+        expected_value = values[search_index] if found else None
+        changeset = PlainAccountChangeSet(buffer)
+        assert changeset.find(key) == expected_value
+        assert changeset.build_index().find(key) == expected_value
+
+class TestStorageChangeSet:
+    """ Unit test case for StorageChangeSet.
+    """
+    def test_init(self):
+        """ Unit test for __init__. """
+        changeset = PlainStorageChangeSet(encode_plain_storage_change_set(STORAGE_CHANGES))
+        assert changeset.num_unique_elements == 2
+        assert changeset.num_elements == 4
+        assert list(changeset.incarnations) == [1, 3]
+        assert PlainStorageChangeSet(encode_plain_storage_change_set([])).num_elements == 0
+        with pytest.raises(ValueError):
+            PlainStorageChangeSet(b'\x00')
+        with pytest.raises(ValueError):
+            PlainStorageChangeSet(encode_plain_storage_change_set(STORAGE_CHANGES)[:-320])
+
+    @pytest.mark.parametrize("buffer", [bytes(4), bytes(8), encode_plain_storage_change_set([])])
+    def test_empty(self, buffer: bytes):
+        """ Unit test for empty change sets. """
+        changeset = PlainStorageChangeSet(buffer)
+        assert changeset.num_unique_elements == 0
+        assert changeset.num_elements == 0
+        assert changeset.find(ADDRESS1 + (1).to_bytes(8, 'big') + LOCATION1) is None
+        assert not list(changeset)
+
+    @pytest.mark.parametrize("address,incarnation,location,expected_value", [
+        (ADDRESS1, 1, LOCATION1, b'\x0a'),
+        (ADDRESS1, 0, LOCATION3, b''),
+        (ADDRESS1, 1, LOCATION2, None),
+        (ADDRESS1, 2, LOCATION1, None),
+        (ADDRESS2, 3, LOCATION1, b'\x0b' * 300),
+        (ADDRESS2, 3, LOCATION2, b'\x0c'),
+        (ADDRESS2, 1, LOCATION2, None),
+        (bytes(20), 1, LOCATION1, None),
+        (bytes.fromhex('ff' * 20), 1, LOCATION1, None),
+    ])
+    def test_find(self, address: bytes, incarnation: int, location: bytes, expected_value: bytes):
+        """ Unit test for find. """
+        changeset = PlainStorageChangeSet(encode_plain_storage_change_set(STORAGE_CHANGES))
+        assert changeset.find(address + incarnation.to_bytes(8, 'big') + location) == expected_value
+
+    def test_iter(self):
+        """ Unit test for iter. """
+        changeset = PlainStorageChangeSet(encode_plain_storage_change_set(STORAGE_CHANGES))
+        decoded = [(address, incarnation, sorted((change.key, change.value) for change in changes)) for address, incarnation, changes in changeset]
+        assert decoded == [(address.hex(), incarnation, locations) for address, incarnation, locations in STORAGE_CHANGES]
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""The unit test for changeset_cache module."""
+
+import asyncio
+
+import pytest
+
+from silksnake.core import changeset, changeset_cache
+from silksnake.helpers.dbutils import tables, timestamp
+from silksnake.stagedsync import stages
+
+from ..memory_kv import AsyncMemoryView, MemoryView
+
+# pylint: disable=no-self-use
+
+ACCOUNT_CHANGE_SET = bytes.fromhex('00000001' + '11' * 20 + '00000001' + '0a')
+
+BUCKETS = {
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(10): ACCOUNT_CHANGE_SET,
+        timestamp.encode_timestamp(20): ACCOUNT_CHANGE_SET,
+    },
+    tables.SYNC_STAGE_PROGRESS_LABEL: {
+        stages.SyncStage.FINISH.value: (100).to_bytes(8, 'big'),
+    },
+}
+
+def change_set_reads(view: MemoryView) -> list:
+    """ Return the (bucket, key) reads of the given view besides the stage progress. """
+    return [read for read in view.reads if read[0] != tables.SYNC_STAGE_PROGRESS_LABEL]
+
+class TestChangeSetCache:
+    """ Unit test for ChangeSetCache. """
+    def test_get(self):
+        """ Unit test for get reading each change set once. """
+        view = MemoryView(BUCKETS)
+        cache = changeset_cache.ChangeSetCache()
+        change_set = cache.get(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 10)
+        assert isinstance(change_set, changeset.PlainAccountChangeSet)
+        assert change_set.index is not None
+        assert cache.get(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 10) is change_set
+        assert change_set.find(bytes.fromhex('11' * 20)) == b'\x0a'
+        assert len(change_set_reads(view)) == 1
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_get_many(self):
+        """ Unit test for get_many reading the missing change sets only. """
+        view = MemoryView(BUCKETS)
+        cache = changeset_cache.ChangeSetCache()
+        first = cache.get(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 10)
+        change_sets = cache.get_many(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, [20, 10])
+        assert change_sets[1] is first
+        assert change_set_reads(view) == [(tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, timestamp.encode_timestamp(block)) for block in [10, 20]]
+        assert cache.get_many(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, []) == []
+
+    def test_get_async(self):
+        """ Unit test for get_async. """
+        view = AsyncMemoryView(BUCKETS)
+        cache = changeset_cache.ChangeSetCache()
+        change_set = asyncio.run(cache.get_async(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 10))
+        assert asyncio.run(cache.get_async(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 10)) is change_set
+        assert len(change_set_reads(view.view)) == 1
+
+    def test_max_size(self):
+        """ Unit test for the bound on total buffer bytes. """
+        view = MemoryView(BUCKETS)
+        cache = changeset_cache.ChangeSetCache(len(ACCOUNT_CHANGE_SET) + 100)
+        cache.get_many(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, [10, 20])
+        assert len(cache) == 1
+        with pytest.raises(ValueError):
+            changeset_cache.ChangeSetCache(-1)
+
+    def test_missing(self):
+        """ Unit test for get and get_many on missing change sets, not taking the next one and not cached. """
+        view = MemoryView(BUCKETS)
+        cache = changeset_cache.ChangeSetCache()
+        assert list(cache.get(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 15)) == []
+        assert cache.get(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 15).find(bytes.fromhex('11' * 20)) is None
+        assert list(cache.get(view, tables.PLAIN_STORAGE_CHANGE_SET_LABEL, 15)) == []
+        change_sets = cache.get_many(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, [15, 20])
+        assert change_sets[0].find(bytes.fromhex('11' * 20)) is None
+        assert change_sets[1].find(bytes.fromhex('11' * 20)) == b'\x0a'
+        assert len(cache) == 1
+        assert len(change_set_reads(view)) == 5
+
+    @pytest.mark.parametrize("block_number,finality_depth,expected_size", [
+        (10, 64, 1),
+        (20, 80, 1),
+        (20, 81, 0),
+        (10, 0, 1),
+    ])
+    def test_finality(self, block_number: int, finality_depth: int, expected_size: int):
+        """ Unit test for caching only the change sets at least finality_depth blocks behind the head. """
+        for view in [MemoryView(BUCKETS), AsyncMemoryView(BUCKETS)]:
+            cache = changeset_cache.ChangeSetCache(finality_depth=finality_depth)
+            if isinstance(view, AsyncMemoryView):
+                asyncio.run(cache.get_async(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, block_number))
+            else:
+                cache.get(view, tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, block_number)
+            assert len(cache) == expected_size
+        cache = changeset_cache.ChangeSetCache(finality_depth=finality_depth)
+        cache.get_many(MemoryView(BUCKETS), tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, [block_number])
+        assert len(cache) == expected_size
+        no_head_buckets = {bucket_name: pairs for bucket_name, pairs in BUCKETS.items() if bucket_name != tables.SYNC_STAGE_PROGRESS_LABEL}
+        cache.get(MemoryView(no_head_buckets), tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, 10 if expected_size else block_number)
+        assert len(cache) == expected_size
+        with pytest.raises(ValueError):
+            changeset_cache.ChangeSetCache(finality_depth=-1)
+
+    def test_default_change_set_cache(self):
+        """ Unit test for default_change_set_cache. """
+        assert changeset_cache.default_change_set_cache() is changeset_cache.default_change_set_cache()
+
+    def test_invalid_bucket(self):
+        """ Unit test for get on bucket not holding change sets. """
+        with pytest.raises(ValueError):
+            changeset_cache.ChangeSetCache().get(MemoryView(BUCKETS), tables.PLAIN_STATE_LABEL, 10)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""The unit test for code_cache module."""
+
+import os
+
+import pytest
+
+from silksnake.core import code_cache
+from silksnake.helpers import hashing
+from silksnake.helpers.dbutils import tables
+
+from ..memory_kv import MemoryKV, MemoryView
+
+# pylint: disable=no-self-use
+
+CODE = bytes.fromhex('6080604052')
+CODE_HASH = hashing.bytes_to_hash(CODE)
+OTHER_CODE_HASH = hashing.bytes_to_hash(b'\x00')
+
+class TestCodeCache:
+    """ Unit test for CodeCache. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            code_cache.CodeCache(-1)
+        assert len(code_cache.CodeCache()) == 0
+
+    def test_get(self):
+        """ Unit test for get. """
+        memory_kv = MemoryKV(MemoryView({tables.CODE_LABEL: {CODE_HASH: CODE, OTHER_CODE_HASH + b'\x00': b'\x01'}}))
+        codes = code_cache.CodeCache()
+        with pytest.raises(ValueError):
+            codes.get(memory_kv.view(), None)
+        assert codes.get(memory_kv.view(), CODE_HASH) == CODE
+        assert codes.get(memory_kv.view(), CODE_HASH) == CODE
+        assert codes.get(memory_kv.view(), code_cache.EMPTY_CODE_HASH) == b''
+        assert codes.get(memory_kv.view(), OTHER_CODE_HASH) is None
+        assert memory_kv.memory_view.seeks == 2
+        assert len(codes) == 1
+        codes.clear()
+        assert len(codes) == 0
+
+    def test_store(self):
+        """ Unit test for store checking the code hash. """
+        codes = code_cache.CodeCache()
+        with pytest.raises(ValueError):
+            codes.store(OTHER_CODE_HASH, CODE)
+        assert codes.lookup(OTHER_CODE_HASH) is None
+        assert codes.store(CODE_HASH, memoryview(CODE)) == CODE
+        assert codes.lookup(CODE_HASH) == CODE
+
+    def test_directory(self, tmp_path):
+        """ Unit test for the code persisted in directory. """
+        directory = str(tmp_path / 'code')
+        code_cache.CodeCache(directory=directory).store(CODE_HASH, CODE)
+        path = os.path.join(directory, CODE_HASH.hex()[:2], CODE_HASH.hex())
+        assert os.listdir(os.path.dirname(path)) == [CODE_HASH.hex()]
+        codes = code_cache.CodeCache(directory=directory)
+        assert codes.lookup(CODE_HASH) == CODE
+        assert len(codes) == 1
+        codes.store(CODE_HASH, CODE)
+        assert codes.lookup(OTHER_CODE_HASH) is None
+        with open(path, 'wb') as code_file:
+            code_file.write(b'\x00')
+        assert code_cache.CodeCache(directory=directory).lookup(CODE_HASH) is None
+
+def test_default_code_cache():
+    """ Unit test for default_code_cache. """
+    assert code_cache.default_code_cache() is code_cache.default_code_cache()
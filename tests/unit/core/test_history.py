@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""The unit test for history module."""
+
+import asyncio
+
+import pytest
+
+from silksnake.core import account, changeset_cache, history
+from silksnake.helpers.dbutils import composite_keys, tables, timestamp
+from silksnake.stagedsync import stages
+
+from ..memory_kv import AsyncMemoryView, MemoryKV, MemoryView
+from ..memory_kv import encode_account, encode_account_change_set, encode_history_chunck, encode_storage_change_set
+
+# pylint: disable=line-too-long,no-self-use
+
+ADDRESS = bytes.fromhex('33ee33fc3e1aacdb75a1ad362489ac54f02d6d63')
+LOCATION = bytes.fromhex('00' * 31 + '01')
+STORAGE_KEY = composite_keys.create_plain_composite_storage_key(ADDRESS, 1, LOCATION)
+
+CURRENT_ACCOUNT = encode_account(3, 300)
+OLD_ACCOUNT = encode_account(1, 100)
+STAGE_PROGRESS = {stages.SyncStage.FINISH.value: (10000).to_bytes(8, 'big')}
+
+BUCKETS = {
+    tables.ACCOUNTS_HISTORY_LABEL: {
+        ADDRESS + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1000, 2000]),
+    },
+    tables.STORAGE_HISTORY_LABEL: {
+        ADDRESS + LOCATION + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1500, 2500]),
+    },
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(1000): encode_account_change_set([(ADDRESS, OLD_ACCOUNT)]),
+    },
+    tables.PLAIN_STORAGE_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(1500): encode_storage_change_set(ADDRESS, [(LOCATION, b'\x0a')]),
+    },
+    tables.PLAIN_STATE_LABEL: {
+        ADDRESS: CURRENT_ACCOUNT,
+        STORAGE_KEY: b'\x0b',
+    },
+    tables.SYNC_STAGE_PROGRESS_LABEL: STAGE_PROGRESS,
+}
+
+@pytest.mark.parametrize("storage,key,block_number,expected_value", [
+    (False, ADDRESS, 500, OLD_ACCOUNT),
+    (False, ADDRESS, 1000, OLD_ACCOUNT),
+    (False, ADDRESS, 3000, CURRENT_ACCOUNT),
+    (True, STORAGE_KEY, 1000, b'\x0a'),
+    (True, STORAGE_KEY, 3000, b'\x0b'),
+])
+def test_get_as_of(storage: bool, key: bytes, block_number: int, expected_value: bytes):
+    """ Unit test for get_as_of. """
+    assert history.get_as_of(MemoryKV(MemoryView(BUCKETS)), storage, key, block_number) == expected_value
+
+def test_find_by_history_account_chunck():
+    """ Regression test for find_by_history matching the account index chunck key prefixed by the address, not the reverse. """
+    view = MemoryView(BUCKETS)
+    assert history.find_by_history(view, False, ADDRESS, 500) == OLD_ACCOUNT
+    assert history.find_by_history(view, False, bytes.fromhex('11' * 20), 500) is None
+
+def test_find_by_history_code_hash():
+    """ Regression test for find_by_history restoring the contract code hash as stored in PLAIN-contractCode, not hashed again. """
+    code_address, code_hash = bytes.fromhex('55' * 20), bytes.fromhex('ab' * 32)
+    view = MemoryView({
+        tables.ACCOUNTS_HISTORY_LABEL: {code_address + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1000, 2000])},
+        tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {
+            timestamp.encode_timestamp(1000): encode_account_change_set([(code_address, encode_account(0, 0, 1))]),
+        },
+        tables.PLAIN_CONTRACT_CODE_LABEL: {composite_keys.create_storage_prefix(code_address, 1): code_hash},
+    })
+    assert history.find_by_history(view, False, code_address, 500) == encode_account(0, 0, 1, code_hash)
+
+OTHER_ADDRESS = bytes.fromhex('44' * 20)
+OTHER_LOCATION = bytes.fromhex('00' * 31 + '02')
+OTHER_STORAGE_KEY = composite_keys.create_plain_composite_storage_key(ADDRESS, 1, OTHER_LOCATION)
+CONTRACT_ADDRESS = bytes.fromhex('55' * 20)
+CONTRACT_CODE_HASH = bytes.fromhex('ab' * 32)
+MANY_BUCKETS = {
+    tables.ACCOUNTS_HISTORY_LABEL: {
+        ADDRESS + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1000, 2000]),
+        OTHER_ADDRESS + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1000]),
+        CONTRACT_ADDRESS + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1000, 2000]),
+    },
+    tables.STORAGE_HISTORY_LABEL: {
+        ADDRESS + LOCATION + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1500, 2500]),
+        ADDRESS + OTHER_LOCATION + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1500]),
+    },
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(1000): encode_account_change_set([
+            (ADDRESS, OLD_ACCOUNT), (OTHER_ADDRESS, encode_account(2, 200)), (CONTRACT_ADDRESS, encode_account(0, 0, 1)),
+        ]),
+        timestamp.encode_timestamp(2000): encode_account_change_set([(ADDRESS, encode_account(2, 250))]),
+    },
+    tables.PLAIN_STORAGE_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(1500): encode_storage_change_set(ADDRESS, [(LOCATION, b'\x0a'), (OTHER_LOCATION, b'\x0c')]),
+        timestamp.encode_timestamp(2500): encode_storage_change_set(ADDRESS, [(LOCATION, b'\x0d')]),
+    },
+    tables.PLAIN_CONTRACT_CODE_LABEL: {
+        composite_keys.create_storage_prefix(CONTRACT_ADDRESS, 1): CONTRACT_CODE_HASH,
+    },
+    tables.PLAIN_STATE_LABEL: {
+        ADDRESS: CURRENT_ACCOUNT,
+        STORAGE_KEY: b'\x0b',
+    },
+    tables.SYNC_STAGE_PROGRESS_LABEL: STAGE_PROGRESS,
+}
+
+@pytest.mark.parametrize("storage,keys,block_number,expected_change_sets", [
+    (False, [ADDRESS, OTHER_ADDRESS, CONTRACT_ADDRESS, ADDRESS], 500, 1),
+    (False, [ADDRESS, OTHER_ADDRESS], 1500, 1),
+    (False, [ADDRESS, OTHER_ADDRESS], 3000, 0),
+    (True, [STORAGE_KEY, OTHER_STORAGE_KEY], 1000, 1),
+    (True, [STORAGE_KEY, OTHER_STORAGE_KEY], 2000, 1),
+    (True, [], 2000, 0),
+])
+def test_get_many_as_of(storage: bool, keys: list, block_number: int, expected_change_sets: int):
+    """ Unit test for get_many_as_of matching get_as_of with at most one batch per bucket. """
+    view = MemoryView(MANY_BUCKETS)
+    values = history.get_many_as_of(MemoryKV(view), storage, keys, block_number)
+    assert values == [history.get_as_of(MemoryKV(MemoryView(MANY_BUCKETS)), storage, key, block_number) for key in keys]
+    assert view.batches[0] == (history.history_bucket(storage), len(keys))
+    assert len(view.batches) == len({bucket_name for bucket_name, _ in view.batches})
+    assert sum(size for bucket_name, size in view.batches if bucket_name == history.change_set_bucket(storage)) == expected_change_sets
+    with pytest.raises(ValueError):
+        history.find_many_by_history(view, storage, None, block_number)
+
+def test_change_set_cache():
+    """ Unit test for get_as_of and get_many_as_of reading each change set once through the cache. """
+    view = MemoryView(MANY_BUCKETS)
+    cache = changeset_cache.ChangeSetCache()
+    assert history.get_as_of(MemoryKV(view), False, ADDRESS, 500, cache) == OLD_ACCOUNT
+    assert history.get_as_of(MemoryKV(view), False, ADDRESS, 1, cache) == OLD_ACCOUNT
+    expected_values = [history.get_as_of(MemoryKV(MemoryView(MANY_BUCKETS)), False, key, 500) for key in [ADDRESS, CONTRACT_ADDRESS]]
+    assert history.get_many_as_of(MemoryKV(view), False, [ADDRESS, CONTRACT_ADDRESS], 500, cache) == expected_values
+    assert [bucket_name for bucket_name, _ in view.reads].count(tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL) == 1
+    assert tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL not in [bucket_name for bucket_name, _ in view.batches]
+    assert asyncio.run(history.get_as_of_async(MemoryKV(AsyncMemoryView(BUCKETS)), True, STORAGE_KEY, 1000, cache)) == b'\x0a'
+    assert len(cache) == 2
+
+HISTORY_BUCKETS = {
+    tables.ACCOUNTS_HISTORY_LABEL: {
+        ADDRESS + (1000).to_bytes(8, 'big'): encode_history_chunck([500, 1000], [True, False]),
+        ADDRESS + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([2000]),
+        OTHER_ADDRESS + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([700]),
+        CONTRACT_ADDRESS + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1000]),
+    },
+    tables.STORAGE_HISTORY_LABEL: {
+        ADDRESS + LOCATION + (1500).to_bytes(8, 'big'): encode_history_chunck([1500]),
+        ADDRESS + LOCATION + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([2500]),
+        ADDRESS + OTHER_LOCATION + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([1700]),
+    },
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(700): encode_account_change_set([(OTHER_ADDRESS, encode_account(2, 200))]),
+        timestamp.encode_timestamp(1000): encode_account_change_set([(ADDRESS, OLD_ACCOUNT), (CONTRACT_ADDRESS, encode_account(0, 0, 1))]),
+        timestamp.encode_timestamp(2000): encode_account_change_set([(ADDRESS, encode_account(2, 250))]),
+    },
+    tables.PLAIN_STORAGE_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(1500): encode_storage_change_set(ADDRESS, [(LOCATION, b'\x0a')]),
+        timestamp.encode_timestamp(1700): encode_storage_change_set(ADDRESS, [(OTHER_LOCATION, b'\x0c')]),
+        timestamp.encode_timestamp(2500): encode_storage_change_set(ADDRESS, [(LOCATION, b'\x0d')]),
+    },
+    tables.PLAIN_CONTRACT_CODE_LABEL: {
+        composite_keys.create_storage_prefix(CONTRACT_ADDRESS, 1): CONTRACT_CODE_HASH,
+    },
+    tables.SYNC_STAGE_PROGRESS_LABEL: STAGE_PROGRESS,
+}
+
+ACCOUNT_TIMELINE = [(500, b''), (1000, OLD_ACCOUNT), (2000, encode_account(2, 250))]
+
+@pytest.mark.parametrize("from_block,to_block,batch_size,expected_versions", [
+    (0, None, 256, ACCOUNT_TIMELINE),
+    (0, None, 1, ACCOUNT_TIMELINE),
+    (501, None, 2, ACCOUNT_TIMELINE[1:]),
+    (0, 2000, 256, ACCOUNT_TIMELINE[:2]),
+    (1001, 2001, 256, ACCOUNT_TIMELINE[2:]),
+    (2001, None, 256, []),
+])
+def test_iter_account_history(from_block: int, to_block: int, batch_size: int, expected_versions: list):
+    """ Unit test for iter_account_history. """
+    view = MemoryView(HISTORY_BUCKETS)
+    versions = history.iter_account_history(view, ADDRESS, from_block, to_block, batch_size=batch_size)
+    assert list(versions) == expected_versions
+    change_set_batches = [size for bucket_name, size in view.batches if bucket_name == tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL]
+    assert all(size <= batch_size for size in change_set_batches)
+
+def test_iter_account_history_code_hash():
+    """ Unit test for iter_account_history restoring the code hash of contracts. """
+    cache = changeset_cache.ChangeSetCache()
+    (block_number, value), = history.iter_account_history(MemoryView(HISTORY_BUCKETS), CONTRACT_ADDRESS, change_set_cache=cache)
+    assert block_number == 1000
+    assert account.Account.from_storage(value).code_hash == CONTRACT_CODE_HASH
+    assert len(cache) == 1
+
+def test_iter_storage_history():
+    """ Unit test for iter_storage_history. """
+    view = MemoryView(HISTORY_BUCKETS)
+    assert list(history.iter_storage_history(view, ADDRESS, 1, LOCATION)) == [(1500, b'\x0a'), (2500, b'\x0d')]
+    assert list(history.iter_storage_history(view, ADDRESS, 1, OTHER_LOCATION, 1000, 1800)) == [(1700, b'\x0c')]
+    assert list(history.iter_storage_history(view, ADDRESS, 1, bytes(32))) == []
+    with pytest.raises(ValueError):
+        list(history.iter_storage_history(view, ADDRESS, 1, LOCATION, -1))
+    with pytest.raises(ValueError):
+        list(history.iter_storage_history(view, ADDRESS, 1, LOCATION, batch_size=0))
+
+def test_get_many_as_of_code_hash():
+    """ Unit test for get_many_as_of restoring the code hash of contracts from history. """
+    values = history.get_many_as_of(MemoryKV(MemoryView(MANY_BUCKETS)), False, [CONTRACT_ADDRESS], 500)
+    assert account.Account.from_storage(values[0]).code_hash == CONTRACT_CODE_HASH
+
+@pytest.mark.parametrize("storage,key,block_number,expected_value", [
+    (False, ADDRESS, 500, OLD_ACCOUNT),
+    (False, ADDRESS, 3000, CURRENT_ACCOUNT),
+    (True, STORAGE_KEY, 1000, b'\x0a'),
+    (True, STORAGE_KEY, 3000, b'\x0b'),
+])
+def test_get_as_of_async(storage: bool, key: bytes, block_number: int, expected_value: bytes):
+    """ Unit test for get_as_of_async. """
+    database = MemoryKV(AsyncMemoryView(BUCKETS))
+    assert asyncio.run(history.get_as_of_async(database, storage, key, block_number)) == expected_value
+
+@pytest.mark.parametrize("storage,key,chunck_key,chunck,block_number,expected_block", [
+    (False, ADDRESS, ADDRESS + bytes(8), encode_history_chunck([10, 20]), 5, 10),
+    (False, ADDRESS, ADDRESS + bytes(8), encode_history_chunck([10, 20]), 15, 20),
+    (False, ADDRESS, ADDRESS + bytes(8), encode_history_chunck([10, 20], [True, False]), 5, None),
+    (False, ADDRESS, bytes(28), encode_history_chunck([10, 20]), 5, None),
+    (True, STORAGE_KEY, ADDRESS + LOCATION + bytes(8), encode_history_chunck([10, 20], [True, False]), 5, 10),
+    (True, STORAGE_KEY, ADDRESS + bytes(40), encode_history_chunck([10, 20]), 5, None),
+])
+def test_find_change_set_block(storage: bool, key: bytes, chunck_key: bytes, chunck: bytes, block_number: int, expected_block: int):
+    """ Unit test for find_change_set_block. """
+    assert history.find_change_set_block(storage, key, block_number, chunck_key, chunck) == expected_block
+
+def test_restore_code_hash():
+    """ Unit test for restore_code_hash. """
+    code_hash = bytes.fromhex('ab' * 32)
+    acc = account.Account(1, 0, 1)
+    assert history.needs_code_hash(acc)
+    assert history.restore_code_hash(acc, b'') is None
+    data = history.restore_code_hash(acc, code_hash)
+    assert data == encode_account(1, 0, 1, code_hash)
+    assert not history.needs_code_hash(account.Account.from_storage(data))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""The unit test for history_index module."""
+
+import pytest
+
+from silksnake.core import history_index
+
+from ..memory_kv import encode_history_chunck
+
+# pylint: disable=no-self-use
+
+ADDRESS = bytes.fromhex('33ee33fc3e1aacdb75a1ad362489ac54f02d6d63')
+
+CHUNCK = encode_history_chunck([10, 20, 70000, 0x7FFFFF + 10], [False, True, False, True])
+
+class TestHistoryIndex:
+    """ Unit test for HistoryIndex. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        index = history_index.HistoryIndex(CHUNCK)
+        assert index.length() == 4
+        assert list(index.blocks) == [10, 20, 70000, 0x7FFFFF + 10]
+        assert list(index.set_flags) == [False, True, False, True]
+        assert history_index.HistoryIndex().length() == 0
+        with pytest.raises(AssertionError):
+            history_index.HistoryIndex(bytes(7))
+        with pytest.raises(AssertionError):
+            history_index.HistoryIndex(bytes(9))
+
+    @pytest.mark.parametrize("value,expected_result", [
+        (0, (10, False, True)),
+        (10, (10, False, True)),
+        (11, (20, True, True)),
+        (20000, (70000, False, True)),
+        (0x7FFFFF + 10, (0x7FFFFF + 10, True, True)),
+        (0x7FFFFF + 11, (0, False, False)),
+    ])
+    def test_search(self, value: int, expected_result: tuple):
+        """ Unit test for search. """
+        assert history_index.HistoryIndex(CHUNCK).search(value) == expected_result
+
+    @pytest.mark.parametrize("lower,expected_length", [
+        (5, 0),
+        (10, 1),
+        (69999, 2),
+        (0x7FFFFF + 9, 3),
+        (0x7FFFFF + 10, 4),
+    ])
+    def test_truncate_greater(self, lower: int, expected_length: int):
+        """ Unit test for truncate_greater. """
+        truncated = history_index.HistoryIndex(CHUNCK).truncate_greater(lower)
+        assert truncated == CHUNCK[:history_index.MIN_CHUNCK_SIZE + expected_length * history_index.ITEM_LENGTH]
+
+    @pytest.mark.parametrize("start,end,expected_blocks,expected_flags", [
+        (0, 10, [], []),
+        (10, 70000, [10, 20], [False, True]),
+        (15, 0x7FFFFF + 11, [20, 70000, 0x7FFFFF + 10], [True, False, True]),
+    ])
+    def test_blocks_in_range(self, start: int, end: int, expected_blocks: list, expected_flags: list):
+        """ Unit test for blocks_in_range. """
+        blocks, set_flags = history_index.HistoryIndex(CHUNCK).blocks_in_range(start, end)
+        assert list(blocks) == expected_blocks
+        assert list(set_flags) == expected_flags
+
+    def test_last_element(self):
+        """ Unit test for last_element and chunck_key. """
+        index = history_index.HistoryIndex(CHUNCK)
+        assert index.last_element() == (0x7FFFFF + 10, True)
+        assert index.chunck_key(ADDRESS) == history_index.index_chunck_key(ADDRESS, 0x7FFFFF + 10)
+        assert history_index.HistoryIndex().last_element() == (0, False)
+        assert history_index.HistoryIndex().chunck_key(ADDRESS) is None
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""The unit test for kvcache module."""
+
+import pytest
+import pytest_mock
+
+from silksnake.core import changeset_cache, kvcache
+from silksnake.core.constants import HASH_SIZE
+from silksnake.helpers.dbutils import tables
+from silksnake.stagedsync import stages
+
+from ..memory_kv import MemoryKV, MemoryView
+
+# pylint: disable=no-self-use,unused-argument
+
+BUCKETS = {
+    tables.BLOCK_HEADERS_LABEL: {b'\x01': b'\x0a', b'\x03': b'\x0c'},
+    tables.PLAIN_STATE_LABEL: {b'\x01': b'\x0a'},
+    tables.TRANSACTION_LOOKUP_LABEL: {b'\x01': b'\x0a'},
+}
+
+POLICIES = {
+    tables.BLOCK_HEADERS_LABEL: kvcache.CachePolicy(1024),
+    tables.PLAIN_STATE_LABEL: kvcache.CachePolicy(1024, 12.0),
+}
+
+def test_cache_policy():
+    """ Unit test for CachePolicy. """
+    with pytest.raises(ValueError):
+        kvcache.CachePolicy(None)
+    with pytest.raises(ValueError):
+        kvcache.CachePolicy(-1)
+    with pytest.raises(ValueError):
+        kvcache.CachePolicy(1, -1)
+    with pytest.raises(ValueError):
+        kvcache.CachePolicy(1, min_key_size=-1)
+    with pytest.raises(ValueError):
+        kvcache.CachePolicy(1, 1.0, finality_depth=-1)
+    assert kvcache.CachePolicy(1).immutable
+    assert not kvcache.CachePolicy(1, 1.0).immutable
+    for bucket in [tables.BLOCK_HEADERS_LABEL, tables.BLOCK_BODIES_LABEL]:
+        assert kvcache.DEFAULT_POLICIES[bucket].immutable
+        assert kvcache.DEFAULT_POLICIES[bucket].min_key_size == kvcache.BLOCK_KEY_SIZE
+    assert kvcache.DEFAULT_POLICIES[tables.CODE_LABEL].immutable
+    assert kvcache.DEFAULT_POLICIES[tables.CODE_LABEL].min_key_size == HASH_SIZE
+    for bucket in [tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, tables.PLAIN_STORAGE_CHANGE_SET_LABEL, tables.PLAIN_CONTRACT_CODE_LABEL,
+                   tables.PLAIN_STATE_LABEL, tables.SYNC_STAGE_PROGRESS_LABEL]:
+        assert not kvcache.DEFAULT_POLICIES[bucket].immutable
+    for bucket in [tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, tables.PLAIN_STORAGE_CHANGE_SET_LABEL]:
+        assert kvcache.DEFAULT_POLICIES[bucket].finality_depth == changeset_cache.DEFAULT_FINALITY_DEPTH
+
+class TestCachingKV:
+    """ Unit test for CachingKV. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            kvcache.CachingKV(None)
+        caching_kv = kvcache.CachingKV(MemoryKV(MemoryView(BUCKETS)))
+        assert set(caching_kv.caches) == set(kvcache.DEFAULT_POLICIES)
+        assert isinstance(caching_kv.view(), kvcache.CachingView)
+        with pytest.raises(ValueError):
+            kvcache.CachingView(None, caching_kv)
+        with pytest.raises(ValueError):
+            kvcache.CachingCursor(None, None, None)
+
+    @pytest.mark.parametrize("bucket,key,expected_pair,expected_seeks", [
+        (tables.BLOCK_HEADERS_LABEL, b'\x01', (b'\x01', b'\x0a'), 1),
+        (tables.BLOCK_HEADERS_LABEL, b'\x02', (b'\x03', b'\x0c'), 2),
+        (tables.BLOCK_HEADERS_LABEL, b'\x04', (b'', b''), 2),
+        (tables.PLAIN_STATE_LABEL, b'\x01', (b'\x01', b'\x0a'), 1),
+        (tables.PLAIN_STATE_LABEL, b'\x02', (b'', b''), 1),
+        (tables.TRANSACTION_LOOKUP_LABEL, b'\x01', (b'\x01', b'\x0a'), 2),
+    ])
+    def test_get(self, bucket: str, key: bytes, expected_pair: tuple, expected_seeks: int):
+        """ Unit test for get repeated twice. """
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        caching_kv = kvcache.CachingKV(memory_kv, POLICIES)
+        assert caching_kv.view().get(bucket, key) == expected_pair
+        assert caching_kv.view().get(bucket, key) == expected_pair
+        assert memory_kv.memory_view.seeks == expected_seeks
+        with pytest.raises(ValueError):
+            caching_kv.view().get(bucket, None)
+
+    def test_get_exact(self):
+        """ Unit test for get_exact. """
+        caching_kv = kvcache.CachingKV(MemoryKV(MemoryView(BUCKETS)), POLICIES)
+        assert caching_kv.view().get_exact(tables.BLOCK_HEADERS_LABEL, b'\x01') == b'\x0a'
+        assert caching_kv.view().get_exact(tables.BLOCK_HEADERS_LABEL, b'\x02') is None
+
+    def test_get_ttl(self, mocker: pytest_mock.MockerFixture):
+        """ Unit test for get on bucket with TTL policy. """
+        mock_monotonic = mocker.patch('time.monotonic')
+        mock_monotonic.return_value = 100.0
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        caching_kv = kvcache.CachingKV(memory_kv, {tables.PLAIN_STATE_LABEL: kvcache.CachePolicy(1024, 5.0)})
+        caching_kv.view().get(tables.PLAIN_STATE_LABEL, b'\x01')
+        caching_kv.view().get(tables.PLAIN_STATE_LABEL, b'\x01')
+        assert memory_kv.memory_view.seeks == 1
+        mock_monotonic.return_value = 105.0
+        caching_kv.view().get(tables.PLAIN_STATE_LABEL, b'\x01')
+        assert memory_kv.memory_view.seeks == 2
+
+    @pytest.mark.parametrize("head_block_number,block_number,expected_seeks", [
+        (None, 1, 4),
+        (100, 1, 2),
+        (100, 36, 2),
+        (100, 37, 4),
+        (100, 100, 4),
+    ])
+    def test_get_final(self, mocker: pytest_mock.MockerFixture, head_block_number: int, block_number: int, expected_seeks: int):
+        """ Unit test for get on change sets caching forever just the blocks past finality, reading the head once per view. """
+        mock_monotonic = mocker.patch('time.monotonic')
+        mock_monotonic.return_value = 100.0
+        key = block_number.to_bytes(8, 'big')
+        buckets = {tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {key: b'\x0a'}}
+        if head_block_number is not None:
+            buckets[tables.SYNC_STAGE_PROGRESS_LABEL] = {stages.SyncStage.FINISH.value: head_block_number.to_bytes(8, 'big')}
+        memory_kv = MemoryKV(MemoryView(buckets))
+        caching_kv = kvcache.CachingKV(memory_kv)
+        assert caching_kv.view().get(tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, key) == (key, b'\x0a')
+        mock_monotonic.return_value = 200.0
+        assert caching_kv.view().get(tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL, key) == (key, b'\x0a')
+        assert memory_kv.memory_view.seeks == expected_seeks
+
+    def test_get_block_keys(self):
+        """ Unit test for get on headers caching only the block keys, not the canonical hashes rewritten on reorg. """
+        header_key, canonical_key = (1).to_bytes(8, 'big') + 32 * b'\x0b', (1).to_bytes(8, 'big') + b'n'
+        memory_kv = MemoryKV(MemoryView({tables.BLOCK_HEADERS_LABEL: {header_key: b'\x0a', canonical_key: 32 * b'\x0b'}}))
+        caching_kv = kvcache.CachingKV(memory_kv)
+        for _ in range(2):
+            assert caching_kv.view().get_exact(tables.BLOCK_HEADERS_LABEL, header_key) == b'\x0a'
+            assert caching_kv.view().get_exact(tables.BLOCK_HEADERS_LABEL, canonical_key) == 32 * b'\x0b'
+        assert memory_kv.memory_view.seeks == 3
+        assert header_key in caching_kv.caches[tables.BLOCK_HEADERS_LABEL]
+        assert canonical_key not in caching_kv.caches[tables.BLOCK_HEADERS_LABEL]
+
+    def test_cursor_prefix(self):
+        """ Unit test for cursor bound to prefix bypassing the cache. """
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        caching_kv = kvcache.CachingKV(memory_kv)
+        cursor = caching_kv.view().cursor(tables.BLOCK_HEADERS_LABEL).with_prefix(b'\x01').enable_streaming(True)
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert memory_kv.memory_view.seeks == 2
+        assert list(cursor.next()) == [(b'\x01', b'\x0a')]
+        assert not list(cursor.next(b'\x02'))
+        cursor.cursor.range = pytest_mock.mock.Mock(return_value=iter([]))
+        assert not list(cursor.range(b'\x01', b'\x02', 1, False))
+        cursor.cursor.range.assert_called_once_with(b'\x01', b'\x02', 1, False)
+        cursor.cursor.key_sizes = pytest_mock.mock.Mock(return_value=iter([(b'\x01', 1)]))
+        assert list(cursor.keys(b'\x01')) == [b'\x01']
+        cursor.cursor.key_sizes.assert_called_once_with(b'\x01', None, None)
+
+    def test_get_many(self):
+        """ Unit test for get_many. """
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        caching_kv = kvcache.CachingKV(memory_kv, POLICIES)
+        view = caching_kv.view()
+        with pytest.raises(ValueError):
+            view.get_many(tables.BLOCK_HEADERS_LABEL, None)
+        assert view.get(tables.BLOCK_HEADERS_LABEL, b'\x01') == (b'\x01', b'\x0a')
+        expected_pairs = [(b'\x01', b'\x0a'), (b'\x03', b'\x0c'), (b'\x03', b'\x0c')]
+        assert view.get_many(tables.BLOCK_HEADERS_LABEL, [b'\x01', b'\x02', b'\x03']) == expected_pairs
+        assert len(memory_kv.memory_view.batches) == 1
+        assert memory_kv.memory_view.seeks == 3
+        assert view.get_many(tables.BLOCK_HEADERS_LABEL, [b'\x01', b'\x03']) == [(b'\x01', b'\x0a'), (b'\x03', b'\x0c')]
+        assert len(memory_kv.memory_view.batches) == 1
+
+    def test_invalidate(self):
+        """ Unit test for invalidate. """
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        caching_kv = kvcache.CachingKV(memory_kv, POLICIES)
+        view = caching_kv.view()
+        view.get(tables.BLOCK_HEADERS_LABEL, b'\x01')
+        view.get(tables.PLAIN_STATE_LABEL, b'\x01')
+        caching_kv.invalidate(tables.BLOCK_HEADERS_LABEL, b'\x01')
+        assert b'\x01' not in caching_kv.caches[tables.BLOCK_HEADERS_LABEL]
+        assert b'\x01' in caching_kv.caches[tables.PLAIN_STATE_LABEL]
+        caching_kv.invalidate(tables.PLAIN_STATE_LABEL)
+        assert len(caching_kv.caches[tables.PLAIN_STATE_LABEL]) == 0
+        caching_kv.invalidate(tables.TRANSACTION_LOOKUP_LABEL)
+        view.get(tables.BLOCK_HEADERS_LABEL, b'\x01')
+        caching_kv.invalidate()
+        assert all(len(bucket_cache) == 0 for bucket_cache in caching_kv.caches.values())
+
+    def test_close(self):
+        """ Unit test for close. """
+        mock_kv = pytest_mock.mock.Mock()
+        caching_kv = kvcache.CachingKV(mock_kv)
+        caching_kv.view().close()
+        mock_kv.view.return_value.close.assert_called_once()
+        caching_kv.close()
+        mock_kv.close.assert_called_once()
+
+class TestMemoizingKV:
+    """ Unit test for MemoizingKV. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            kvcache.MemoizingKV(None)
+        with pytest.raises(ValueError):
+            kvcache.MemoizingView(None)
+        with pytest.raises(ValueError):
+            kvcache.MemoizingCursor(None, {})
+        with pytest.raises(ValueError):
+            kvcache.MemoizingCursor(pytest_mock.mock.Mock(), None)
+        memoizing_kv = kvcache.MemoizingKV(MemoryKV(MemoryView(BUCKETS)))
+        assert memoizing_kv.view() is memoizing_kv.view()
+
+    def test_get(self):
+        """ Unit test for get, get_exact and cursor seek. """
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        view = kvcache.MemoizingKV(memory_kv).view()
+        assert view.get(tables.PLAIN_STATE_LABEL, b'\x01') == (b'\x01', b'\x0a')
+        assert view.get_exact(tables.PLAIN_STATE_LABEL, b'\x01') == b'\x0a'
+        assert view.get_exact(tables.PLAIN_STATE_LABEL, b'\x00') is None
+        assert view.cursor(tables.PLAIN_STATE_LABEL).seek(b'\x01') == (b'\x01', b'\x0a')
+        assert view.get(tables.BLOCK_HEADERS_LABEL, b'\x01') == (b'\x01', b'\x0a')
+        assert memory_kv.memory_view.seeks == 3
+        with pytest.raises(ValueError):
+            view.get(tables.PLAIN_STATE_LABEL, None)
+
+    def test_cursor_prefix(self):
+        """ Unit test for cursor bound to prefix not memoized. """
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        view = kvcache.MemoizingKV(memory_kv).view()
+        cursor = view.cursor(tables.BLOCK_HEADERS_LABEL).with_prefix(b'\x01').enable_streaming(True)
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert memory_kv.memory_view.seeks == 2
+        assert list(cursor.next(b'\x00')) == [(b'\x01', b'\x0a')]
+
+    def test_get_many(self):
+        """ Unit test for get_many. """
+        memory_kv = MemoryKV(MemoryView(BUCKETS))
+        view = kvcache.MemoizingKV(memory_kv).view()
+        view.get(tables.BLOCK_HEADERS_LABEL, b'\x01')
+        pairs = view.get_many(tables.BLOCK_HEADERS_LABEL, [b'\x01', b'\x02', b'\x02', b'\x04'])
+        assert pairs == [(b'\x01', b'\x0a'), (b'\x03', b'\x0c'), (b'\x03', b'\x0c'), (b'', b'')]
+        assert len(memory_kv.memory_view.batches) == 1
+        assert memory_kv.memory_view.seeks == 3
+        assert view.get_many(tables.BLOCK_HEADERS_LABEL, [b'\x04', b'\x01']) == [(b'', b''), (b'\x01', b'\x0a')]
+        assert len(memory_kv.memory_view.batches) == 1
+        with pytest.raises(ValueError):
+            view.get_many(tables.BLOCK_HEADERS_LABEL, None)
+
+    def test_close(self):
+        """ Unit test for close. """
+        mock_kv = pytest_mock.mock.Mock()
+        mock_kv.view.return_value.get.return_value = (b'\x01', b'\x0a')
+        memoizing_kv = kvcache.MemoizingKV(mock_kv)
+        memoizing_kv.close()
+        view = memoizing_kv.view()
+        view.get(tables.PLAIN_STATE_LABEL, b'\x01')
+        memoizing_kv.close()
+        assert not view.seeks
+        mock_kv.view.return_value.close.assert_not_called()
+        mock_kv.close.assert_not_called()
+        assert memoizing_kv.view() is not view
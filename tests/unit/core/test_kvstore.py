@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """The unit test for kvstore module."""
 
+import asyncio
+
 import pytest
 
 from silksnake.core import kvstore
@@ -21,6 +23,35 @@ def test_cursor():
         cursor.seek_exact(b'')
     with pytest.raises(NotImplementedError):
         cursor.next()
+    with pytest.raises(NotImplementedError):
+        cursor.range()
+    with pytest.raises(NotImplementedError):
+        cursor.key_sizes()
+    with pytest.raises(NotImplementedError):
+        list(cursor.keys())
+
+@pytest.mark.parametrize("end_key,limit,reverse,expected_pairs", [
+    (None, None, False, [(b'\x01', b'\x0a'), (b'\x02', b'\x0b'), (b'\x03', b'\x0c')]),
+    (b'\x03', None, False, [(b'\x01', b'\x0a'), (b'\x02', b'\x0b')]),
+    (None, 1, False, [(b'\x01', b'\x0a')]),
+    (None, 0, False, []),
+    (b'\x03', None, True, [(b'\x02', b'\x0b'), (b'\x01', b'\x0a')]),
+    (b'\x04', 1, True, [(b'\x03', b'\x0c')]),
+])
+def test_bound_range(end_key: bytes, limit: int, reverse: bool, expected_pairs: list):
+    """ Unit test for bound_range."""
+    pairs = [(b'\x01', b'\x0a'), (b'\x02', b'\x0b'), (b'\x03', b'\x0c'), (b'', b''), (b'\x04', b'\x0d')]
+    kvstore.check_range(end_key, limit, reverse)
+    assert list(kvstore.bound_range(iter(pairs), end_key, limit, reverse)) == expected_pairs
+
+def test_check_range():
+    """ Unit test for check_range."""
+    with pytest.raises(ValueError):
+        kvstore.check_range(None, -1, False)
+    with pytest.raises(ValueError):
+        kvstore.check_range(None, None, None)
+    with pytest.raises(ValueError):
+        kvstore.check_range(None, None, True)
 
 def test_view():
     """ Unit test for View."""
@@ -32,9 +63,45 @@ def test_view():
         view.get('h', b'')
     with pytest.raises(NotImplementedError):
         view.get_exact('h', b'')
+    with pytest.raises(NotImplementedError):
+        view.get_many('h', [b''])
 
 def test_kv():
     """ Unit test for KV."""
     kvstore.KV.__abstractmethods__ = frozenset()
     with pytest.raises(NotImplementedError):
         kvstore.KV().view()
+
+def test_async_cursor():
+    """ Unit test for AsyncCursor."""
+    kvstore.AsyncCursor.__abstractmethods__ = frozenset()
+    cursor = kvstore.AsyncCursor()
+    with pytest.raises(NotImplementedError):
+        cursor.with_prefix('')
+    with pytest.raises(NotImplementedError):
+        cursor.enable_streaming(True)
+    with pytest.raises(NotImplementedError):
+        asyncio.run(cursor.seek(b''))
+    with pytest.raises(NotImplementedError):
+        asyncio.run(cursor.seek_exact(b''))
+    with pytest.raises(NotImplementedError):
+        cursor.next()
+
+def test_async_view():
+    """ Unit test for AsyncView."""
+    kvstore.AsyncView.__abstractmethods__ = frozenset()
+    view = kvstore.AsyncView()
+    with pytest.raises(NotImplementedError):
+        view.cursor('h')
+    with pytest.raises(NotImplementedError):
+        asyncio.run(view.get('h', b''))
+    with pytest.raises(NotImplementedError):
+        asyncio.run(view.get_exact('h', b''))
+    with pytest.raises(NotImplementedError):
+        asyncio.run(view.get_many('h', [b'']))
+
+def test_async_kv():
+    """ Unit test for AsyncKV."""
+    kvstore.AsyncKV.__abstractmethods__ = frozenset()
+    with pytest.raises(NotImplementedError):
+        kvstore.AsyncKV().view()
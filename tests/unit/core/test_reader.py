@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 """The unit test for reader module."""
 
+import asyncio
+
 import pytest
 import pytest_mock
 
 from silksnake.core import history, reader
+from silksnake.helpers.dbutils import composite_keys, tables, timestamp
 from silksnake.state import supply
 
+from ..memory_kv import MemoryKV, MemoryView, encode_account, encode_account_change_set, encode_history_chunck, encode_storage_change_set
+
 # pylint: disable=no-self-use,redefined-outer-name,unused-argument
 
 @pytest.fixture
@@ -24,6 +29,48 @@ def database_view_get(mocker: pytest_mock.MockerFixture, result_key: str, result
     database_mock.view.return_value.get.return_value = (result_key_bytes, result_value_bytes)
     return database_mock
 
+CONTRACT = bytes.fromhex('33' * 20)
+CODELESS_CONTRACT = bytes.fromhex('32' * 20)
+CODE_HASH = bytes.fromhex('ab' * 32)
+OTHER_CONTRACT = bytes.fromhex('34' * 20)
+LOCATIONS = [bytes(31) + bytes([i]) for i in range(5)]
+CONTRACT_KEYS = [composite_keys.create_plain_composite_storage_key(CONTRACT, 1, location) for location in LOCATIONS]
+NO_HISTORY_BLOCK = (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big')
+
+# Contract created at block 10. Codeless contract has its code hash only in PLAIN-contractCode.
+# Slot 1: 0x0a until block 12, then 0x0b. Slot 2: missing until block 12, 0x0c until block 18, then deleted.
+# Slot 3: always 0x0d. Slot 4: missing until block 20, then 0x0e. Other contract slot 0 is always 0x0f.
+STORAGE_BUCKETS = {
+    tables.ACCOUNTS_HISTORY_LABEL: {
+        CONTRACT + NO_HISTORY_BLOCK: encode_history_chunck([10]),
+    },
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(10): encode_account_change_set([(CONTRACT, b'')]),
+    },
+    tables.PLAIN_CONTRACT_CODE_LABEL: {
+        composite_keys.create_storage_prefix(CODELESS_CONTRACT, 1): CODE_HASH,
+    },
+    tables.STORAGE_HISTORY_LABEL: {
+        CONTRACT + LOCATIONS[1] + NO_HISTORY_BLOCK: encode_history_chunck([12]),
+        CONTRACT + LOCATIONS[2] + NO_HISTORY_BLOCK: encode_history_chunck([12, 18]),
+        CONTRACT + LOCATIONS[4] + NO_HISTORY_BLOCK: encode_history_chunck([20]),
+    },
+    tables.PLAIN_STORAGE_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(12): encode_storage_change_set(CONTRACT, [(LOCATIONS[1], b'\x0a'), (LOCATIONS[2], b'')]),
+        timestamp.encode_timestamp(18): encode_storage_change_set(CONTRACT, [(LOCATIONS[2], b'\x0c')]),
+        timestamp.encode_timestamp(20): encode_storage_change_set(CONTRACT, [(LOCATIONS[4], b'')]),
+    },
+    tables.PLAIN_STATE_LABEL: {
+        CODELESS_CONTRACT: encode_account(1, 0, 1),
+        CONTRACT: encode_account(1, 0, 1, CODE_HASH),
+        CONTRACT_KEYS[1]: b'\x0b',
+        CONTRACT_KEYS[3]: b'\x0d',
+        CONTRACT_KEYS[4]: b'\x0e',
+        OTHER_CONTRACT: encode_account(1, 0, 1),
+        composite_keys.create_plain_composite_storage_key(OTHER_CONTRACT, 1, LOCATIONS[0]): b'\x0f',
+    },
+}
+
 class TestStateReader:
     """Test case for StateReader."""
 
@@ -100,3 +147,96 @@ class TestStateReader:
             assert state_reader.read_eth_supply() == int.from_bytes(result_value_bytes, 'big')
         else:
             assert state_reader.read_eth_supply() == supply.ETH_SUPPLY_NOT_AVAILABLE
+
+    @pytest.mark.parametrize("block_number,expected_slots", [
+        (11, [(LOCATIONS[1], b'\x0a'), (LOCATIONS[3], b'\x0d')]),
+        (12, [(LOCATIONS[1], b'\x0b'), (LOCATIONS[2], b'\x0c'), (LOCATIONS[3], b'\x0d')]),
+        (19, [(LOCATIONS[1], b'\x0b'), (LOCATIONS[3], b'\x0d')]),
+        (30, [(LOCATIONS[1], b'\x0b'), (LOCATIONS[3], b'\x0d'), (LOCATIONS[4], b'\x0e')]),
+    ])
+    @pytest.mark.parametrize("limit", [1, 2, 3, 100])
+    def test_storage_range(self, block_number: int, expected_slots: list, limit: int):
+        """Unit test for storage_range."""
+        state_reader = reader.StateReader(MemoryKV(MemoryView(STORAGE_BUCKETS)), block_number)
+        slots, start_key = [], LOCATIONS[0]
+        while start_key is not None:
+            page, start_key = state_reader.storage_range('0x' + CONTRACT.hex(), start_key, limit)
+            assert len(page) == limit or start_key is None
+            slots += page
+        assert slots == expected_slots
+        page, start_key = state_reader.storage_range('0x' + CONTRACT.hex(), LOCATIONS[2], 1)
+        assert page == expected_slots[1:2]
+        assert start_key == (expected_slots[2][0] if len(expected_slots) > 2 else None)
+
+    @pytest.mark.parametrize("address,block_number,expected_code_hash", [
+        (CONTRACT, 30, CODE_HASH),
+        (CODELESS_CONTRACT, 30, CODE_HASH),
+        (OTHER_CONTRACT, 30, b''),
+        (bytes.fromhex('35' * 20), 30, b''),
+        (CONTRACT, 9, b''),
+    ])
+    def test_read_code_hash(self, address: bytes, block_number: int, expected_code_hash: bytes):
+        """Unit test for read_code_hash."""
+        state_reader = reader.StateReader(MemoryKV(MemoryView(STORAGE_BUCKETS)), block_number)
+        assert state_reader.read_code_hash('0x' + address.hex()) == expected_code_hash
+
+    def test_storage_range_invalid(self):
+        """Unit test for storage_range having invalid arguments or missing account."""
+        state_reader = reader.StateReader(MemoryKV(MemoryView(STORAGE_BUCKETS)), 30)
+        assert state_reader.storage_range('0x' + bytes.fromhex('35' * 20).hex(), b'', 1) == ([], None)
+        with pytest.raises(ValueError):
+            state_reader.storage_range('0x' + CONTRACT.hex(), None, 1)
+        with pytest.raises(ValueError):
+            state_reader.storage_range('0x' + CONTRACT.hex(), b'', 0)
+
+@pytest.fixture
+def get_as_of_async(mocker: pytest_mock.MockerFixture, value: str):
+    """ get_as_of_async """
+    get_as_of_mock = mocker.patch.object(history, 'get_as_of_async', new_callable=pytest_mock.mock.AsyncMock)
+    get_as_of_mock.return_value = bytes.fromhex(value) if value is not None else None
+
+class TestAsyncStateReader:
+    """Test case for AsyncStateReader."""
+
+    def test__init__(self):
+        """Unit test for __init__."""
+        database_mock = pytest_mock.mock.Mock()
+        state_reader = reader.AsyncStateReader(database_mock, 0)
+        assert state_reader.database == database_mock
+        assert state_reader.block_number == 0
+        with pytest.raises(ValueError):
+            reader.AsyncStateReader(database_mock, None)
+        with pytest.raises(ValueError):
+            reader.AsyncStateReader(None, 0)
+
+    @pytest.mark.parametrize("address,value", [
+        ('de06e68660429b198612e4b73919395799f9ad87bcaa80dc873e37b281060517', '07010104017f4abe0101'),
+    ])
+    def test_read_account_data(self, get_as_of_async, address: str, value: str):
+        """Unit test for read_account_data."""
+        state_reader = reader.AsyncStateReader(pytest_mock.mock.Mock(), 1234567)
+        account = asyncio.run(state_reader.read_account_data(address))
+        data = bytearray(account.length_for_storage())
+        account.to_storage(data)
+        assert bytes(data) == bytes.fromhex(value)
+
+    @pytest.mark.parametrize("address,incarnation,location,value", [
+        ('de06e68660429b198612e4b73919395799f9ad87bcaa80dc873e37b281060517', 1, '00', '07010104017f4abe0101'),
+    ])
+    def test_read_account_storage(self, get_as_of_async, address: str, incarnation: int, location: str, value: str):
+        """Unit test for read_account_storage."""
+        state_reader = reader.AsyncStateReader(pytest_mock.mock.Mock(), 1234567)
+        location_value = asyncio.run(state_reader.read_account_storage(address, incarnation, bytes.fromhex(location)))
+        assert location_value == bytes.fromhex(value)
+
+    @pytest.mark.parametrize("block_number,result_key,result_value,expected_supply", [
+        (0, '0000000000000000', '0000000000000001', 1),
+        (0, '', '', supply.ETH_SUPPLY_NOT_AVAILABLE),
+    ])
+    def test_read_eth_supply(self, block_number: int, result_key: str, result_value: str, expected_supply: int):
+        """Unit test for read_eth_supply."""
+        database_mock = pytest_mock.mock.Mock()
+        result = bytes.fromhex(result_key), bytes.fromhex(result_value)
+        database_mock.view.return_value.get = pytest_mock.mock.AsyncMock(return_value=result)
+        state_reader = reader.AsyncStateReader(database_mock, block_number)
+        assert asyncio.run(state_reader.read_eth_supply()) == expected_supply
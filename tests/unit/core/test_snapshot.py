@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""The unit test for snapshot module."""
+
+import os
+
+import pytest
+
+from silksnake.core import snapshot
+
+# pylint: disable=no-self-use,redefined-outer-name
+
+PAIRS = [(bytes([i // 16, i % 16]), bytes([i]) * (i % 5)) for i in range(0, 200, 2)]
+
+@pytest.fixture
+def snapshot_kv(tmp_path) -> snapshot.SnapshotKV:
+    """ snapshot_kv """
+    snapshot.write_segment(str(tmp_path), 'T', PAIRS, 8)
+    snapshot.write_segment(str(tmp_path), 'E', [])
+    snapshot_kv = snapshot.SnapshotKV(str(tmp_path))
+    yield snapshot_kv
+    snapshot_kv.close()
+
+class TestSegmentWriter:
+    """ Unit test for SegmentWriter. """
+    def test_init(self, tmp_path):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            snapshot.SegmentWriter(None)
+        with pytest.raises(ValueError):
+            snapshot.SegmentWriter(str(tmp_path / 'T.seg'), 0)
+
+    def test_append(self, tmp_path):
+        """ Unit test for append. """
+        path = str(tmp_path / 'T.seg')
+        with snapshot.SegmentWriter(path, 2) as writer:
+            writer.append(b'\x01', b'\x0a')
+            with pytest.raises(ValueError):
+                writer.append(b'\x01', b'\x0b')
+            with pytest.raises(ValueError):
+                writer.append(b'', b'\x0b')
+            with pytest.raises(ValueError):
+                writer.append(b'\x02', None)
+            writer.append(b'\x02', b'')
+            writer.append(b'\x03', b'\x0c\x0c')
+        assert os.path.getsize(path) == 3 * 8 + 3 + 3
+        assert os.path.getsize(str(tmp_path / 'T.idx')) == 2 * (12 + 1)
+        assert snapshot.Segment(path).index_keys == [b'\x01', b'\x03']
+
+    def test_resume(self, tmp_path):
+        """ Unit test for append after resume, dropping the partial last record. """
+        path = str(tmp_path / 'T.seg')
+        with snapshot.SegmentWriter(path, 2) as writer:
+            writer.append(b'\x01', b'\x0a')
+            writer.append(b'\x02', b'\x0b')
+            writer.append(b'\x03', b'\x0c')
+        with open(path, 'ab') as segment_file:
+            segment_file.write(snapshot.RECORD_HEADER.pack(1, 1) + b'\x04')
+        with snapshot.SegmentWriter(path, 2, resume=True) as writer:
+            assert writer.count == 3
+            assert writer.last_key == b'\x03'
+            with pytest.raises(ValueError):
+                writer.append(b'\x03', b'\x0d')
+            writer.append(b'\x04', b'\x0d')
+            writer.append(b'\x05', b'\x0e')
+        segment = snapshot.Segment(path)
+        assert [(bytes(k), bytes(v)) for k, v, _, _ in segment.records(0)] == [(bytes([i]), bytes([9 + i])) for i in range(1, 6)]
+        assert segment.index_keys == [b'\x01', b'\x03', b'\x05']
+        segment.close()
+
+    def test_resume_from_index(self, tmp_path):
+        """ Unit test for resume scanning only after the last sparse index entry. """
+        path = str(tmp_path / 'T.seg')
+        with snapshot.SegmentWriter(path, 4) as writer:
+            for i in range(10):
+                writer.append(bytes([i]), bytes([i]))
+        with open(path, 'r+b') as segment_file:
+            segment_file.seek(2 * 10)
+            segment_file.write(snapshot.RECORD_HEADER.pack(1, 0xFFFF))
+        with snapshot.SegmentWriter(path, 4, resume=True) as writer:
+            assert writer.count == 10
+            assert writer.last_key == b'\x09'
+            assert writer.offset == os.path.getsize(path)
+            assert [key for key, _ in writer.index] == [b'\x00', b'\x04', b'\x08']
+
+    @pytest.mark.parametrize("index_interval", [3, 5, 20])
+    def test_resume_inconsistent_index(self, tmp_path, index_interval: int):
+        """ Unit test for resume scanning from the start if the sparse index does not match the segment. """
+        path = str(tmp_path / 'T.seg')
+        with snapshot.SegmentWriter(path, 4) as writer:
+            for i in range(10):
+                writer.append(bytes([i]), bytes([i]))
+        with snapshot.SegmentWriter(path, index_interval, resume=True) as writer:
+            assert writer.count == 10
+            assert writer.last_key == b'\x09'
+            assert [key for key, _ in writer.index] == [bytes([i]) for i in range(0, 10, index_interval)]
+        with open(path, 'wb') as segment_file:
+            segment_file.write(snapshot.RECORD_HEADER.pack(1, 1) + b'\x05\x05')
+        with snapshot.SegmentWriter(path, 4, resume=True) as writer:
+            assert writer.count == 1
+            assert writer.last_key == b'\x05'
+
+class TestSnapshotKV:
+    """ Unit test for SnapshotKV. """
+    def test_init(self, tmp_path):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            snapshot.SnapshotKV(None)
+        with pytest.raises(ValueError):
+            snapshot.SnapshotKV(str(tmp_path / 'missing'))
+        with pytest.raises(ValueError):
+            snapshot.SnapshotView(None)
+        with pytest.raises(ValueError):
+            snapshot.SnapshotCursor(None, None)
+
+    def test_bucket_names(self, snapshot_kv: snapshot.SnapshotKV):
+        """ Unit test for bucket_names. """
+        assert snapshot_kv.bucket_names() == ['E', 'T']
+
+    @pytest.mark.parametrize("bucket,key,expected_pair", [
+        ('T', b'\x00\x00', PAIRS[0]),
+        ('T', b'\x00', PAIRS[0]),
+        ('T', b'\x00\x01', PAIRS[1]),
+        ('T', b'\x05\x00', PAIRS[40]),
+        ('T', b'\x0c\x06', PAIRS[99]),
+        ('T', b'\x0c\x07', (b'', b'')),
+        ('T', b'\xff', (b'', b'')),
+        ('E', b'\x00', (b'', b'')),
+        ('X', b'\x00', (b'', b'')),
+    ])
+    def test_get(self, snapshot_kv: snapshot.SnapshotKV, bucket: str, key: bytes, expected_pair: tuple):
+        """ Unit test for get and get_exact. """
+        view = snapshot_kv.view()
+        assert view.get(bucket, key) == expected_pair
+        assert view.get_exact(bucket, key) == (expected_pair[1] if expected_pair[0] == key else None)
+        with pytest.raises(ValueError):
+            view.get(bucket, None)
+
+    def test_get_many(self, snapshot_kv: snapshot.SnapshotKV):
+        """ Unit test for get_many. """
+        view = snapshot_kv.view()
+        assert view.get_many('T', [PAIRS[7][0], b'\xff', PAIRS[3][0]]) == [PAIRS[7], (b'', b''), PAIRS[3]]
+        with pytest.raises(ValueError):
+            view.get_many('T', None)
+
+    def test_cursor_prefix(self, snapshot_kv: snapshot.SnapshotKV):
+        """ Unit test for seek bound to prefix. """
+        cursor = snapshot_kv.view().cursor('T').with_prefix(b'\x01')
+        assert cursor.seek(b'\x01\x05') == PAIRS[11]
+        assert cursor.seek(b'\x01\x0f') == (b'', b'')
+        with pytest.raises(ValueError):
+            cursor.with_prefix(None)
+        with pytest.raises(ValueError):
+            cursor.enable_streaming(None)
+
+    @pytest.mark.parametrize("bucket,prefix,streaming,expected_pairs", [
+        ('T', b'\x01', True, PAIRS[8:16] + [(b'', b'')]),
+        ('T', b'\x01', False, PAIRS[8:9]),
+        ('T', b'', True, PAIRS + [(b'', b'')]),
+        ('T', b'\x0d', True, [(b'', b'')]),
+        ('E', b'', True, [(b'', b'')]),
+        ('X', b'', True, [(b'', b'')]),
+    ])
+    def test_next(self, snapshot_kv: snapshot.SnapshotKV, bucket: str, prefix: bytes, streaming: bool, expected_pairs: list):
+        """ Unit test for next. """
+        cursor = snapshot_kv.view().cursor(bucket).with_prefix(prefix).enable_streaming(streaming)
+        pairs = list(cursor.next())
+        assert [(bytes(pair.key), bytes(pair.value)) for pair in pairs] == expected_pairs
+        assert all(isinstance(pair.key, memoryview) for pair in pairs if pair.key)
+
+    def test_next_start_key(self, snapshot_kv: snapshot.SnapshotKV):
+        """ Unit test for next starting at key. """
+        cursor = snapshot_kv.view().cursor('T').with_prefix(b'\x01').enable_streaming(True)
+        assert [(bytes(pair.key), bytes(pair.value)) for pair in cursor.next(b'\x01\x09')] == PAIRS[13:16] + [(b'', b'')]
+        assert [(bytes(pair.key), bytes(pair.value)) for pair in cursor.next(b'\x00')] == PAIRS[8:16] + [(b'', b'')]
+
+    @pytest.mark.parametrize("prefix,start_key,end_key,limit,reverse,expected_pairs", [
+        (b'', None, None, None, False, PAIRS),
+        (b'', b'\x01\x05', b'\x02\x00', None, False, PAIRS[11:16]),
+        (b'\x01', None, None, 2, False, PAIRS[8:10]),
+        (b'', b'\x01\x05', b'\x02\x00', 2, True, PAIRS[15:13:-1]),
+        (b'', None, b'\x00\x05', None, True, PAIRS[2::-1]),
+        (b'', None, None, 0, False, []),
+    ])
+    def test_range(self, snapshot_kv: snapshot.SnapshotKV, prefix: bytes, start_key: bytes, end_key: bytes, limit: int, reverse: bool,
+                   expected_pairs: list):
+        """ Unit test for range. """
+        cursor = snapshot_kv.view().cursor('T').with_prefix(prefix)
+        assert [(key, bytes(value)) for key, value in cursor.range(start_key, end_key, limit, reverse)] == expected_pairs
+        with pytest.raises(ValueError):
+            cursor.range(reverse=True)
+
+    def test_key_sizes(self, snapshot_kv: snapshot.SnapshotKV):
+        """ Unit test for key_sizes and keys. """
+        cursor = snapshot_kv.view().cursor('T').with_prefix(b'\x01')
+        assert list(cursor.key_sizes(limit=3)) == [(key, len(value)) for key, value in PAIRS[8:11]]
+        assert list(cursor.keys(b'\x01\x0c')) == [key for key, _ in PAIRS[14:16]]
+        with pytest.raises(ValueError):
+            cursor.key_sizes(limit=-1)
+
+    def test_close(self, tmp_path):
+        """ Unit test for close with memory views still alive. """
+        snapshot.write_segment(str(tmp_path), 'T', PAIRS)
+        snapshot_kv = snapshot.SnapshotKV(str(tmp_path))
+        pair = next(snapshot_kv.view().cursor('T').next())
+        snapshot_kv.close()
+        assert bytes(pair.key) == PAIRS[0][0]
+        assert not snapshot_kv.segments
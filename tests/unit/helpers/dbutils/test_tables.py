@@ -12,6 +12,7 @@ def test_table_labels():
     assert BLOCK_HEADERS_LABEL
     assert BLOCK_HEADER_NUMBERS_LABEL
     assert BLOCK_RECEIPTS_LABEL
+    assert CODE_LABEL
     assert ETH_SUPPLY_LABEL
     assert PLAIN_STATE_LABEL
     assert PLAIN_ACCOUNTS_CHANGE_SET_LABEL
@@ -26,6 +27,7 @@ def test_table_labels():
     assert BLOCK_HEADERS_LABEL in tableLabels
     assert BLOCK_HEADER_NUMBERS_LABEL in tableLabels
     assert BLOCK_RECEIPTS_LABEL in tableLabels
+    assert CODE_LABEL in tableLabels
     assert ETH_SUPPLY_LABEL in tableLabels
     assert PLAIN_STATE_LABEL in tableLabels
     assert PLAIN_ACCOUNTS_CHANGE_SET_LABEL in tableLabels
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""The unit test for cache module."""
+
+import threading
+import time
+
+import pytest
+import pytest_mock
+
+from silksnake.helpers import cache
+from silksnake.helpers.cache import ENTRY_OVERHEAD_SIZE
+
+# pylint: disable=no-self-use
+
+class TestLRUCache:
+    """ Unit test for LRUCache. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            cache.LRUCache(None)
+        with pytest.raises(ValueError):
+            cache.LRUCache(-1)
+        with pytest.raises(ValueError):
+            cache.LRUCache(0, -1)
+        lru_cache = cache.LRUCache(1024)
+        assert lru_cache.max_size == 1024
+        assert lru_cache.ttl is None
+        assert len(lru_cache) == 0
+
+    def test_get_put(self):
+        """ Unit test for get and put. """
+        lru_cache = cache.LRUCache(1024)
+        assert lru_cache.get(b'\x01') is None
+        assert lru_cache.get(b'\x01', b'') == b''
+        lru_cache.put(b'\x01', b'\x0a', 2)
+        assert lru_cache.get(b'\x01') == b'\x0a'
+        assert b'\x01' in lru_cache
+        assert lru_cache.size == 2 + ENTRY_OVERHEAD_SIZE
+        lru_cache.put(b'\x01', b'\x0b\x0b', 3)
+        assert lru_cache.get(b'\x01') == b'\x0b\x0b'
+        assert lru_cache.size == 3 + ENTRY_OVERHEAD_SIZE
+        assert (lru_cache.hits, lru_cache.misses) == (2, 2)
+
+    def test_eviction(self):
+        """ Unit test for least recently used eviction by byte size. """
+        lru_cache = cache.LRUCache(3 * (10 + ENTRY_OVERHEAD_SIZE))
+        for key in [b'\x01', b'\x02', b'\x03']:
+            lru_cache.put(key, key, 10)
+        assert lru_cache.get(b'\x01') == b'\x01'
+        lru_cache.put(b'\x04', b'\x04', 10)
+        assert b'\x02' not in lru_cache
+        assert [b'\x01', b'\x03', b'\x04'] == sorted(lru_cache.entries)
+        lru_cache.put(b'\x05', b'\x05', 2 * (10 + ENTRY_OVERHEAD_SIZE))
+        assert list(lru_cache.entries) == [b'\x05']
+        lru_cache.put(b'\x06', b'\x06', lru_cache.max_size)
+        assert b'\x06' not in lru_cache
+        assert lru_cache.size <= lru_cache.max_size
+
+    def test_ttl(self, mocker: pytest_mock.MockerFixture):
+        """ Unit test for entry expiration. """
+        mock_monotonic = mocker.patch.object(time, 'monotonic')
+        mock_monotonic.return_value = 100.0
+        lru_cache = cache.LRUCache(1024, 5.0)
+        lru_cache.put(b'\x01', b'\x0a', 1)
+        lru_cache.put(b'\x02', b'\x0b', 1, expires=False)
+        mock_monotonic.return_value = 104.0
+        assert lru_cache.get(b'\x01') == b'\x0a'
+        mock_monotonic.return_value = 105.0
+        assert lru_cache.get(b'\x01') is None
+        assert lru_cache.get(b'\x02') == b'\x0b'
+        assert lru_cache.size == 1 + cache.ENTRY_OVERHEAD_SIZE
+
+    def test_invalidate(self):
+        """ Unit test for invalidate and clear. """
+        lru_cache = cache.LRUCache(1024)
+        lru_cache.put(b'\x01', b'\x0a', 1)
+        lru_cache.put(b'\x02', b'\x0b', 1)
+        lru_cache.invalidate(b'\x01')
+        lru_cache.invalidate(b'\x03')
+        assert b'\x01' not in lru_cache
+        assert lru_cache.size == 1 + ENTRY_OVERHEAD_SIZE
+        lru_cache.clear()
+        assert len(lru_cache) == 0
+        assert lru_cache.size == 0
+
+    def test_concurrent(self):
+        """ Unit test for concurrent access. """
+        lru_cache = cache.LRUCache(100 * (1 + ENTRY_OVERHEAD_SIZE))
+
+        def put_all(start: int):
+            for i in range(start, start + 1000):
+                lru_cache.put(i, i, 1)
+                lru_cache.get(i - 1)
+
+        threads = [threading.Thread(target=put_all, args=(i * 1000,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(lru_cache) == 100
+        assert lru_cache.size == 100 * (1 + ENTRY_OVERHEAD_SIZE)
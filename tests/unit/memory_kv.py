@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""The in-memory KV and the chain data encoders shared by the unit tests."""
+
+import bisect
+
+from silksnake.core import account
+
+def encode_history_chunck(blocks: list, set_flags: list = None) -> bytes:
+    """ Encode the given sorted block numbers as history index chunck. """
+    set_flags = set_flags if set_flags else [False] * len(blocks)
+    chunck = bytearray((blocks[0] if blocks else 0).to_bytes(8, 'big'))
+    for block, is_set in zip(blocks, set_flags):
+        delta = block - blocks[0]
+        chunck += bytes([(delta >> 16) | (0x80 if is_set else 0), (delta >> 8) & 0xFF, delta & 0xFF])
+    return bytes(chunck)
+
+def encode_account_change_set(changes: list) -> bytes:
+    """ Encode the given (key, value) sorted list as account change set. """
+    buffer = bytearray(len(changes).to_bytes(4, 'big'))
+    for key, _ in changes:
+        buffer += key
+    offset = 0
+    for _, value in changes:
+        offset += len(value)
+        buffer += offset.to_bytes(4, 'big')
+    for _, value in changes:
+        buffer += value
+    return bytes(buffer)
+
+def encode_plain_storage_change_set(changes: list) -> bytes:
+    """ Encode the given sorted (address, incarnation, [(location, value)]) list as PLAIN storage change set. """
+    buffer = bytearray(len(changes).to_bytes(4, 'big'))
+    num_keys = 0
+    for address, _, locations in changes:
+        num_keys += len(locations)
+        buffer += address + num_keys.to_bytes(4, 'big')
+    incarnations = [(i, incarnation) for i, (_, incarnation, _) in enumerate(changes) if incarnation != 1]
+    buffer += len(incarnations).to_bytes(4, 'big')
+    for i, incarnation in incarnations:
+        buffer += i.to_bytes(4, 'big') + incarnation.to_bytes(8, 'big')
+    values = [value for _, _, locations in changes for _, value in locations]
+    for _, _, locations in changes:
+        for location, _ in locations:
+            buffer += location
+    value_ends = [sum(len(value) for value in values[:i + 1]) for i in range(len(values))]
+    sizes = [1 if end < 0x100 else 2 if end < 0x10000 else 4 for end in value_ends]
+    buffer += b''.join(sizes.count(size).to_bytes(4, 'big') for size in [1, 2, 4])
+    buffer += b''.join(end.to_bytes(size, 'big') for end, size in zip(value_ends, sizes))
+    return bytes(buffer + b''.join(values))
+
+def encode_storage_change_set(address: bytes, changes: list) -> bytes:
+    """ Encode the given (location, value) sorted list for address having default incarnation as storage change set. """
+    return encode_plain_storage_change_set([(address, 1, changes)])
+
+def encode_account(nonce: int, balance: int, incarnation: int = 0, code_hash: bytes = b'') -> bytes:
+    """ Encode the given account fields for storage. """
+    acc = account.Account(nonce, balance, incarnation, code_hash)
+    data = bytearray(acc.length_for_storage())
+    acc.to_storage(data)
+    return bytes(data)
+
+class MemoryCursor:
+    """ In-memory cursor on sorted key-value pairs, counting the seeks on its view. """
+    def __init__(self, view, pairs: dict):
+        self.view = view
+        self.keys = sorted(pairs)
+        self.pairs = pairs
+
+    def with_prefix(self, prefix: bytes):
+        """ with_prefix """
+        self.keys = [key for key in self.keys if key.startswith(prefix)]
+        return self
+
+    def enable_streaming(self, streaming: bool): # pylint: disable=unused-argument
+        """ enable_streaming """
+        return self
+
+    def seek(self, key: bytes) -> (bytes, bytes):
+        """ seek """
+        self.view.seeks += 1
+        index = bisect.bisect_left(self.keys, key)
+        if index == len(self.keys):
+            return b'', b''
+        return self.keys[index], self.pairs[self.keys[index]]
+
+    def next(self, start_key: bytes = None):
+        """ next """
+        return self.range(start_key if start_key is not None else b'')
+
+    def range(self, start_key: bytes = b'', end_key: bytes = None):
+        """ range """
+        for key in self.keys[bisect.bisect_left(self.keys, start_key):]:
+            if end_key is not None and key >= end_key:
+                break
+            yield key, self.pairs[key]
+
+class MemoryView:
+    """ In-memory view on buckets of key-value pairs, recording the seeks, the (bucket, key) reads and the (bucket, size) batches. """
+    def __init__(self, buckets: dict):
+        self.buckets = buckets
+        self.seeks = 0
+        self.reads = []
+        self.batches = []
+
+    def cursor(self, bucket_name: str) -> MemoryCursor:
+        """ cursor """
+        return MemoryCursor(self, self.buckets.get(bucket_name, {}))
+
+    def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
+        """ get """
+        self.reads.append((bucket_name, key))
+        return self.cursor(bucket_name).seek(key)
+
+    def get_many(self, bucket_name: str, keys: list) -> list:
+        """ get_many """
+        self.batches.append((bucket_name, len(keys)))
+        return [self.get(bucket_name, key) for key in keys]
+
+class AsyncMemoryCursor:
+    """ In-memory cursor for asyncio. """
+    def __init__(self, cursor: MemoryCursor):
+        self.cursor = cursor
+
+    async def seek(self, key: bytes) -> (bytes, bytes):
+        """ seek """
+        return self.cursor.seek(key)
+
+class AsyncMemoryView:
+    """ In-memory view for asyncio, recording on its blocking view. """
+    def __init__(self, buckets: dict):
+        self.view = MemoryView(buckets)
+
+    def cursor(self, bucket_name: str) -> AsyncMemoryCursor:
+        """ cursor """
+        return AsyncMemoryCursor(self.view.cursor(bucket_name))
+
+    async def get(self, bucket_name: str, key: bytes) -> (bytes, bytes):
+        """ get """
+        return self.view.get(bucket_name, key)
+
+class MemoryKV:
+    """ In-memory KV always returning the given view. """
+    def __init__(self, view):
+        self.memory_view = view
+
+    def view(self):
+        """ view """
+        return self.memory_view
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""The unit test for remote export module."""
+
+import io
+
+import pytest
+
+from silksnake.core import snapshot
+from silksnake.remote import kv_export, kv_server
+
+# pylint: disable=redefined-outer-name
+
+PAIRS = [(bytes([i // 16, i % 16]), bytes([i])) for i in range(1, 64)]
+
+@pytest.fixture
+def target() -> str:
+    """ target """
+    store = kv_server.MemoryStore()
+    for key, value in PAIRS:
+        store.put('T', key, value)
+    server = kv_server.serve(store, 'localhost:0')
+    yield 'localhost:{}'.format(server.port)
+    server.stop(None)
+
+def read_segment(directory: str, bucket: str) -> list:
+    """ Read back all the pairs in the bucket segment. """
+    snapshot_kv = snapshot.SnapshotKV(directory)
+    cursor = snapshot_kv.view().cursor(bucket).enable_streaming(True)
+    pairs = [(bytes(pair.key), bytes(pair.value)) for pair in cursor.next() if pair.key]
+    snapshot_kv.close()
+    return pairs
+
+@pytest.mark.parametrize("prefix,start_key,end_key,expected_pairs", [
+    (b'', None, None, PAIRS),
+    (b'\x01', None, None, PAIRS[15:31]),
+    (b'', b'\x01\x08', b'\x02\x02', PAIRS[23:33]),
+    (b'\x02', b'\x01\x08', None, PAIRS[31:47]),
+    (b'', b'\x04', None, []),
+])
+def test_export_bucket(tmp_path, target: str, prefix: bytes, start_key: bytes, end_key: bytes, expected_pairs: list):
+    """ Unit test for export_bucket. """
+    progress_list = []
+    progress = kv_export.export_bucket(target, 'T', str(tmp_path), prefix, start_key, end_key, progress=progress_list.append,
+                                       progress_interval=10)
+    assert read_segment(str(tmp_path), 'T') == expected_pairs
+    assert progress.count == len(expected_pairs)
+    assert progress.size == 3 * len(expected_pairs)
+    assert len(progress_list) == len(expected_pairs) // 10 + 1
+    assert progress_list[-1] == progress
+
+def test_export_bucket_resume(tmp_path, target: str):
+    """ Unit test for export_bucket resuming after interruption. """
+    def interrupt(progress: kv_export.ExportProgress):
+        if progress.count == 20:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        kv_export.export_bucket(target, 'T', str(tmp_path), progress=interrupt, progress_interval=10)
+    assert read_segment(str(tmp_path), 'T') == PAIRS[:20]
+
+    progress = kv_export.export_bucket(target, 'T', str(tmp_path))
+    assert progress.count == len(PAIRS) - 20
+    assert progress.last_key == PAIRS[-1][0]
+    assert read_segment(str(tmp_path), 'T') == PAIRS
+
+    progress = kv_export.export_bucket(target, 'T', str(tmp_path), resume=False, end_key=b'\x01')
+    assert progress.count == 15
+    assert read_segment(str(tmp_path), 'T') == PAIRS[:15]
+
+def test_export_bucket_invalid(tmp_path):
+    """ Unit test for export_bucket with invalid arguments. """
+    with pytest.raises(ValueError):
+        kv_export.export_bucket('', None, str(tmp_path))
+    with pytest.raises(ValueError):
+        kv_export.export_bucket('', 'T', None)
+    with pytest.raises(ValueError):
+        kv_export.export_bucket('', 'T', str(tmp_path), None)
+    with pytest.raises(ValueError):
+        kv_export.export_bucket('', 'T', str(tmp_path), progress_interval=0)
+
+def test_print_progress():
+    """ Unit test for print_progress. """
+    output = io.StringIO()
+    kv_export.print_progress(kv_export.ExportProgress(1000, 3 * 1024 * 1024, b'\x01', 2.0), output)
+    assert output.getvalue() == 'EXPORT pairs: 1000 size: 3.0 MiB last_key: 01 elapsed: 2.0s rate: 500 pairs/s 1.5 MiB/s\n'
+    assert kv_export.throughput(kv_export.ExportProgress(0, 0, b'', 0.0)) == (0.0, 0.0)
+    assert kv_export.format_size(2 * 1024 ** 4) == '2.0 TiB'
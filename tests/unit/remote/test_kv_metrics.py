@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""The unit test for remote metrics module."""
+
+import grpc
+import pytest
+import pytest_mock
+
+from silksnake.remote import kv_metrics
+from silksnake.remote.proto import kv_pb2
+
+# pylint: disable=no-self-use
+
+class MockSeekCall:
+    """ Seek call mock answering each request with the given responses, then failing if error is given. """
+    def __init__(self, request_iterator, responses: list, error: grpc.RpcError = None):
+        self.request_iterator = request_iterator
+        self.responses = list(responses)
+        self.error = error
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        next(self.request_iterator, None)
+        if not self.responses:
+            if self.error:
+                raise self.error
+            raise StopIteration
+        return self.responses.pop(0)
+
+    def cancel(self):
+        """ cancel """
+        self.cancelled = True
+
+class MockFailedError(grpc.RpcError):
+    """ RPC error mock having UNAVAILABLE status code. """
+    def code(self):
+        """ code """
+        return grpc.StatusCode.UNAVAILABLE
+
+class TestHistogram:
+    """ Unit test for Histogram. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            kv_metrics.Histogram(())
+        with pytest.raises(ValueError):
+            kv_metrics.Histogram((0.2, 0.1))
+        assert kv_metrics.Histogram().bounds == kv_metrics.DEFAULT_LATENCY_BUCKETS
+
+    def test_observe(self):
+        """ Unit test for observe and snapshot. """
+        histogram = kv_metrics.Histogram((0.1, 1.0))
+        for value in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(value)
+        assert histogram.snapshot() == {'count': 4, 'sum': 2.65, 'buckets': {'0.1': 2, '1.0': 3, '+Inf': 4}}
+
+class TestMetricsCollector:
+    """ Unit test for MetricsCollector. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            kv_metrics.MetricsCollector(())
+        with pytest.raises(ValueError):
+            kv_metrics.MetricsCollector((1.0, 0.5))
+        assert kv_metrics.MetricsCollector([0.1, 1.0]).bounds == (0.1, 1.0)
+
+    def test_snapshot(self):
+        """ Unit test for the hooks and snapshot. """
+        collector = kv_metrics.MetricsCollector((0.1,))
+        collector.on_request('T', 10)
+        collector.on_response('T', 20, False)
+        collector.on_response('T', 2, True)
+        collector.on_seek_latency('T', 0.05)
+        collector.on_first_pair_latency('U', 0.5)
+        collector.on_error('U', grpc.StatusCode.UNAVAILABLE)
+        snapshot = collector.snapshot()
+        assert list(snapshot) == ['T', 'U']
+        assert snapshot['T']['seeks'] == 1
+        assert snapshot['T']['pairs'] == 1
+        assert snapshot['T']['bytes_out'] == 10
+        assert snapshot['T']['bytes_in'] == 22
+        assert snapshot['T']['seek_latency'] == {'count': 1, 'sum': 0.05, 'buckets': {'0.1': 1, '+Inf': 1}}
+        assert snapshot['U']['errors'] == 1
+        assert snapshot['U']['first_pair_latency']['buckets'] == {'0.1': 0, '+Inf': 1}
+        collector.reset()
+        assert collector.snapshot() == {}
+
+    def test_prometheus(self):
+        """ Unit test for prometheus. """
+        collector = kv_metrics.MetricsCollector((0.1,))
+        assert 'silksnake_kv_seeks_total{' not in collector.prometheus()
+        collector.on_request('T', 10)
+        collector.on_seek_latency('T', 0.05)
+        lines = collector.prometheus().splitlines()
+        assert '# TYPE silksnake_kv_seeks_total counter' in lines
+        assert 'silksnake_kv_seeks_total{bucket="T"} 1' in lines
+        assert 'silksnake_kv_bytes_out_total{bucket="T"} 10' in lines
+        assert '# TYPE silksnake_kv_seek_latency_seconds histogram' in lines
+        assert 'silksnake_kv_seek_latency_seconds_bucket{bucket="T",le="0.1"} 1' in lines
+        assert 'silksnake_kv_seek_latency_seconds_bucket{bucket="T",le="+Inf"} 1' in lines
+        assert 'silksnake_kv_seek_latency_seconds_sum{bucket="T"} 0.05' in lines
+        assert 'silksnake_kv_seek_latency_seconds_count{bucket="T"} 1' in lines
+        assert 'silksnake_kv_first_pair_latency_seconds_count{bucket="T"} 0' in lines
+
+class TestInstrumentedKVStub:
+    """ Unit test for InstrumentedKVStub. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            kv_metrics.InstrumentedKVStub(None, kv_metrics.Instrumentation())
+        with pytest.raises(ValueError):
+            kv_metrics.InstrumentedKVStub(pytest_mock.mock.Mock(), None)
+
+    def test_instrument(self):
+        """ Unit test for instrument. """
+        kv_stub = pytest_mock.mock.Mock()
+        instrumentation = kv_metrics.Instrumentation()
+        instrumented_stub = kv_metrics.instrument(kv_stub, instrumentation)
+        assert instrumented_stub.kv_stub is kv_stub
+        assert kv_metrics.instrument(instrumented_stub, kv_metrics.Instrumentation()).kv_stub is kv_stub
+        assert kv_metrics.instrument(instrumented_stub, None) is kv_stub
+        assert kv_metrics.instrument(kv_stub, None) is kv_stub
+
+    @pytest.mark.parametrize("streaming,expected_seek_latencies,expected_first_pair_latencies", [
+        (False, 2, 0),
+        (True, 0, 1),
+    ])
+    def test_seek(self, streaming: bool, expected_seek_latencies: int, expected_first_pair_latencies: int):
+        """ Unit test for Seek reporting requests, responses and latencies. """
+        responses = [kv_pb2.Pair(key=b'\x01', value=b'\x0a'), kv_pb2.Pair(key=b'', value=b'')]
+        kv_stub = pytest_mock.mock.Mock()
+        kv_stub.Seek = lambda request_iterator, **kwargs: MockSeekCall(request_iterator, responses)
+        collector = kv_metrics.MetricsCollector()
+        requests = [kv_pb2.SeekRequest(bucketName='T', seekKey=b'\x01', startSreaming=streaming)]
+        if not streaming:
+            requests.append(kv_pb2.SeekRequest(bucketName='T', seekKey=b'\x02'))
+        call = kv_metrics.InstrumentedKVStub(kv_stub, collector).Seek(iter(requests), timeout=1.0)
+        assert list(call) == responses
+        call.cancel()
+        assert call.cancelled
+        metrics = collector.snapshot()['T']
+        assert metrics['seeks'] == len(requests)
+        assert metrics['pairs'] == 1
+        assert metrics['bytes_out'] == sum(request.ByteSize() for request in requests)
+        assert metrics['bytes_in'] == sum(response.ByteSize() for response in responses)
+        assert metrics['seek_latency']['count'] == expected_seek_latencies
+        assert metrics['first_pair_latency']['count'] == expected_first_pair_latencies
+
+    def test_seek_keys_error(self):
+        """ Unit test for SeekKeys reporting failed calls. """
+        kv_stub = pytest_mock.mock.Mock()
+        kv_stub.SeekKeys = lambda request_iterator, **kwargs: MockSeekCall(request_iterator, [], MockFailedError())
+        collector = kv_metrics.MetricsCollector()
+        call = kv_metrics.InstrumentedKVStub(kv_stub, collector).SeekKeys(iter([kv_pb2.SeekRequest(bucketName='T')]))
+        with pytest.raises(grpc.RpcError):
+            next(call)
+        assert collector.snapshot()['T']['errors'] == 1
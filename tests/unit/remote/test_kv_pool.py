@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""The unit test for remote channel pool module."""
+
+import threading
+
+import pytest
+import pytest_mock
+
+from silksnake.remote import kv_pool
+from silksnake.remote.kv_remote import DEFAULT_TARGET, RemoteKV, SecurityOptions
+
+# pylint: disable=no-self-use,protected-access
+
+class TestChannelPool:
+    """ Unit test for ChannelPool. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            kv_pool.ChannelPool(None)
+        with pytest.raises(ValueError):
+            kv_pool.ChannelPool(-1)
+        pool = kv_pool.ChannelPool()
+        assert pool.max_idle_time == kv_pool.DEFAULT_MAX_IDLE_TIME
+        assert len(pool) == 0
+
+    def test_acquire(self):
+        """ Unit test for acquire and release. """
+        pool = kv_pool.ChannelPool()
+        with pytest.raises(ValueError):
+            pool.acquire(None)
+        remote_kv1 = pool.acquire()
+        remote_kv2 = pool.acquire(DEFAULT_TARGET)
+        remote_kv3 = pool.acquire('localhost:9091')
+        assert isinstance(remote_kv1, RemoteKV)
+        assert remote_kv1.channel is remote_kv2.channel
+        assert remote_kv1.channel is not remote_kv3.channel
+        assert len(pool) == 2
+        entry = pool.entries[remote_kv1.pool_key]
+        assert entry.users == 2
+        remote_kv1.close()
+        remote_kv1.close()
+        assert entry.users == 1
+        remote_kv2.close()
+        assert entry.users == 0
+        assert len(pool) == 2
+        pool.shutdown()
+
+    def test_acquire_options(self):
+        """ Unit test for acquire keyed by security options. """
+        pool = kv_pool.ChannelPool()
+        remote_kv1 = pool.acquire(DEFAULT_TARGET, SecurityOptions())
+        remote_kv2 = pool.acquire(DEFAULT_TARGET, SecurityOptions(None, 'client.pem', 'client.key'))
+        assert remote_kv1.pool_key != remote_kv2.pool_key
+        assert len(pool) == 2
+        pool.shutdown()
+
+    def test_release_closes_views(self):
+        """ Unit test for release closing the persistent views but not the channel. """
+        pool = kv_pool.ChannelPool()
+        remote_kv = pool.acquire()
+        remote_kv.persistent_streams = True
+        view = remote_kv.view()
+        view.close = pytest_mock.mock.Mock()
+        remote_kv.channel.close = pytest_mock.mock.Mock()
+        remote_kv.close()
+        view.close.assert_called_once()
+        remote_kv.channel.close.assert_not_called()
+        pool.shutdown()
+
+    def test_evict_idle(self):
+        """ Unit test for evict_idle. """
+        pool = kv_pool.ChannelPool(0)
+        remote_kv = pool.acquire()
+        channel = remote_kv.channel
+        channel.close = pytest_mock.mock.Mock()
+        assert pool.evict_idle() == 0
+        remote_kv.close()
+        assert len(pool) == 0
+        channel.close.assert_called_once()
+        assert pool.acquire().channel is not channel
+        pool.shutdown()
+
+    def test_shutdown(self):
+        """ Unit test for shutdown. """
+        pool = kv_pool.ChannelPool()
+        remote_kv = pool.acquire()
+        remote_kv.channel.close = pytest_mock.mock.Mock()
+        pool.shutdown()
+        remote_kv.channel.close.assert_called_once()
+        assert len(pool) == 0
+        remote_kv.close()
+        with pytest.raises(ValueError):
+            pool.acquire()
+
+    def test_acquire_concurrent(self):
+        """ Unit test for acquire from many threads sharing one channel. """
+        pool = kv_pool.ChannelPool()
+        remote_kvs = []
+        threads = [threading.Thread(target=lambda: remote_kvs.append(pool.acquire())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(remote_kv.channel) for remote_kv in remote_kvs}) == 1
+        assert pool.entries[remote_kvs[0].pool_key].users == 8
+        pool.shutdown()
+
+def test_default_pool():
+    """ Unit test for default_pool and shutdown. """
+    pool = kv_pool.default_pool()
+    assert kv_pool.default_pool() is pool
+    kv_pool.shutdown()
+    assert pool.closed
+    assert kv_pool.default_pool() is not pool
+    kv_pool.shutdown()
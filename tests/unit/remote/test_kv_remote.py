@@ -1,15 +1,106 @@
 # -*- coding: utf-8 -*-
 """The unit test for remote module."""
 
+import threading
+
 import grpc
 
 import pytest
 import pytest_mock
 
+from silksnake.remote import kv_metrics, kv_server
 from silksnake.remote.proto import kv_pb2
-from silksnake.remote.kv_remote import RemoteClient, RemoteCursor, RemoteKV, RemoteView, SecurityOptions, DEFAULT_PREFIX, DEFAULT_TARGET
-
-# pylint: disable=no-self-use,redefined-outer-name,unused-argument,protected-access
+from silksnake.remote.kv_remote import RemoteClient, RemoteCursor, RemoteKV, RemoteView, SecurityOptions, SeekStream
+from silksnake.remote.kv_remote import DEFAULT_MAX_STREAM_AGE, DEFAULT_PREFIX, DEFAULT_TARGET
+
+# pylint: disable=no-self-use,redefined-outer-name,unused-argument,protected-access,too-many-public-methods
+
+class MockSeekCall:
+    """ Bidirectional Seek call mock answering each request with the pair having its seek key (empty pair if none). """
+    def __init__(self, request_iterator, pairs: dict):
+        self.request_iterator = request_iterator
+        self.pairs = pairs
+        self.requests = []
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        request = next(self.request_iterator)
+        self.requests.append(request)
+        key = request.seekKey if request.seekKey in self.pairs else b''
+        return kv_pb2.Pair(key=key, value=self.pairs.get(key, b''))
+
+    def cancel(self):
+        """ cancel """
+        self.cancelled = True
+
+class MockStreamingKVStub:
+    """ KV stub mock recording each Seek call. """
+    def __init__(self, pairs: dict):
+        self.pairs = pairs
+        self.calls = []
+        self.timeouts = []
+
+    def Seek(self, request_iterator, **kwargs): # pylint: disable=invalid-name
+        """ Seek """
+        call = MockSeekCall(request_iterator, self.pairs)
+        self.calls.append(call)
+        self.timeouts.append(kwargs.get('timeout'))
+        return call
+
+class MockServicerCall:
+    """ Seek call mock streaming the responses of the reference servicer until cancelled. """
+    def __init__(self, responses):
+        self.responses = responses
+        self.received = 0
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.cancelled:
+            raise StopIteration
+        response = next(self.responses)
+        self.received += 1
+        return response
+
+    def cancel(self):
+        """ cancel """
+        self.cancelled = True
+        self.responses.close()
+
+class MockServicerKVStub:
+    """ KV stub mock backed by the reference servicer on the given bucket pairs. """
+    def __init__(self, bucket_name: str, pairs: dict):
+        store = kv_server.MemoryStore()
+        for key, value in pairs.items():
+            store.put(bucket_name, key, value)
+        self.servicer = kv_server.KVServicer(store)
+        self.calls = []
+
+    def Seek(self, request_iterator, **kwargs): # pylint: disable=invalid-name
+        """ Seek """
+        call = MockServicerCall(self.servicer.Seek(request_iterator, None))
+        self.calls.append(call)
+        return call
+
+    def SeekKeys(self, request_iterator, **kwargs): # pylint: disable=invalid-name
+        """ SeekKeys """
+        call = MockServicerCall(self.servicer.SeekKeys(request_iterator, None))
+        self.calls.append(call)
+        return call
+
+class MockUnimplementedError(grpc.RpcError):
+    """ RPC error mock having UNIMPLEMENTED status code. """
+    def code(self): # pylint: disable=no-self-use
+        """ code """
+        return grpc.StatusCode.UNIMPLEMENTED
+
+RANGE_PAIRS = {bytes([i // 16, i % 16]): bytes([i]) for i in range(1, 48)}
+RANGE_KEYS = sorted(RANGE_PAIRS)
 
 @pytest.fixture(scope='module')
 def basic_cursor():
@@ -22,7 +113,7 @@ def cursor(mocker: pytest_mock.MockerFixture, key_out: str, value: str):
     key_out_bytes = bytes.fromhex(key_out) if key_out is not None else None
     value_bytes = bytes.fromhex(value) if value is not None else None
     mock_kvstub = mocker.Mock()
-    type(mock_kvstub).Seek = lambda k, p: iter([kv_pb2.Pair(key=key_out_bytes, value=value_bytes)])
+    type(mock_kvstub).Seek = lambda k, p, **kwargs: iter([kv_pb2.Pair(key=key_out_bytes, value=value_bytes)])
     return RemoteCursor(mock_kvstub, 'T')
 
 @pytest.fixture
@@ -34,6 +125,35 @@ def file_open(mocker: pytest_mock.MockerFixture, should_pass: bool):
         mock_file_open.side_effect = FileNotFoundError
     return mock_file_open
 
+class TestSeekStream:
+    """ Unit test for SeekStream. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            SeekStream(None)
+
+    def test_seek(self):
+        """ Unit test for seek. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a', b'\x02': b'\x0b'})
+        stream = SeekStream(kv_stub)
+        assert stream.seek(kv_pb2.SeekRequest(bucketName='T', seekKey=b'\x01')) == kv_pb2.Pair(key=b'\x01', value=b'\x0a')
+        assert stream.seek(kv_pb2.SeekRequest(bucketName='T', seekKey=b'\x02')) == kv_pb2.Pair(key=b'\x02', value=b'\x0b')
+        assert len(kv_stub.calls) == 1
+        assert len(kv_stub.calls[0].requests) == 2
+
+    def test_close(self):
+        """ Unit test for close. """
+        kv_stub = MockStreamingKVStub({})
+        stream = SeekStream(kv_stub)
+        stream.close()
+        stream.close()
+        assert stream.closed
+        assert kv_stub.calls[0].cancelled
+        with pytest.raises(StopIteration):
+            next(kv_stub.calls[0])
+        with pytest.raises(ValueError):
+            stream.seek(kv_pb2.SeekRequest(bucketName='T', seekKey=b'\x01'))
+
 class TestRemoteCursor:
     """ Unit test for RemoteCursor. """
     def test_init(self):
@@ -85,6 +205,165 @@ class TestRemoteCursor:
             with pytest.raises(ValueError):
                 basic_cursor.enable_streaming(streaming)
 
+    @pytest.mark.parametrize("persistent,should_pass", [
+        # Valid test list
+        (True, True),
+        (False, True),
+
+        # Invalid test list
+        (None, False),
+    ])
+    def test_enable_persistent_stream(self, basic_cursor, persistent: bool, should_pass: bool):
+        """ Unit test for enable_persistent_stream. """
+        if should_pass:
+            assert basic_cursor.enable_persistent_stream(persistent).persistent == persistent
+        else:
+            with pytest.raises(ValueError):
+                basic_cursor.enable_persistent_stream(persistent)
+
+    @pytest.mark.parametrize("timeout,should_pass", [
+        # Valid test list
+        (None, True),
+        (0.5, True),
+
+        # Invalid test list
+        (0, False),
+        (-1, False),
+    ])
+    def test_with_timeout(self, basic_cursor, timeout: float, should_pass: bool):
+        """ Unit test for with_timeout. """
+        if should_pass:
+            assert basic_cursor.with_timeout(timeout).timeout == timeout
+        else:
+            with pytest.raises(ValueError):
+                basic_cursor.with_timeout(timeout)
+
+    def test_timeout(self):
+        """ Unit test for deadline on each Seek call except the persistent stream. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a'})
+        cursor = RemoteCursor(kv_stub, 'T').with_timeout(2.5)
+        cursor.seek(b'\x01')
+        cursor.seek_many([b'\x01'])
+        next(cursor.next())
+        list(cursor.range(limit=1))
+        assert kv_stub.timeouts == [2.5] * 4
+        cursor.enable_persistent_stream(True).seek(b'\x01')
+        assert kv_stub.timeouts == [2.5] * 4 + [None]
+
+    def test_close(self):
+        """ Unit test for close cancelling the streams opened by next. """
+        kv_stub = MockServicerKVStub('T', RANGE_PAIRS)
+        cursor = RemoteCursor(kv_stub, 'T').enable_streaming(True)
+        pairs = cursor.next()
+        next(pairs)
+        cursor.close()
+        assert kv_stub.calls[0].cancelled
+        assert not cursor.streams
+        with pytest.raises(StopIteration):
+            next(pairs)
+
+    def test_next_streams(self):
+        """ Unit test for next tracking its stream only while live. """
+        kv_stub = MockServicerKVStub('T', RANGE_PAIRS)
+        cursor = RemoteCursor(kv_stub, 'T').enable_streaming(True)
+        assert list(cursor.next())
+        assert not cursor.streams
+        pairs = cursor.next(RANGE_KEYS[1])
+        assert next(pairs).key == RANGE_KEYS[1]
+        assert cursor.streams == [kv_stub.calls[1]]
+        pairs.close()
+        assert kv_stub.calls[1].cancelled
+        assert not cursor.streams
+        assert len(kv_stub.calls) == 2
+
+    @pytest.mark.parametrize("keys,expected_pairs,expected_calls", [
+        # Valid test list
+        ([], [], 0),
+        ([b'\x01'], [(b'\x01', b'\x0a')], 1),
+        ([b'\x01', b'\x02', b'\x01'], [(b'\x01', b'\x0a'), (b'\x02', b'\x0b'), (b'\x01', b'\x0a')], 1),
+        ([b'\x01', b'\x03', b'\x02'], [(b'\x01', b'\x0a'), (b'', b''), (b'\x02', b'\x0b')], 2),
+        ([b'\x01', b'', b'\x02'], [(b'\x01', b'\x0a'), (b'', b''), (b'\x02', b'\x0b')], 3),
+    ])
+    def test_seek_many(self, keys: list, expected_pairs: list, expected_calls: int):
+        """ Unit test for seek_many. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a', b'\x02': b'\x0b'})
+        cursor = RemoteCursor(kv_stub, 'T')
+        assert cursor.seek_many(keys) == expected_pairs
+        assert len(kv_stub.calls) == expected_calls
+        assert all(call.cancelled for call in kv_stub.calls)
+
+    def test_seek_many_error(self):
+        """ Unit test for seek_many cancelling its call on error. """
+        kv_stub = MockStreamingKVStub({})
+        request_iterator = pytest_mock.mock.MagicMock()
+        request_iterator.__next__.side_effect = grpc.RpcError()
+        failing_call = MockSeekCall(request_iterator, {})
+        kv_stub.Seek = lambda request_iterator, **kwargs: failing_call # pylint: disable=invalid-name
+        with pytest.raises(grpc.RpcError):
+            RemoteCursor(kv_stub, 'T').seek_many([b'\x01', b'\x02'])
+        assert failing_call.cancelled
+
+    def test_seek_many_invalid(self, basic_cursor):
+        """ Unit test for seek_many with invalid keys. """
+        with pytest.raises(ValueError):
+            basic_cursor.seek_many(None)
+        with pytest.raises(ValueError):
+            basic_cursor.seek_many([b'\x01', None])
+
+    def test_seek_persistent(self):
+        """ Unit test for seek using persistent stream. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a', b'\x02': b'\x0b'})
+        cursor = RemoteCursor(kv_stub, 'T').enable_persistent_stream(True)
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert cursor.seek(b'\x02') == (b'\x02', b'\x0b')
+        assert cursor.seek_exact(b'\x01') == b'\x0a'
+        assert len(kv_stub.calls) == 1
+        assert [request.seekKey for request in kv_stub.calls[0].requests] == [b'\x01', b'\x02', b'\x01']
+
+    def test_seek_persistent_reopen(self):
+        """ Unit test for seek using persistent stream reopened after stream end or empty seek key. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a'})
+        cursor = RemoteCursor(kv_stub, 'T').enable_persistent_stream(True)
+        assert cursor.seek(b'\x03') == (b'', b'')
+        assert cursor.seek_stream is None
+        assert kv_stub.calls[0].cancelled
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert cursor.seek(b'') == (b'', b'')
+        assert len(kv_stub.calls) == 3
+
+    def test_seek_persistent_max_age(self, mocker: pytest_mock.MockerFixture):
+        """ Unit test for seek using persistent stream reopened after max age. """
+        mock_monotonic = mocker.patch('time.monotonic')
+        mock_monotonic.return_value = 100.0
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a'})
+        cursor = RemoteCursor(kv_stub, 'T').enable_persistent_stream(True).with_max_stream_age(5.0)
+        cursor.seek(b'\x01')
+        mock_monotonic.return_value = 104.0
+        cursor.seek(b'\x01')
+        assert len(kv_stub.calls) == 1
+        mock_monotonic.return_value = 105.0
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert kv_stub.calls[0].cancelled
+        assert len(kv_stub.calls) == 2
+        mock_monotonic.return_value = 1000.0
+        cursor.with_max_stream_age(None).seek(b'\x01')
+        assert len(kv_stub.calls) == 2
+        with pytest.raises(ValueError):
+            cursor.with_max_stream_age(0)
+
+    def test_seek_persistent_prefix_change(self):
+        """ Unit test for seek using persistent stream after prefix change. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a'})
+        cursor = RemoteCursor(kv_stub, 'T').enable_persistent_stream(True)
+        cursor.seek(b'\x01')
+        cursor.with_prefix(b'\x01')
+        assert kv_stub.calls[0].cancelled
+        cursor.seek(b'\x01')
+        assert len(kv_stub.calls) == 2
+        assert kv_stub.calls[1].requests[0].prefix == b'\x01'
+        cursor.enable_persistent_stream(False)
+        assert kv_stub.calls[1].cancelled
+
     @pytest.mark.parametrize("key_in,key_out,value,should_pass", [
         # Valid test list
         ('', '', '', True),
@@ -145,25 +424,135 @@ class TestRemoteCursor:
 
         mock_kvstub = pytest_mock.mock.Mock()
         pair_iterator = iter([kv_pb2.Pair(key=key_out_bytes, value=value_bytes)])
-        type(mock_kvstub).Seek = lambda k, p: pair_iterator
+        type(mock_kvstub).Seek = lambda k, p, **kwargs: pair_iterator
         cursor = RemoteCursor(mock_kvstub, 'T').with_prefix(prefix_bytes)
 
         if should_pass:
-            assert cursor.next() == pair_iterator
+            assert list(cursor.next()) == [kv_pb2.Pair(key=key_out_bytes, value=value_bytes)]
+            assert not cursor.streams
             with pytest.raises(StopIteration):
                 next(cursor.next())
-                next(cursor.next())
         else:
             with pytest.raises(ValueError):
                 cursor.next()
 
+    @pytest.mark.parametrize("prefix,start_key,end_key,limit,reverse,expected_keys,expected_received", [
+        (b'', None, None, None, False, RANGE_KEYS, 48),
+        (b'', b'\x01\x0e', b'\x02\x02', None, False, RANGE_KEYS[29:33], 5),
+        (b'', b'\x01\x0e', None, 3, False, RANGE_KEYS[29:32], 3),
+        (b'', b'\x01\x0e', b'\x01\x0f', 3, False, RANGE_KEYS[29:30], 2),
+        (b'', None, None, 0, False, [], 0),
+        (b'\x01', None, None, None, False, RANGE_KEYS[15:31], 17),
+        (b'\x01', b'\x00', None, 2, False, RANGE_KEYS[15:17], 2),
+        (b'\x01', b'\x01\x0a', b'\x02', None, False, RANGE_KEYS[25:31], 7),
+        (b'', b'\x01\x0e', b'\x02\x02', None, True, RANGE_KEYS[32:28:-1], 5),
+        (b'', None, b'\x02\x02', 2, True, RANGE_KEYS[32:30:-1], 34),
+        (b'', b'\x03', b'\x04', None, True, [], 1),
+    ])
+    def test_range(self, prefix: bytes, start_key: bytes, end_key: bytes, limit: int, reverse: bool, expected_keys: list,
+                   expected_received: int):
+        """ Unit test for range. """
+        kv_stub = MockServicerKVStub('T', RANGE_PAIRS)
+        cursor = RemoteCursor(kv_stub, 'T').with_prefix(prefix)
+        pairs = list(cursor.range(start_key, end_key, limit, reverse))
+        assert pairs == [(key, RANGE_PAIRS[key]) for key in expected_keys]
+        assert sum(call.received for call in kv_stub.calls) == expected_received
+        assert all(call.cancelled for call in kv_stub.calls)
+
+    def test_range_early_exit(self):
+        """ Unit test for range cancelling the stream when the caller stops. """
+        kv_stub = MockServicerKVStub('T', RANGE_PAIRS)
+        pairs = RemoteCursor(kv_stub, 'T').range()
+        assert next(pairs) == (RANGE_KEYS[0], RANGE_PAIRS[RANGE_KEYS[0]])
+        pairs.close()
+        assert kv_stub.calls[0].cancelled
+        assert kv_stub.calls[0].received == 1
+
+    @pytest.mark.parametrize("prefix,start_key,end_key,limit,expected_keys", [
+        (b'', None, None, None, RANGE_KEYS),
+        (b'\x01', b'\x01\x0e', None, None, RANGE_KEYS[29:31]),
+        (b'', None, b'\x00\x05', None, RANGE_KEYS[:4]),
+        (b'', None, None, 2, RANGE_KEYS[:2]),
+        (b'', None, None, 0, []),
+    ])
+    def test_key_sizes(self, prefix: bytes, start_key: bytes, end_key: bytes, limit: int, expected_keys: list):
+        """ Unit test for key_sizes and keys. """
+        kv_stub = MockServicerKVStub('T', RANGE_PAIRS)
+        cursor = RemoteCursor(kv_stub, 'T').with_prefix(prefix)
+        assert list(cursor.key_sizes(start_key, end_key, limit)) == [(key, 1) for key in expected_keys]
+        assert list(cursor.keys(start_key, end_key, limit)) == expected_keys
+        assert all(call.cancelled for call in kv_stub.calls)
+        with pytest.raises(ValueError):
+            cursor.keys(limit=-1)
+
+    def test_key_sizes_unimplemented(self):
+        """ Unit test for key_sizes falling back to Seek when SeekKeys is not implemented. """
+        kv_stub = MockServicerKVStub('T', RANGE_PAIRS)
+        unimplemented_call = MockServicerCall(iter([]))
+        unimplemented_call.responses = pytest_mock.mock.MagicMock()
+        unimplemented_call.responses.__next__.side_effect = MockUnimplementedError()
+        kv_stub.SeekKeys = lambda request_iterator, **kwargs: unimplemented_call # pylint: disable=invalid-name
+        cursor = RemoteCursor(kv_stub, 'T')
+        assert list(cursor.key_sizes(limit=3)) == [(key, 1) for key in RANGE_KEYS[:3]]
+        assert unimplemented_call.cancelled
+        failing_call = MockServicerCall(iter([]))
+        failing_call.responses = pytest_mock.mock.MagicMock()
+        failing_call.responses.__next__.side_effect = grpc.RpcError()
+        failing_call.responses.__next__.side_effect.code = lambda: grpc.StatusCode.UNAVAILABLE
+        kv_stub.SeekKeys = lambda request_iterator, **kwargs: failing_call
+        with pytest.raises(grpc.RpcError):
+            list(cursor.key_sizes())
+
+    def test_with_instrumentation(self):
+        """ Unit test for with_instrumentation reporting seeks, streams and key scans. """
+        kv_stub = MockServicerKVStub('T', RANGE_PAIRS)
+        collector = kv_metrics.MetricsCollector()
+        cursor = RemoteCursor(kv_stub, 'T').with_instrumentation(collector)
+        assert isinstance(cursor.kv_stub, kv_metrics.InstrumentedKVStub)
+        assert cursor.seek(RANGE_KEYS[0]) == (RANGE_KEYS[0], RANGE_PAIRS[RANGE_KEYS[0]])
+        assert len(cursor.seek_many(RANGE_KEYS[:3])) == 3
+        assert len(list(cursor.range(limit=5))) == 5
+        assert len(list(cursor.keys(limit=2))) == 2
+        metrics = collector.snapshot()['T']
+        assert metrics['seeks'] == 6
+        assert metrics['pairs'] == 4 + 5 + 2
+        assert metrics['errors'] == 0
+        assert metrics['bytes_in'] > 0 and metrics['bytes_out'] > 0
+        assert metrics['seek_latency']['count'] == 4
+        assert metrics['first_pair_latency']['count'] == 2
+        assert all(call.cancelled for call in kv_stub.calls[-2:])
+        assert cursor.with_instrumentation(None).kv_stub is kv_stub
+
+    def test_with_instrumentation_persistent(self):
+        """ Unit test for with_instrumentation on the persistent stream. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a'})
+        collector = kv_metrics.MetricsCollector()
+        cursor = RemoteCursor(kv_stub, 'T').enable_persistent_stream(True).with_instrumentation(collector)
+        assert cursor.seek(b'\x01') == (b'\x01', b'\x0a')
+        assert cursor.seek(b'\x02') == (b'', b'')
+        metrics = collector.snapshot()['T']
+        assert (metrics['seeks'], metrics['pairs'], metrics['seek_latency']['count']) == (2, 1, 2)
+        assert len(kv_stub.calls) == 1
+        cursor.close()
+        assert kv_stub.calls[0].cancelled
+
+    def test_range_invalid(self):
+        """ Unit test for range with invalid arguments. """
+        cursor = RemoteCursor(MockServicerKVStub('T', RANGE_PAIRS), 'T')
+        with pytest.raises(ValueError):
+            cursor.range(limit=-1)
+        with pytest.raises(ValueError):
+            cursor.range(reverse=None)
+        with pytest.raises(ValueError):
+            cursor.range(reverse=True)
+
 @pytest.fixture
 def basic_view(mocker: pytest_mock.MockerFixture, key_out: str, value: str):
     """ basic_view """
     key_out_bytes = bytes.fromhex(key_out) if key_out is not None else None
     value_bytes = bytes.fromhex(value) if value is not None else None
     mock_kvstub = mocker.Mock()
-    type(mock_kvstub).Seek = lambda k, p: iter([kv_pb2.Pair(key=key_out_bytes, value=value_bytes)])
+    type(mock_kvstub).Seek = lambda k, p, **kwargs: iter([kv_pb2.Pair(key=key_out_bytes, value=value_bytes)])
     return RemoteView(mock_kvstub)
 
 class TestRemoteView:
@@ -242,6 +631,59 @@ class TestRemoteView:
             with pytest.raises(ValueError):
                 basic_view.get_exact(bucket_name, key_in_bytes)
 
+    def test_get_many(self):
+        """ Unit test for get_many. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a', b'\x02': b'\x0b'})
+        view = RemoteView(kv_stub)
+        assert view.get_many('T', (key for key in [b'\x02', b'\x01'])) == [(b'\x02', b'\x0b'), (b'\x01', b'\x0a')]
+        assert len(kv_stub.calls) == 1
+        assert [request.bucketName for request in kv_stub.calls[0].requests] == ['T', 'T']
+
+    @pytest.mark.parametrize("persistent,should_pass", [
+        # Valid test list
+        (True, True),
+        (False, True),
+
+        # Invalid test list
+        (None, False),
+    ])
+    def test_enable_persistent_streams(self, persistent: bool, should_pass: bool):
+        """ Unit test for enable_persistent_streams. """
+        view = RemoteView(pytest_mock.mock.Mock())
+        if should_pass:
+            assert view.enable_persistent_streams(persistent).persistent == persistent
+        else:
+            with pytest.raises(ValueError):
+                view.enable_persistent_streams(persistent)
+
+    def test_with_instrumentation(self):
+        """ Unit test for with_instrumentation applied to the cursors of the view. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a'})
+        collector = kv_metrics.MetricsCollector()
+        view = RemoteView(kv_stub).enable_persistent_streams(True).with_instrumentation(collector)
+        assert view.cursor('T').instrumentation is None
+        assert isinstance(view.cursor('T').kv_stub, kv_metrics.InstrumentedKVStub)
+        assert view.get('T', b'\x01') == (b'\x01', b'\x0a')
+        assert view.get_many('U', [b'\x01', b'\x02']) == [(b'\x01', b'\x0a'), (b'', b'')]
+        assert collector.snapshot()['T']['seeks'] == 1
+        assert collector.snapshot()['U']['seeks'] == 2
+        view.with_instrumentation(None)
+        assert kv_stub.calls[0].cancelled
+        assert view.kv_stub is kv_stub
+
+    def test_get_persistent(self):
+        """ Unit test for get using persistent streams. """
+        kv_stub = MockStreamingKVStub({b'\x01': b'\x0a', b'\x02': b'\x0b'})
+        view = RemoteView(kv_stub).enable_persistent_streams(True)
+        assert view.get('T', b'\x01') == (b'\x01', b'\x0a')
+        assert view.get_exact('T', b'\x02') == b'\x0b'
+        assert view.get('U', b'\x01') == (b'\x01', b'\x0a')
+        assert len(kv_stub.calls) == 2
+        assert view.bucket_cursor('T') is view.bucket_cursor('T')
+        view.close()
+        assert all(call.cancelled for call in kv_stub.calls)
+        assert not view.bucket_cursors
+
 class TestSecurityOptions:
     """ Unit test for SecurityOptions. """
     @pytest.mark.parametrize("server_cert,client_cert,client_key,should_pass", [
@@ -284,6 +726,57 @@ class TestRemoteKV:
         with pytest.raises(ValueError):
             RemoteKV(mock_channel, None)
 
+    def test_view(self):
+        """ Unit test for view. """
+        remote_kv = RemoteKV(pytest_mock.mock.Mock(), pytest_mock.mock.Mock())
+        assert remote_kv.view() is not remote_kv.view()
+        assert not remote_kv.view().persistent
+
+    def test_view_timeout(self):
+        """ Unit test for view having the deadline of the KV. """
+        remote_kv = RemoteKV(pytest_mock.mock.Mock(), pytest_mock.mock.Mock(), timeout=3.0)
+        assert remote_kv.view().timeout == 3.0
+        assert remote_kv.view().cursor('T').timeout == 3.0
+        with pytest.raises(ValueError):
+            remote_kv.view().with_timeout(0)
+
+    def test_view_max_stream_age(self):
+        """ Unit test for view having the max stream age of the KV. """
+        remote_kv = RemoteKV(pytest_mock.mock.Mock(), pytest_mock.mock.Mock())
+        assert remote_kv.view().cursor('T').max_stream_age == DEFAULT_MAX_STREAM_AGE
+        remote_kv = RemoteKV(pytest_mock.mock.Mock(), MockStreamingKVStub({}), True, max_stream_age=3.0)
+        assert remote_kv.view().max_stream_age == 3.0
+        assert remote_kv.view().bucket_cursor('T').max_stream_age == 3.0
+        remote_kv.view().with_max_stream_age(None)
+        assert remote_kv.view().bucket_cursor('T').max_stream_age is None
+        with pytest.raises(ValueError):
+            remote_kv.view().with_max_stream_age(-1)
+
+    def test_view_instrumentation(self):
+        """ Unit test for view having the instrumentation of the KV. """
+        collector = kv_metrics.MetricsCollector()
+        remote_kv = RemoteKV(pytest_mock.mock.Mock(), pytest_mock.mock.Mock(), instrumentation=collector)
+        assert remote_kv.view().instrumentation is collector
+        assert remote_kv.view().cursor('T').kv_stub.instrumentation is collector
+
+    def test_view_persistent(self):
+        """ Unit test for view using persistent streams. """
+        mock_channel = pytest_mock.mock.Mock()
+        remote_kv = RemoteKV(mock_channel, MockStreamingKVStub({b'\x01': b'\x0a'}), True)
+        view = remote_kv.view()
+        assert view.persistent
+        assert remote_kv.view() is view
+        other_views = []
+        thread = threading.Thread(target=lambda: other_views.append(remote_kv.view()))
+        thread.start()
+        thread.join()
+        assert other_views[0] is not view
+        view.get('T', b'\x01')
+        remote_kv.close()
+        assert not view.bucket_cursors
+        assert not remote_kv.persistent_views
+        mock_channel.close.assert_called_once()
+
 @pytest.fixture
 def basic_client():
     """ basic_client """
@@ -319,6 +812,64 @@ class TestRemoteClient:
             with pytest.raises(ValueError):
                 basic_client.with_target(target)
 
+    @pytest.mark.parametrize("persistent,should_pass", [
+        # Valid test list
+        (True, True),
+        (False, True),
+
+        # Invalid test list
+        (None, False),
+    ])
+    def test_enable_persistent_streams(self, basic_client, persistent: bool, should_pass: bool):
+        """ Unit test for enable_persistent_streams. """
+        if should_pass:
+            assert basic_client.enable_persistent_streams(persistent).persistent_streams == persistent
+            assert basic_client.open().persistent_streams == persistent
+        else:
+            with pytest.raises(ValueError):
+                basic_client.enable_persistent_streams(persistent)
+
+    @pytest.mark.parametrize("timeout,should_pass", [
+        # Valid test list
+        (None, True),
+        (1.0, True),
+
+        # Invalid test list
+        (0, False),
+    ])
+    def test_with_timeout(self, basic_client, timeout: float, should_pass: bool):
+        """ Unit test for with_timeout. """
+        if should_pass:
+            assert basic_client.with_timeout(timeout).timeout == timeout
+            assert basic_client.open().timeout == timeout
+        else:
+            with pytest.raises(ValueError):
+                basic_client.with_timeout(timeout)
+
+    @pytest.mark.parametrize("max_age,should_pass", [
+        # Valid test list
+        (None, True),
+        (30.0, True),
+
+        # Invalid test list
+        (0, False),
+    ])
+    def test_with_max_stream_age(self, basic_client, max_age: float, should_pass: bool):
+        """ Unit test for with_max_stream_age. """
+        if should_pass:
+            assert basic_client.with_max_stream_age(max_age).max_stream_age == max_age
+            assert basic_client.open().max_stream_age == max_age
+        else:
+            with pytest.raises(ValueError):
+                basic_client.with_max_stream_age(max_age)
+
+    def test_with_instrumentation(self, basic_client):
+        """ Unit test for with_instrumentation. """
+        collector = kv_metrics.MetricsCollector()
+        assert basic_client.with_instrumentation(collector).instrumentation is collector
+        assert basic_client.open().instrumentation is collector
+        basic_client.with_instrumentation(None)
+
     def test_open_insecure(self, basic_client):
         """ Unit test for open. """
         remote_kv = basic_client.open()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""The unit test for remote asyncio module."""
+
+import asyncio
+
+import grpc
+import grpc.aio
+import pytest
+import pytest_mock
+
+from silksnake.remote.proto import kv_pb2
+from silksnake.remote.kv_remote import DEFAULT_PREFIX, DEFAULT_TARGET, SecurityOptions
+from silksnake.remote.kv_remote_async import AsyncRemoteClient, AsyncRemoteCursor, AsyncRemoteKV, AsyncRemoteView
+
+# pylint: disable=no-self-use,redefined-outer-name,unused-argument
+
+class MockAsyncSeekCall:
+    """ Asynchronous bidirectional Seek call mock answering each request with the pair having its seek key. """
+    def __init__(self, request_iterator, pairs: dict, streaming_pairs: list):
+        self.request_iterator = request_iterator
+        self.pairs = pairs
+        self.streaming_pairs = list(streaming_pairs)
+        self.requests = []
+        self.cancelled = False
+
+    async def read(self):
+        """ read """
+        request = next(self.request_iterator, None)
+        if request is None:
+            return grpc.aio.EOF
+        self.requests.append(request)
+        key = request.seekKey if request.seekKey in self.pairs else b''
+        return kv_pb2.Pair(key=key, value=self.pairs.get(key, b''))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.streaming_pairs:
+            raise StopAsyncIteration
+        key, value = self.streaming_pairs.pop(0)
+        return kv_pb2.Pair(key=key, value=value)
+
+    def cancel(self):
+        """ cancel """
+        self.cancelled = True
+
+class MockAsyncKVStub:
+    """ Asynchronous KV stub mock recording each Seek call. """
+    def __init__(self, pairs: dict, streaming_pairs: list = ()):
+        self.pairs = pairs
+        self.streaming_pairs = streaming_pairs
+        self.calls = []
+        self.timeouts = []
+
+    def Seek(self, request_iterator, **kwargs): # pylint: disable=invalid-name
+        """ Seek """
+        call = MockAsyncSeekCall(request_iterator, self.pairs, self.streaming_pairs)
+        self.calls.append(call)
+        self.timeouts.append(kwargs.get('timeout'))
+        return call
+
+PAIRS = {b'\x01': b'\x0a', b'\x02': b'\x0b'}
+
+class TestAsyncRemoteCursor:
+    """ Unit test for AsyncRemoteCursor. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            AsyncRemoteCursor(None, 'b')
+        with pytest.raises(ValueError):
+            AsyncRemoteCursor(pytest_mock.mock.Mock(), None)
+
+        cursor = AsyncRemoteCursor(pytest_mock.mock.Mock(), 'T')
+        assert cursor.bucket_name == 'T'
+        assert cursor.prefix == DEFAULT_PREFIX
+        assert cursor.streaming is False
+        assert cursor.with_prefix(b'\x01').prefix == b'\x01'
+        assert cursor.enable_streaming(True).streaming is True
+        with pytest.raises(ValueError):
+            cursor.with_prefix(None)
+        with pytest.raises(ValueError):
+            cursor.enable_streaming(None)
+
+    @pytest.mark.parametrize("key,expected_pair,expected_value", [
+        (b'\x01', (b'\x01', b'\x0a'), b'\x0a'),
+        (b'\x03', (b'', b''), None),
+    ])
+    def test_seek(self, key: bytes, expected_pair: tuple, expected_value: bytes):
+        """ Unit test for seek and seek_exact. """
+        cursor = AsyncRemoteCursor(MockAsyncKVStub(PAIRS), 'T')
+        assert asyncio.run(cursor.seek(key)) == expected_pair
+        assert asyncio.run(cursor.seek_exact(key)) == expected_value
+        with pytest.raises(ValueError):
+            asyncio.run(cursor.seek(None))
+
+    def test_timeout(self):
+        """ Unit test for with_timeout and deadline on each Seek call. """
+        with pytest.raises(ValueError):
+            AsyncRemoteCursor(pytest_mock.mock.Mock(), 'T').with_timeout(0)
+        kv_stub = MockAsyncKVStub(PAIRS)
+        view = AsyncRemoteKV(pytest_mock.mock.Mock(), kv_stub, 1.5).view()
+        asyncio.run(view.get('T', b'\x01'))
+        asyncio.run(view.get_many('T', [b'\x01']))
+        assert kv_stub.timeouts == [1.5, 1.5]
+        assert AsyncRemoteClient().with_timeout(2.0).timeout == 2.0
+        with pytest.raises(ValueError):
+            AsyncRemoteClient().with_timeout(-1)
+
+    def test_seek_eof(self):
+        """ Unit test for seek on stream closed by server. """
+        cursor = AsyncRemoteCursor(MockAsyncKVStub(PAIRS), 'T')
+        cursor.kv_stub.Seek = lambda request_iterator, **kwargs: MockAsyncSeekCall(iter([]), PAIRS, [])
+        assert asyncio.run(cursor.seek(b'\x01')) == (b'', b'')
+
+    @pytest.mark.parametrize("keys,expected_pairs,expected_calls", [
+        ([], [], 0),
+        ([b'\x02', b'\x01'], [(b'\x02', b'\x0b'), (b'\x01', b'\x0a')], 1),
+        ([b'\x01', b'\x03', b'\x02'], [(b'\x01', b'\x0a'), (b'', b''), (b'\x02', b'\x0b')], 2),
+        ([b'\x01', b'', b'\x02'], [(b'\x01', b'\x0a'), (b'', b''), (b'\x02', b'\x0b')], 3),
+    ])
+    def test_seek_many(self, keys: list, expected_pairs: list, expected_calls: int):
+        """ Unit test for seek_many. """
+        kv_stub = MockAsyncKVStub(PAIRS)
+        cursor = AsyncRemoteCursor(kv_stub, 'T')
+        assert asyncio.run(cursor.seek_many(keys)) == expected_pairs
+        assert len(kv_stub.calls) == expected_calls
+        with pytest.raises(ValueError):
+            asyncio.run(cursor.seek_many(None))
+
+    def test_next(self):
+        """ Unit test for next. """
+        kv_stub = MockAsyncKVStub(PAIRS, [(b'\x01', b'\x0a'), (b'\x02', b'\x0b')])
+        cursor = AsyncRemoteCursor(kv_stub, 'T').with_prefix(b'\x00').enable_streaming(True)
+
+        async def collect():
+            return [(pair.key, pair.value) async for pair in cursor.next()]
+
+        assert asyncio.run(collect()) == [(b'\x01', b'\x0a'), (b'\x02', b'\x0b')]
+        assert kv_stub.calls[0].cancelled
+
+class TestAsyncRemoteView:
+    """ Unit test for AsyncRemoteView. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            AsyncRemoteView(None)
+        mock_kv_stub = pytest_mock.mock.Mock()
+        view = AsyncRemoteView(mock_kv_stub)
+        assert view.kv_stub == mock_kv_stub
+        assert view.cursor('T').kv_stub == mock_kv_stub
+
+    def test_get(self):
+        """ Unit test for get, get_exact and get_many. """
+        view = AsyncRemoteView(MockAsyncKVStub(PAIRS))
+        assert asyncio.run(view.get('T', b'\x01')) == (b'\x01', b'\x0a')
+        assert asyncio.run(view.get_exact('T', b'\x03')) is None
+        assert asyncio.run(view.get_many('T', [b'\x01', b'\x02'])) == [(b'\x01', b'\x0a'), (b'\x02', b'\x0b')]
+
+class TestAsyncRemoteKV:
+    """ Unit test for AsyncRemoteKV. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            AsyncRemoteKV(None, pytest_mock.mock.Mock())
+        with pytest.raises(ValueError):
+            AsyncRemoteKV(pytest_mock.mock.Mock(), None)
+
+    def test_close(self):
+        """ Unit test for close. """
+        mock_channel = pytest_mock.mock.Mock()
+        mock_channel.close = pytest_mock.mock.AsyncMock()
+        remote_kv = AsyncRemoteKV(mock_channel, pytest_mock.mock.Mock())
+        assert isinstance(remote_kv.view(), AsyncRemoteView)
+        asyncio.run(remote_kv.close())
+        mock_channel.close.assert_awaited_once()
+
+class TestAsyncRemoteClient:
+    """ Unit test for AsyncRemoteClient. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            AsyncRemoteClient(None)
+        assert AsyncRemoteClient().target == DEFAULT_TARGET
+        assert AsyncRemoteClient().with_target('localhost:9091').target == 'localhost:9091'
+        with pytest.raises(ValueError):
+            AsyncRemoteClient().with_target(None)
+
+    def test_open_insecure(self):
+        """ Unit test for open. """
+        async def open_and_close():
+            remote_kv = AsyncRemoteClient().open()
+            assert isinstance(remote_kv, AsyncRemoteKV)
+            assert isinstance(remote_kv.channel, grpc.aio.Channel)
+            await remote_kv.close()
+        asyncio.run(open_and_close())
+
+    def test_open_secure(self, mocker: pytest_mock.MockerFixture):
+        """ Unit test for open. """
+        mocker.patch('builtins.open', mocker.mock_open(read_data=b'\x00'))
+        mock_secure_channel = mocker.patch.object(grpc.aio, 'secure_channel')
+        remote_kv = AsyncRemoteClient(options=SecurityOptions('env/ca-cert.pem')).open()
+        assert remote_kv.channel is mock_secure_channel.return_value
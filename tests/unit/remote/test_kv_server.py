@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""The unit test for remote reference server module."""
+
+import json
+
+import pytest
+import pytest_mock
+
+from silksnake.remote import kv_server
+from silksnake.remote.kv_remote import RemoteClient
+from silksnake.remote.proto import kv_pb2
+
+from .test_sets import test_sets_filename
+
+# pylint: disable=no-self-use,redefined-outer-name
+
+PAIRS = {'T': {'01': '0a', '0201': '0b', '0202': '0c', '03': '0d'}, 'U': {'01': '1a'}}
+
+@pytest.fixture
+def store() -> kv_server.MemoryStore:
+    """ store """
+    return kv_server.MemoryStore.from_json(json.dumps(PAIRS))
+
+def seek_pairs(store: kv_server.MemoryStore, requests: list) -> list:
+    """ Run Seek on the servicer with the given (bucket, seek key, prefix, streaming) requests. """
+    seek_requests = iter([kv_pb2.SeekRequest(bucketName=b, seekKey=k, prefix=p, startSreaming=s) for b, k, p, s in requests])
+    return [(pair.key, pair.value) for pair in kv_server.KVServicer(store).Seek(seek_requests, None)]
+
+class TestMemoryStore:
+    """ Unit test for MemoryStore. """
+    def test_put(self):
+        """ Unit test for put. """
+        memory_store = kv_server.MemoryStore()
+        with pytest.raises(ValueError):
+            memory_store.put(None, b'\x01', b'')
+        with pytest.raises(ValueError):
+            memory_store.put('T', b'', b'')
+        memory_store.put('T', b'\x02', b'\x0b')
+        memory_store.put('T', b'\x01', b'\x0a')
+        memory_store.put('T', b'\x01', b'\x0c')
+        assert list(memory_store.items()) == [('T', b'\x01', b'\x0c'), ('T', b'\x02', b'\x0b')]
+        assert len(memory_store.bucket('T')) == 2
+
+    def test_load(self):
+        """ Unit test for load. """
+        memory_store = kv_server.MemoryStore()
+        with pytest.raises(ValueError):
+            memory_store.load([(None, b'\x01', b'')])
+        with pytest.raises(ValueError):
+            memory_store.load([('T', b'', b'')])
+        memory_store.put('T', b'\x02', b'\x0b')
+        memory_store.load([('T', b'\x03', b'\x0c'), ('U', b'\x01', b'\x1a'), ('T', b'\x01', b'\x0a'), ('T', b'\x03', b'\x0d')])
+        memory_store.put('T', b'\x00', b'\x09')
+        assert list(memory_store.items()) == [
+            ('T', b'\x00', b'\x09'), ('T', b'\x01', b'\x0a'), ('T', b'\x02', b'\x0b'), ('T', b'\x03', b'\x0d'), ('U', b'\x01', b'\x1a')
+        ]
+
+    def test_from_json(self, store: kv_server.MemoryStore, mocker: pytest_mock.MockerFixture):
+        """ Unit test for from_json, sorting each bucket once. """
+        mock_insort = mocker.patch.object(kv_server.bisect, 'insort')
+        kv_server.MemoryStore.from_json(json.dumps(PAIRS))
+        mock_insort.assert_not_called()
+        assert len(store.buckets['T']) == 4
+        assert store.buckets['U'].values[b'\x01'] == b'\x1a'
+        entries = [{'bucketName': 'T', 'key': '01', 'value': '0a'}, {'bucketName': 'T', 'key': '', 'value': ''}]
+        array_store = kv_server.MemoryStore.from_json(json.dumps(entries))
+        assert list(array_store.items()) == [('T', b'\x01', b'\x0a')]
+
+    def test_binary(self, store: kv_server.MemoryStore):
+        """ Unit test for to_binary and from_binary. """
+        assert list(kv_server.MemoryStore.from_binary(store.to_binary()).items()) == list(store.items())
+        assert not kv_server.MemoryStore.from_binary(b'').buckets
+
+    def test_from_file(self, store: kv_server.MemoryStore, mocker: pytest_mock.MockerFixture):
+        """ Unit test for from_file. """
+        json_store = kv_server.MemoryStore.from_file(test_sets_filename)
+        assert len(json_store.buckets['b']) > 0
+        mocker.patch('builtins.open', mocker.mock_open(read_data=store.to_binary()))
+        assert list(kv_server.MemoryStore.from_file('fixture.bin').items()) == list(store.items())
+
+class TestKVServicer:
+    """ Unit test for KVServicer. """
+    def test_init(self):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            kv_server.KVServicer(None)
+
+    @pytest.mark.parametrize("requests,expected_pairs", [
+        ([], []),
+        ([('T', b'\x01', b'', False)], [(b'\x01', b'\x0a')]),
+        ([('T', b'\x00', b'', False)], [(b'\x01', b'\x0a')]),
+        ([('T', b'\x04', b'', False)], [(b'', b'')]),
+        ([('X', b'\x01', b'', False)], [(b'', b'')]),
+        ([('T', b'\x01', b'', False), ('T', b'\x03', b'', False), ('T', b'\x02', b'', False)],
+         [(b'\x01', b'\x0a'), (b'\x03', b'\x0d'), (b'\x02\x01', b'\x0b')]),
+        ([('T', b'\x02', b'\x02', False), ('T', b'', b'\x02', False), ('T', b'', b'\x02', False), ('T', b'', b'\x02', False)],
+         [(b'\x02\x01', b'\x0b'), (b'\x02\x02', b'\x0c'), (b'', b'')]),
+        ([('T', b'\x02', b'\x02', True)], [(b'\x02\x01', b'\x0b'), (b'\x02\x02', b'\x0c'), (b'', b'')]),
+        ([('T', b'', b'', True)], [(b'\x01', b'\x0a'), (b'\x02\x01', b'\x0b'), (b'\x02\x02', b'\x0c'), (b'\x03', b'\x0d'), (b'', b'')]),
+    ])
+    def test_seek(self, store: kv_server.MemoryStore, requests: list, expected_pairs: list):
+        """ Unit test for Seek. """
+        assert seek_pairs(store, requests) == expected_pairs
+
+    def test_seek_keys(self, store: kv_server.MemoryStore):
+        """ Unit test for SeekKeys. """
+        requests = iter([kv_pb2.SeekRequest(bucketName='T', seekKey=b'\x02', prefix=b'\x02', startSreaming=True)])
+        key_sizes = [(pair_key.key, pair_key.vSize) for pair_key in kv_server.KVServicer(store).SeekKeys(requests, None)]
+        assert key_sizes == [(b'\x02\x01', 1), (b'\x02\x02', 1), (b'', 0)]
+
+def test_serve(store: kv_server.MemoryStore):
+    """ Unit test for serve using the remote client. """
+    with pytest.raises(ValueError):
+        kv_server.serve(None)
+    with pytest.raises(ValueError):
+        kv_server.serve(store, None)
+    server = kv_server.serve(store, 'localhost:0')
+    remote_kv = RemoteClient('localhost:{}'.format(server.port)).open()
+    try:
+        view = remote_kv.view()
+        assert view.get('T', b'\x02') == (b'\x02\x01', b'\x0b')
+        assert view.get_many('T', [b'\x03', b'\x01', b'\x04']) == [(b'\x03', b'\x0d'), (b'\x01', b'\x0a'), (b'', b'')]
+        cursor = view.cursor('T').with_prefix(b'\x02').enable_streaming(True)
+        assert [(pair.key, pair.value) for pair in cursor.next()] == [(b'\x02\x01', b'\x0b'), (b'\x02\x02', b'\x0c'), (b'', b'')]
+        assert [(pair.key, pair.value) for pair in cursor.next(b'\x02\x02')] == [(b'\x02\x02', b'\x0c'), (b'', b'')]
+        assert [(pair.key, pair.value) for pair in cursor.next(b'\x01')] == [(b'\x02\x01', b'\x0b'), (b'\x02\x02', b'\x0c'), (b'', b'')]
+        assert list(view.cursor('T').key_sizes()) == [(b'\x01', 1), (b'\x02\x01', 1), (b'\x02\x02', 1), (b'\x03', 1)]
+    finally:
+        remote_kv.close()
+        server.stop(None)
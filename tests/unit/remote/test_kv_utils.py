@@ -95,6 +95,17 @@ def test_kv_walk(bucket: str, prefix_hex: str, target: str, result_list: ResultL
         with pytest.raises((ValueError)):
             kv_utils.kv_walk(target, bucket, prefix, mock_walker)
 
+def test_kv_walk_cancel(mocker: pytest_mock.MockerFixture) -> None:
+    """ Unit test for kv_walk cancelling the stream on early exit. """
+    mock_call = pytest_mock.mock.MagicMock()
+    mock_call.__iter__.return_value = iter([ResultBytes(b'\x01', b'\x0a'), ResultBytes(b'\x02', b'\x0b')])
+    mock_stub = mocker.patch('silksnake.remote.proto.kv_pb2_grpc.KVStub')
+    mock_stub.return_value.Seek.return_value = mock_call
+    mock_walker = pytest_mock.mock.Mock(return_value=True)
+    kv_utils.kv_walk('', 'b', b'', mock_walker)
+    mock_walker.assert_called_once_with(b'\x01', b'\x0a')
+    mock_call.cancel.assert_called_once()
+
 @pytest.mark.parametrize('target,should_pass,args', [
     # Valid test list
     ('', True, {}),
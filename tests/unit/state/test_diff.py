@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""The unit test for diff module."""
+
+import os
+
+import pytest
+
+from silksnake.core import account, reader
+from silksnake.core.constants import ADDRESS_SIZE, INCARNATION_SIZE
+from silksnake.helpers.dbutils import composite_keys, tables, timestamp
+from silksnake.state import diff
+
+from ..memory_kv import MemoryKV, MemoryView, encode_account, encode_account_change_set, encode_history_chunck, encode_storage_change_set
+
+# pylint: disable=no-self-use
+
+ADDRESS1 = bytes.fromhex('11' * 20)
+ADDRESS2 = bytes.fromhex('22' * 20)
+LOCATION1 = bytes(31) + b'\x01'
+LOCATION2 = bytes(31) + b'\x02'
+STORAGE_KEY1 = composite_keys.create_plain_composite_storage_key(ADDRESS1, 1, LOCATION1)
+STORAGE_KEY2 = composite_keys.create_plain_composite_storage_key(ADDRESS1, 1, LOCATION2)
+
+# Account 1: (1, 100) until block 10, (2, 200) until block 20, then (3, 300). Account 2 created at block 15.
+# Storage slot 1: 0x0a until block 12, then 0x0b. Storage slot 2: missing until block 12, 0x0c until block 18, then deleted.
+BUCKETS = {
+    tables.ACCOUNTS_HISTORY_LABEL: {
+        ADDRESS1 + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([10, 20]),
+        ADDRESS2 + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([15]),
+    },
+    tables.STORAGE_HISTORY_LABEL: {
+        ADDRESS1 + LOCATION1 + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([12]),
+        ADDRESS1 + LOCATION2 + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big'): encode_history_chunck([12, 18]),
+    },
+    tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(10): encode_account_change_set([(ADDRESS1, encode_account(1, 100))]),
+        timestamp.encode_timestamp(15): encode_account_change_set([(ADDRESS2, b'')]),
+        timestamp.encode_timestamp(20): encode_account_change_set([(ADDRESS1, encode_account(2, 200))]),
+    },
+    tables.PLAIN_STORAGE_CHANGE_SET_LABEL: {
+        timestamp.encode_timestamp(12): encode_storage_change_set(ADDRESS1, [(LOCATION1, b'\x0a'), (LOCATION2, b'')]),
+        timestamp.encode_timestamp(18): encode_storage_change_set(ADDRESS1, [(LOCATION2, b'\x0c')]),
+    },
+    tables.PLAIN_STATE_LABEL: {
+        ADDRESS1: encode_account(3, 300),
+        ADDRESS2: encode_account(0, 5),
+        STORAGE_KEY1: b'\x0b',
+    },
+}
+
+@pytest.mark.parametrize("from_block,to_block,accounts,expected_changes", [
+    (0, 0, None, []),
+    (0, 9, None, []),
+    (0, 10, None, [(False, ADDRESS1, encode_account(1, 100), encode_account(2, 200))]),
+    (10, 17, None, [
+        (False, ADDRESS2, b'', encode_account(0, 5)),
+        (True, STORAGE_KEY1, b'\x0a', b'\x0b'),
+        (True, STORAGE_KEY2, b'', b'\x0c'),
+    ]),
+    (10, 18, None, [
+        (False, ADDRESS2, b'', encode_account(0, 5)),
+        (True, STORAGE_KEY1, b'\x0a', b'\x0b'),
+    ]),
+    (0, 30, None, [
+        (False, ADDRESS1, encode_account(1, 100), encode_account(3, 300)),
+        (False, ADDRESS2, b'', encode_account(0, 5)),
+        (True, STORAGE_KEY1, b'\x0a', b'\x0b'),
+    ]),
+    (0, 30, [ADDRESS2], [(False, ADDRESS2, b'', encode_account(0, 5))]),
+    (12, 30, [ADDRESS1], [
+        (False, ADDRESS1, encode_account(2, 200), encode_account(3, 300)),
+        (True, STORAGE_KEY2, b'\x0c', b''),
+    ]),
+])
+def test_diff(from_block: int, to_block: int, accounts: list, expected_changes: list):
+    """ Unit test for diff. """
+    changes = list(diff.diff(MemoryView(BUCKETS), from_block, to_block, accounts, batch_size=1))
+    assert changes == [diff.StateChange(*change) for change in expected_changes]
+    assert list(diff.diff(MemoryView(BUCKETS), from_block, to_block, accounts, max_entries=0)) == changes
+
+@pytest.mark.parametrize("from_block,to_block", [(0, 10), (9, 12), (10, 17), (10, 20), (0, 30)])
+def test_diff_state_reader(from_block: int, to_block: int):
+    """ Unit test for diff matching the state read by StateReader at from_block and at to_block. """
+    database = MemoryKV(MemoryView(BUCKETS))
+    changes = list(diff.diff(database.view(), from_block, to_block))
+    assert changes
+    for change in changes:
+        for block_number, value in [(from_block, change.before), (to_block, change.after)]:
+            state_reader = reader.StateReader(database, block_number)
+            address = '0x' + change.key[:ADDRESS_SIZE].hex()
+            if change.storage:
+                location = change.key[ADDRESS_SIZE + INCARNATION_SIZE:]
+                assert (state_reader.read_account_storage(address, 1, location) or b'') == value
+            elif value:
+                assert str(state_reader.read_account_data(address)) == str(account.Account.from_storage(value))
+            else:
+                with pytest.raises(ValueError):
+                    state_reader.read_account_data(address)
+
+@pytest.mark.parametrize("from_block,to_block,batch_size", [
+    (None, 10, 1),
+    (-1, 10, 1),
+    (10, None, 1),
+    (10, 9, 1),
+    (0, 10, 0),
+])
+def test_diff_invalid(from_block: int, to_block: int, batch_size: int):
+    """ Unit test for diff with invalid arguments. """
+    with pytest.raises(ValueError):
+        list(diff.diff(MemoryView(BUCKETS), from_block, to_block, batch_size=batch_size))
+
+class TestFirstValueStore:
+    """ Unit test for FirstValueStore. """
+    def test_add(self, tmp_path):
+        """ Unit test for add, items and spill. """
+        with pytest.raises(ValueError):
+            diff.FirstValueStore(-1)
+        store = diff.FirstValueStore(2, str(tmp_path))
+        store.add(b'\x02', b'\x0b')
+        store.add(b'\x01', b'\x0a')
+        store.add(b'\x02', b'\x0c')
+        assert not store.spilled
+        assert list(store.items()) == [(b'\x01', b'\x0a'), (b'\x02', b'\x0b')]
+        store.add(b'\x00', b'')
+        store.add(b'\x01', b'\x0d')
+        assert store.spilled
+        assert len(store) == 3
+        assert os.path.exists(store.path)
+        assert list(store.items()) == [(b'\x00', b''), (b'\x01', b'\x0a'), (b'\x02', b'\x0b')]
+        store.close()
+        assert not os.listdir(str(tmp_path))
+        assert len(store) == 0
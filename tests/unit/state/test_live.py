@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""The unit test for live module."""
+
+import pytest
+
+from silksnake.helpers.dbutils import tables, timestamp
+from silksnake.rlp import sedes
+from silksnake.stagedsync import stages
+from silksnake.state import live
+
+from ..memory_kv import MemoryView, encode_account, encode_account_change_set, encode_storage_change_set
+from .test_diff import ADDRESS1, ADDRESS2, LOCATION1, STORAGE_KEY1
+
+# pylint: disable=no-self-use,redefined-outer-name
+
+class MemoryChain:
+    """ In-memory KV on buckets of key-value pairs following a chain head, counting the plain state reads. """
+    def __init__(self, head_block_number: int, state: dict):
+        self.buckets = {
+            tables.PLAIN_STATE_LABEL: dict(state),
+            tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL: {},
+            tables.PLAIN_STORAGE_CHANGE_SET_LABEL: {},
+            tables.SYNC_STAGE_PROGRESS_LABEL: {},
+            tables.BLOCK_HEADERS_LABEL: {},
+        }
+        self.state_reads = 0
+        self.set_head(head_block_number)
+
+    def set_head(self, head_block_number: int, block_hash: bytes = None) -> None:
+        """ Move the FINISH stage progress to the given block, having the given canonical hash (the number by default). """
+        self.buckets[tables.SYNC_STAGE_PROGRESS_LABEL][stages.SyncStage.FINISH.value] = head_block_number.to_bytes(8, 'big')
+        block_hash = block_hash if block_hash is not None else head_block_number.to_bytes(32, 'big')
+        self.buckets[tables.BLOCK_HEADERS_LABEL][sedes.encode_canonical_block_number(head_block_number)] = block_hash
+
+    def execute(self, block_number: int, accounts: dict, storage: dict, block_hash: bytes = None) -> None:
+        """ Apply the given account and storage slot (of account 1) changes as the given block, moving the head there. """
+        state = self.buckets[tables.PLAIN_STATE_LABEL]
+        account_changes = sorted((address, state.get(address, b'')) for address in accounts)
+        storage_changes = sorted((location, state.get(ADDRESS1 + (1).to_bytes(8, 'big') + location, b'')) for location in storage)
+        self.buckets[tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL][timestamp.encode_timestamp(block_number)] = \
+            encode_account_change_set(account_changes)
+        if storage_changes:
+            self.buckets[tables.PLAIN_STORAGE_CHANGE_SET_LABEL][timestamp.encode_timestamp(block_number)] = \
+                encode_storage_change_set(ADDRESS1, storage_changes)
+        for key, value in list(accounts.items()) + [(ADDRESS1 + (1).to_bytes(8, 'big') + k, v) for k, v in storage.items()]:
+            if value:
+                state[key] = value
+            else:
+                state.pop(key, None)
+        self.set_head(block_number, block_hash)
+
+    def view(self):
+        """ view """
+        chain = self
+
+        class ChainView(MemoryView):
+            """ In-memory view counting the plain state reads. """
+            def get_many(self, bucket_name: str, keys: list) -> list:
+                """ get_many """
+                if bucket_name == tables.PLAIN_STATE_LABEL:
+                    chain.state_reads += len(keys)
+                return super().get_many(bucket_name, keys)
+
+        return ChainView(self.buckets)
+
+@pytest.fixture
+def chain() -> MemoryChain:
+    """ chain """
+    return MemoryChain(10, {ADDRESS1: encode_account(1, 100), STORAGE_KEY1: b'\x0a'})
+
+class TestLiveStateCache:
+    """ Unit test for LiveStateCache. """
+    def test_init(self, chain: MemoryChain):
+        """ Unit test for __init__. """
+        with pytest.raises(ValueError):
+            live.LiveStateCache(None)
+        with pytest.raises(ValueError):
+            live.LiveStateCache(chain, poll_interval=-1)
+        with pytest.raises(ValueError):
+            live.LiveStateCache(chain, max_catch_up_blocks=None)
+        state_cache = live.LiveStateCache(chain)
+        assert state_cache.block_number is None
+        assert state_cache.hit_rate == 0.0
+        with pytest.raises(ValueError):
+            state_cache.get(None)
+        with pytest.raises(ValueError):
+            state_cache.get_many(None)
+
+    def test_get(self, chain: MemoryChain):
+        """ Unit test for get and get_many hitting the cache. """
+        state_cache = live.LiveStateCache(chain, poll_interval=0)
+        assert state_cache.get_many([ADDRESS1, STORAGE_KEY1, ADDRESS2]) == [encode_account(1, 100), b'\x0a', b'']
+        assert state_cache.block_number == 10
+        assert state_cache.get_many([ADDRESS1, STORAGE_KEY1, ADDRESS2]) == [encode_account(1, 100), b'\x0a', b'']
+        assert chain.state_reads == 3
+        assert state_cache.hit_rate == 0.5
+        assert state_cache.read_account_data('0x' + ADDRESS1.hex()).balance == 100
+        assert state_cache.read_account_data('0x' + ADDRESS2.hex()) is None
+        assert state_cache.read_account_storage('0x' + ADDRESS1.hex(), 1, LOCATION1) == b'\x0a'
+        assert chain.state_reads == 3
+
+    def test_poll(self, chain: MemoryChain):
+        """ Unit test for poll refreshing the entries changed by the new blocks. """
+        state_cache = live.LiveStateCache(chain, poll_interval=0)
+        state_cache.get_many([ADDRESS1, STORAGE_KEY1, ADDRESS2])
+        chain.execute(11, {ADDRESS2: encode_account(0, 5)}, {})
+        chain.execute(12, {ADDRESS1: encode_account(2, 200)}, {LOCATION1: b''})
+        chain.state_reads = 0
+        assert state_cache.get_many([ADDRESS1, STORAGE_KEY1, ADDRESS2]) == [encode_account(2, 200), b'', encode_account(0, 5)]
+        assert state_cache.block_number == 12
+        assert chain.state_reads == 3
+        assert state_cache.get_many([ADDRESS1, STORAGE_KEY1, ADDRESS2]) == [encode_account(2, 200), b'', encode_account(0, 5)]
+        assert chain.state_reads == 3
+        assert state_cache.poll() == 12
+
+    def test_poll_interval(self, chain: MemoryChain):
+        """ Unit test for reads polling at most every poll_interval seconds. """
+        state_cache = live.LiveStateCache(chain, poll_interval=3600)
+        assert state_cache.get(ADDRESS1) == encode_account(1, 100)
+        chain.execute(11, {ADDRESS1: encode_account(2, 200)}, {})
+        assert state_cache.get(ADDRESS1) == encode_account(1, 100)
+        assert state_cache.poll() == 11
+        assert state_cache.get(ADDRESS1) == encode_account(2, 200)
+
+    @pytest.mark.parametrize("head_block_number", [9, 20])
+    def test_poll_reset(self, chain: MemoryChain, head_block_number: int):
+        """ Unit test for poll dropping all the entries on unwind or when too far behind. """
+        state_cache = live.LiveStateCache(chain, poll_interval=0, max_catch_up_blocks=5)
+        state_cache.get(ADDRESS1)
+        chain.set_head(head_block_number)
+        assert state_cache.poll() == head_block_number
+        assert len(state_cache.entries) == 0
+
+    def test_poll_same_height_reorg(self, chain: MemoryChain):
+        """ Unit test for poll dropping all the entries when the head block is replaced at the same height. """
+        state_cache = live.LiveStateCache(chain, poll_interval=0)
+        assert state_cache.get(ADDRESS1) == encode_account(1, 100)
+        chain.execute(10, {ADDRESS1: encode_account(3, 300)}, {}, block_hash=b'\xbb' * 32)
+        assert state_cache.get(ADDRESS1) == encode_account(3, 300)
+        assert state_cache.block_hash == b'\xbb' * 32
+        assert state_cache.poll() == 10
+        assert ADDRESS1 in state_cache.entries
+
+    def test_poll_reorg_past_head(self, chain: MemoryChain):
+        """ Unit test for poll dropping all the entries when the head block is unwound and the new chain grows past it. """
+        state_cache = live.LiveStateCache(chain, poll_interval=0)
+        assert state_cache.get(ADDRESS1) == encode_account(1, 100)
+        chain.execute(10, {ADDRESS1: encode_account(3, 300)}, {}, block_hash=b'\xbb' * 32)
+        chain.execute(11, {ADDRESS2: encode_account(0, 5)}, {})
+        assert state_cache.get(ADDRESS1) == encode_account(3, 300)
+        assert state_cache.block_number == 11
+
+    def test_generation(self, chain: MemoryChain):
+        """ Unit test for a read racing with a refresh not caching its value. """
+        state_cache = live.LiveStateCache(chain, poll_interval=3600)
+        state_cache.poll()
+        view = chain.view
+
+        def racing_view():
+            chain.view = view
+            state_cache.clear()
+            return view()
+
+        chain.view = racing_view
+        assert state_cache.get(ADDRESS1) == encode_account(1, 100)
+        assert ADDRESS1 not in state_cache.entries
+        assert state_cache.get(ADDRESS1) == encode_account(1, 100)
+        assert ADDRESS1 in state_cache.entries
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""The unit test for materialize module."""
+
+import os
+
+import pytest
+
+from silksnake.core import account, reader, snapshot
+from silksnake.core.constants import ADDRESS_SIZE, INCARNATION_SIZE
+from silksnake.helpers.dbutils import composite_keys, tables, timestamp
+from silksnake.stagedsync import stages
+from silksnake.state import materialize
+
+from ..memory_kv import MemoryKV, MemoryView, encode_account, encode_account_change_set, encode_history_chunck
+from .test_diff import ADDRESS1, ADDRESS2, BUCKETS, LOCATION1, LOCATION2, STORAGE_KEY1, STORAGE_KEY2
+
+# pylint: disable=no-self-use
+
+ADDRESS3 = bytes.fromhex('f3' * 20)
+STORAGE_KEY3 = composite_keys.create_plain_composite_storage_key(ADDRESS3, 1, LOCATION1)
+
+# Same history as the diff unit test, plus account 3 never changed and account 2 deleted at block 25.
+STATE_BUCKETS = dict(BUCKETS)
+STATE_BUCKETS[tables.ACCOUNTS_HISTORY_LABEL] = dict(BUCKETS[tables.ACCOUNTS_HISTORY_LABEL])
+STATE_BUCKETS[tables.ACCOUNTS_HISTORY_LABEL][ADDRESS2 + (0xFFFFFFFFFFFFFFFF).to_bytes(8, 'big')] = encode_history_chunck([15, 25])
+STATE_BUCKETS[tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL] = dict(BUCKETS[tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL])
+STATE_BUCKETS[tables.PLAIN_ACCOUNTS_CHANGE_SET_LABEL][timestamp.encode_timestamp(25)] = \
+    encode_account_change_set([(ADDRESS2, encode_account(0, 5))])
+STATE_BUCKETS[tables.SYNC_STAGE_PROGRESS_LABEL] = {stages.SyncStage.FINISH.value: (25).to_bytes(8, 'big')}
+STATE_BUCKETS[tables.PLAIN_STATE_LABEL] = {
+    ADDRESS1: encode_account(3, 300),
+    STORAGE_KEY1: b'\x0b',
+    ADDRESS3: encode_account(7, 700),
+    STORAGE_KEY3: b'\x0f',
+}
+
+UNCHANGED_STATE = [(ADDRESS3, encode_account(7, 700)), (STORAGE_KEY3, b'\x0f')]
+
+@pytest.mark.parametrize("block_number,expected_state", [
+    (0, [(ADDRESS1, encode_account(1, 100)), (STORAGE_KEY1, b'\x0a')] + UNCHANGED_STATE),
+    (10, [(ADDRESS1, encode_account(2, 200)), (STORAGE_KEY1, b'\x0a')] + UNCHANGED_STATE),
+    (11, [(ADDRESS1, encode_account(2, 200)), (STORAGE_KEY1, b'\x0a')] + UNCHANGED_STATE),
+    (12, [(ADDRESS1, encode_account(2, 200)), (STORAGE_KEY1, b'\x0b'), (STORAGE_KEY2, b'\x0c')] + UNCHANGED_STATE),
+    (15, [(ADDRESS1, encode_account(2, 200)), (STORAGE_KEY1, b'\x0b'), (STORAGE_KEY2, b'\x0c'),
+          (ADDRESS2, encode_account(0, 5))] + UNCHANGED_STATE),
+    (18, [(ADDRESS1, encode_account(2, 200)), (STORAGE_KEY1, b'\x0b'), (ADDRESS2, encode_account(0, 5))] + UNCHANGED_STATE),
+    (20, [(ADDRESS1, encode_account(3, 300)), (STORAGE_KEY1, b'\x0b'), (ADDRESS2, encode_account(0, 5))] + UNCHANGED_STATE),
+    (25, [(ADDRESS1, encode_account(3, 300)), (STORAGE_KEY1, b'\x0b')] + UNCHANGED_STATE),
+    (30, [(ADDRESS1, encode_account(3, 300)), (STORAGE_KEY1, b'\x0b')] + UNCHANGED_STATE),
+])
+@pytest.mark.parametrize("num_shards,max_entries,num_ranges", [(1, 1000, 1), (4, 1000, 4), (16, 0, 2), (256, 1, 30)])
+def test_materialize(tmp_path, block_number: int, expected_state: list, num_shards: int, max_entries: int, num_ranges: int):
+    """ Unit test for materialize. """
+    directory = str(tmp_path)
+    database = MemoryKV(MemoryView(STATE_BUCKETS))
+    count = materialize.materialize(database, block_number, directory, num_shards, max_entries=max_entries, num_ranges=num_ranges)
+    assert count == len(expected_state)
+    assert sorted(os.listdir(directory)) == [tables.PLAIN_STATE_LABEL + '.idx', tables.PLAIN_STATE_LABEL + '.seg']
+    assert read_snapshot_state(directory) == sorted(expected_state)
+
+@pytest.mark.parametrize("block_number", [0, 9, 10, 12, 15, 18, 20, 25])
+def test_materialize_state_reader(tmp_path, block_number: int):
+    """ Unit test for materialize matching the state read by StateReader at the same block. """
+    database = MemoryKV(MemoryView(STATE_BUCKETS))
+    materialize.materialize(database, block_number, str(tmp_path), 4, num_ranges=3)
+    state_reader = reader.StateReader(database, block_number)
+    for key, value in read_snapshot_state(str(tmp_path)):
+        address = '0x' + key[:ADDRESS_SIZE].hex()
+        if len(key) == ADDRESS_SIZE:
+            assert str(state_reader.read_account_data(address)) == str(account.Account.from_storage(value))
+        else:
+            assert state_reader.read_account_storage(address, 1, key[ADDRESS_SIZE + INCARNATION_SIZE:]) == value
+
+def read_snapshot_state(directory: str) -> list:
+    """ Return the sorted (key, value) list of the plain state in the snapshot directory. """
+    snapshot_kv = snapshot.SnapshotKV(directory)
+    try:
+        return [(bytes(key), bytes(value)) for key, value in snapshot_kv.view().cursor(tables.PLAIN_STATE_LABEL).range()]
+    finally:
+        snapshot_kv.close()
+
+@pytest.mark.parametrize("block_number,directory,num_shards", [
+    (None, 'd', 1),
+    (-1, 'd', 1),
+    (0, None, 1),
+    (0, 'd', 0),
+    (0, 'd', 257),
+])
+def test_materialize_invalid(block_number: int, directory: str, num_shards: int):
+    """ Unit test for materialize with invalid arguments. """
+    with pytest.raises(ValueError):
+        materialize.materialize(MemoryKV(MemoryView(STATE_BUCKETS)), block_number, directory, num_shards)
+    with pytest.raises(ValueError):
+        materialize.materialize(None, 0, 'd')
+    with pytest.raises(ValueError):
+        materialize.materialize(MemoryKV(MemoryView(STATE_BUCKETS)), 0, 'd', num_ranges=0)
+
+@pytest.mark.parametrize("num_shards", [1, 3, 16, 256])
+def test_shard_range(num_shards: int):
+    """ Unit test for shard_of and shard_range. """
+    for first_byte in range(256):
+        key = bytes([first_byte]) + LOCATION2
+        start_key, end_key = materialize.shard_range(materialize.shard_of(key, num_shards), num_shards)
+        assert start_key <= key and (end_key is None or key < end_key)
+    assert materialize.shard_range(0, num_shards)[0] == b'\x00'
+    assert materialize.shard_range(num_shards - 1, num_shards)[1] is None
+
+@pytest.mark.parametrize("from_block,head_block_number,num_ranges,expected_ranges", [
+    (11, None, 4, [(11, None)]),
+    (11, 10, 4, [(11, None)]),
+    (11, 11, 4, [(11, None)]),
+    (11, 25, 1, [(11, None)]),
+    (11, 25, 3, [(11, 16), (16, 21), (21, None)]),
+    (11, 12, 3, [(11, 12), (12, None)]),
+])
+def test_block_ranges(from_block: int, head_block_number: int, num_ranges: int, expected_ranges: list):
+    """ Unit test for block_ranges. """
+    assert materialize.block_ranges(from_block, head_block_number, num_ranges) == expected_ranges
+
+def test_read_head_block_number():
+    """ Unit test for read_head_block_number. """
+    assert materialize.read_head_block_number(MemoryView(STATE_BUCKETS)) == 25
+    assert materialize.read_head_block_number(MemoryView(BUCKETS)) is None
+
+def test_merge_undo_values():
+    """ Unit test for merge_undo_values. """
+    range_undo_values = [[(b'\x01', b'\x0a'), (b'\x03', b'')], [], [(b'\x00', b'\x09'), (b'\x01', b'\x0b'), (b'\x03', b'\x0c')]]
+    assert list(materialize.merge_undo_values(range_undo_values)) == [(b'\x00', b'\x09'), (b'\x01', b'\x0a'), (b'\x03', b'')]
+    assert list(materialize.merge_undo_values([])) == []
+
+def test_merge_state():
+    """ Unit test for merge_state. """
+    current_state = [(b'\x01', b'\x0a'), (b'\x03', b'\x0c'), (b'\x05', b'\x0e')]
+    undo_values = [(b'\x00', b'\x09'), (b'\x03', b''), (b'\x04', b'\x0d'), (b'\x06', b'\x0f')]
+    assert list(materialize.merge_state(current_state, undo_values)) == [
+        (b'\x00', b'\x09'), (b'\x01', b'\x0a'), (b'\x03', b''), (b'\x04', b'\x0d'), (b'\x05', b'\x0e'), (b'\x06', b'\x0f')]
+    assert list(materialize.merge_state([], [])) == []
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """The unit test for hashing module."""
 
+import asyncio
+
 import pytest
 import pytest_mock
 
@@ -25,3 +27,20 @@ def test_read_eth_supply(block_number: int, result_key: str, result_value: str,
         assert supply.read_eth_supply(mock_view, block_number) == int.from_bytes(result_value_bytes, 'big')
     else:
         assert supply.read_eth_supply(mock_view, block_number) == supply.ETH_SUPPLY_NOT_AVAILABLE
+
+@pytest.mark.parametrize("block_number,result_key,result_value,should_pass", [
+    # Valid test list
+    (0, '0000000000000000', '0000000000000001', True),
+
+    # Invalid test list
+    (0, '', '', False),
+])
+def test_read_eth_supply_async(block_number: int, result_key: str, result_value: str, should_pass: bool):
+    """ Unit test for read_eth_supply_async. """
+    result_value_bytes = bytes.fromhex(result_value)
+    mock_view = pytest_mock.mock.Mock()
+    mock_view.get = pytest_mock.mock.AsyncMock(return_value=(bytes.fromhex(result_key), result_value_bytes))
+    if should_pass:
+        assert asyncio.run(supply.read_eth_supply_async(mock_view, block_number)) == int.from_bytes(result_value_bytes, 'big')
+    else:
+        assert asyncio.run(supply.read_eth_supply_async(mock_view, block_number)) == supply.ETH_SUPPLY_NOT_AVAILABLE
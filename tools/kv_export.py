@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""The kv_export command allows to export a turbo-geth/silkworm KV bucket (or a key range of it) to a local snapshot segment."""
+
+import argparse
+
+import context # pylint: disable=unused-import
+
+from silksnake.remote import kv_export
+from silksnake.remote.kv_remote import DEFAULT_TARGET
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('bucket', help='the bucket tag as string')
+    parser.add_argument('directory', help='the snapshot directory as string')
+    parser.add_argument('-p', '--prefix', default='', help='the key prefix as hex string without leading 0x')
+    parser.add_argument('-s', '--start_key', default=None, help='the first key (inclusive) as hex string without leading 0x')
+    parser.add_argument('-e', '--end_key', default=None, help='the last key (exclusive) as hex string without leading 0x')
+    parser.add_argument('-n', '--no_resume', action='store_true', help='overwrite the existing segment instead of resuming')
+    parser.add_argument('-i', '--interval', type=int, default=kv_export.DEFAULT_PROGRESS_INTERVAL, help='the progress interval in pairs')
+    parser.add_argument('-t', '--target', default=DEFAULT_TARGET, help='the server location as string <address>:<port>')
+    args = parser.parse_args()
+
+    print('REQ bucket:', args.bucket, 'directory:', args.directory, 'prefix:', args.prefix,
+          'start_key:', args.start_key, 'end_key:', args.end_key)
+
+    start_key = bytes.fromhex(args.start_key) if args.start_key is not None else None
+    end_key = bytes.fromhex(args.end_key) if args.end_key is not None else None
+    kv_export.export_bucket(args.target, args.bucket, args.directory, bytes.fromhex(args.prefix), start_key, end_key,
+                            not args.no_resume, kv_export.print_progress, args.interval)
@@ -14,12 +14,13 @@ from silksnake.remote.kv_remote import DEFAULT_TARGET
 def kv_seek_block_body(block_height: int, count: int = 1, target: str = DEFAULT_TARGET):
     """ Search for the provided block range in KV 'Block Bodies' bucket of turbo-geth/silkworm running at target.
     """
-    for index, block_number in enumerate(range(block_height, block_height + count)):
-        encoded_block_number = sedes.encode_block_number(block_number)
+    encoded_block_numbers = [sedes.encode_block_number(block_number) for block_number in range(block_height, block_height + count)]
 
-        print('REQ block_number:', block_number, '(key: ' + str(encoded_block_number.hex()) + ')')
+    pairs = kv_utils.kv_func(target, lambda kv_view: kv_view.get_many(tables.BLOCK_BODIES_LABEL, encoded_block_numbers))
 
-        key, value = kv_utils.kv_seek(tables.BLOCK_BODIES_LABEL, encoded_block_number, target)
+    for index, (key, value) in enumerate(pairs):
+        block_number, encoded_block_number = block_height + index, encoded_block_numbers[index]
+        print('REQ block_number:', block_number, '(key: ' + str(encoded_block_number.hex()) + ')')
 
         decoded_block_number, block_hash = sedes.decode_block_key(key)
         assert decoded_block_number == block_number, 'ERR block number {} does not match!'.format(decoded_block_number)
@@ -15,10 +15,11 @@ from silksnake.remote.kv_remote import DEFAULT_TARGET
 def kv_seek_eth_supply(kv_view: kv_remote.RemoteView, block_height: int, count: int = 1):
     """ Search for the provided block range in 'ETH_SUPPLY.v2' table of Turbo-Geth/Silkworm running at target.
     """
-    for block_number in range(block_height, block_height + count):
-        encoded_block_number = sedes.encode_block_number(block_number)
+    block_numbers = range(block_height, block_height + count)
+    encoded_block_numbers = [sedes.encode_block_number(block_number) for block_number in block_numbers]
+    pairs = kv_view.get_many(tables.ETH_SUPPLY_LABEL, encoded_block_numbers)
+    for block_number, encoded_block_number, (key, value) in zip(block_numbers, encoded_block_numbers, pairs):
         print('REQ block_number:', block_number, '(key: ' + str(encoded_block_number.hex()) + ')')
-        key, value = kv_view.get(tables.ETH_SUPPLY_LABEL, encoded_block_number)
         assert key == encoded_block_number, 'ERR key `{0}` does not match!'.format(key.hex())
         supply = int.from_bytes(value, 'big')
         print('RSP supply:', supply, '\n')
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""The kv_serve command allows to serve the turbo-geth/silkworm KV gRPC from JSON or binary fixture files."""
+
+import argparse
+
+import context # pylint: disable=unused-import
+
+from silksnake.remote import kv_server
+from silksnake.remote.kv_remote import DEFAULT_TARGET
+
+def kv_serve(fixture_filenames: list, target: str = DEFAULT_TARGET, max_workers: int = 10):
+    """ Serve the KV gRPC interface at target from the content of the provided fixture files, until interrupted.
+    """
+    store = kv_server.MemoryStore()
+    for filename in fixture_filenames:
+        for bucket_name, key, value in kv_server.MemoryStore.from_file(filename).items():
+            store.put(bucket_name, key, value)
+        print('LOAD fixture:', filename)
+    for bucket_name, bucket in sorted(store.buckets.items()):
+        print('BUCKET', bucket_name, 'keys:', len(bucket))
+
+    server = kv_server.serve(store, target, max_workers)
+    print('SERVING target:', target)
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(None)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', nargs='+', help='the fixture files as JSON (.json) or binary')
+    parser.add_argument('-t', '--target', default=DEFAULT_TARGET, help='the server location as string <address>:<port>')
+    parser.add_argument('-w', '--workers', type=int, default=10, help='the maximum number of server worker threads')
+    args = parser.parse_args()
+
+    kv_serve(args.fixtures, args.target, args.workers)